@@ -55,16 +55,20 @@ async def get_ranking(
         master = doc.get("master_info", {}) or {}
         expand_info = master.get("expand_info", {}) or {}
 
+        # 크롤러가 저장 시점에 타입을 맞춰 둠 (순위/리뷰 수: int, 시각: ISO 'YYYY-MM-DD HH:MM:SS')
+        # price_before / price_after 는 달러 문자열이 아니라 정수 센트 ("$12.99" -> 1299)
+        # 정규화 이전에 저장된 문서는 amazon_crawler 의 utils.migrate_normalize 로 한 번 변환해야 함
+        # 값이 없거나 해석할 수 없어 None 으로 저장된 리뷰 수/판매가는 이전 응답과 같이 0
         result.append({
             "seq": doc.get("seq"),
-            "crawl_date": doc.get("crawl_datetime", "").split(" ")[0] if doc.get("crawl_datetime") else None,
+            "crawl_date": doc.get("crawl_date"),
             "crawl_datetime": doc.get("crawl_datetime"),
             "asin": doc.get("asin"),
             "board_name": doc.get("board_name"),
             "price_before": expand_info.get("list_price"),
-            "price_after": doc.get("price_after", 0),
+            "price_after": doc.get("price_after") or 0,
             "ranking": doc.get("ranking"),
-            "review_cnt": int(doc.get("review_cnt", 0)),
+            "review_cnt": doc.get("review_cnt") or 0,
             "product_seq": master.get("seq"),
         })
 
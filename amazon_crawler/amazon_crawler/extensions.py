@@ -0,0 +1,562 @@
+# Define here the custom extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+import json
+import logging
+import os
+import queue
+import signal
+import time
+from collections import deque
+from logging.handlers import QueueListener
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.extensions.feedexport import ItemFilter
+from scrapy.utils.log import LogCounterHandler
+from twisted.internet import task
+
+from itemadapter import ItemAdapter
+
+from crawl_common import metrics
+from crawl_common.jsonl_feed import JsonLinesFeed
+from utils.checkpoint import CrawlCheckpoint
+from utils.crawl_log import GzipRotatingFileHandler, LazyQueueHandler, SamplingFilter
+from utils.extract_profile import profiler
+from utils.page_check import PageStatus, classify_headers, classify_response, robot_check_retried, scan_prefix
+
+logger = logging.getLogger(__name__)
+
+
+class QueueLogging:
+    """루트 로그 핸들러를 큐 + 리스너 스레드로 바꿔 로그 쓰기를 reactor 에서 떼어냄 (utils/crawl_log.py)
+
+    - LOG_SAMPLE_RATES 의 메시지 종류별로 N 건 중 1 건만 남김 (WARNING 이상은 항상)
+    - LOG_FILE 이 있으면 LOG_ROTATE_BYTES 마다 넘기고 지난 파일은 gzip, 종료 시 현재 파일도 gzip
+    - 루트 로거 레벨을 LOG_LEVEL 로 맞춰 그보다 낮은 로그는 레코드도 만들지 않음
+    Scrapy 가 crawl 시작 시 루트 핸들러를 다시 붙이므로 spider_opened 에 바꿔 끼우고,
+    engine_stopped 에 큐를 비운 뒤 원래처럼 핸들러를 직접 붙여 둔다.
+    log_count/* 를 세는 LogCounterHandler 는 샘플링 전에 세도록 루트에 그대로 둔다.
+    """
+
+    def __init__(self, settings, stats):
+        self.settings = settings
+        self.stats = stats
+        self.sampling = SamplingFilter(settings.getdict('LOG_SAMPLE_RATES'))
+        self.queue_handler = LazyQueueHandler(queue.SimpleQueue())
+        self.queue_handler.addFilter(self.sampling)
+        self.listener = None
+        self.handlers = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('LOG_QUEUE_ENABLED'):
+            raise NotConfigured
+        ext = cls(crawler.settings, crawler.stats)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.engine_stopped, signal=signals.engine_stopped)
+        return ext
+
+    def spider_opened(self, spider):
+        for handler in list(logging.root.handlers):
+            if isinstance(handler, LogCounterHandler):
+                continue
+            logging.root.removeHandler(handler)
+            self.handlers.append(self._rotating(handler))
+        if not self.handlers:
+            return
+        logging.root.setLevel(min(handler.level for handler in self.handlers))
+        logging.root.addHandler(self.queue_handler)
+        self.listener = QueueListener(self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def _rotating(self, handler):
+        """LOG_FILE 에 쓰는 FileHandler 는 같은 포맷/레벨의 GzipRotatingFileHandler 로 교체"""
+        log_file = self.settings.get('LOG_FILE')
+        if not (log_file and type(handler) is logging.FileHandler
+                and handler.baseFilename == os.path.abspath(log_file)):
+            return handler
+        handler.close()
+        rotating = GzipRotatingFileHandler(
+            log_file,
+            max_bytes=self.settings.getint('LOG_ROTATE_BYTES'),
+            backup_count=self.settings.getint('LOG_ROTATE_COUNT'),
+            encoding=self.settings.get('LOG_ENCODING'),
+            compress_on_close=self.settings.getbool('LOG_COMPRESS_ON_CLOSE'),
+        )
+        rotating.setFormatter(handler.formatter)
+        rotating.setLevel(handler.level)
+        for log_filter in handler.filters:
+            rotating.addFilter(log_filter)
+        return rotating
+
+    def spider_closed(self, spider, reason):
+        for prefix, dropped in self.sampling.dropped.items():
+            self.stats.set_value(f'log_sampling/dropped/{prefix.strip()}', dropped)
+        dropped = sum(self.sampling.dropped.values())
+        if dropped:
+            spider.logger.info("로그 샘플링: %d건 생략 (%d종류)", dropped, len(self.sampling.dropped))
+
+    def engine_stopped(self):
+        if self.listener is None:
+            return
+        # 남은 레코드를 모두 쓴 뒤, 이후 로그(종료 메시지 등)는 핸들러로 직접
+        self.listener.stop()
+        self.listener = None
+        logging.root.removeHandler(self.queue_handler)
+        for handler in self.handlers:
+            logging.root.addHandler(handler)
+
+
+class ThroughputStats:
+    """처리량(pages/sec, items/sec) 통계 확장
+
+    THROUGHPUT_STATS_INTERVAL 초마다 구간 처리량을 로그로 남기고,
+    종료 시 전체 처리량을 crawler stats 에 기록한다.
+    """
+
+    def __init__(self, stats, interval):
+        self.stats = stats
+        self.interval = interval
+        self.task = None
+        self.pages = 0
+        self.items = 0
+        self.pages_prev = 0
+        self.start_time = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        interval = crawler.settings.getfloat('THROUGHPUT_STATS_INTERVAL', 60.0)
+        if not interval:
+            raise NotConfigured
+        ext = cls(crawler.stats, interval)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def spider_opened(self, spider):
+        self.start_time = time.monotonic()
+        self.task = task.LoopingCall(self.log, spider)
+        self.task.start(self.interval, now=False)
+
+    def response_received(self, response, request, spider):
+        self.pages += 1
+
+    def item_scraped(self, item, response, spider):
+        # 체크포인트 복원 item(response 없음)은 이번 실행 처리량이 아님
+        if response is None:
+            return
+        self.items += 1
+
+    def log(self, spider):
+        rate = (self.pages - self.pages_prev) / self.interval
+        self.pages_prev = self.pages
+        self.stats.set_value('throughput/last_pages_per_sec', round(rate, 3))
+        self.stats.max_value('throughput/peak_pages_per_sec', round(rate, 3))
+        spider.logger.info(f"처리량: {rate:.2f} pages/sec (누적 {self.pages} pages, {self.items} items)")
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        elapsed = time.monotonic() - self.start_time
+        if elapsed <= 0:
+            return
+        self.stats.set_value('throughput/elapsed_seconds', round(elapsed, 1))
+        self.stats.set_value('throughput/pages_per_sec', round(self.pages / elapsed, 3))
+        self.stats.set_value('throughput/items_per_sec', round(self.items / elapsed, 3))
+
+
+class CheckpointExtension:
+    """완료 item / 남은 URL 을 주기적으로 저장하고 재시작 시 이어서 크롤
+
+    재시작하면 저장된 item 을 item_scraped 신호로 다시 흘려 보내
+    FEEDS 출력(overwrite)에 한 번씩만 들어가게 하고, 스파이더는
+    spider.checkpoint 를 보고 완료된 ASIN 을 건너뛴다.
+    완료 item 은 한 건마다 파일에 내려 두므로 (JsonLinesFeedExport 보다 먼저 기록, EXTENSIONS 순서)
+    JSON Lines 피드에 이미 쓴 item 이 재시작 후 다시 크롤되어 중복으로 쓰이지 않는다.
+    CHECKPOINT_INTERVAL 은 남은 URL 목록 저장과 fsync 간격이다.
+    프론티어 모드는 프론티어 DB 가 진행 상태를 가지므로 체크포인트를 쓰지 않는다
+    (워커들이 같은 디렉터리를 공유하게 되므로). 실행 인자(spider.run_args)가 다르면 이전 체크포인트는 버린다.
+    """
+
+    def __init__(self, crawler, base_dir, interval):
+        self.crawler = crawler
+        self.base_dir = base_dir
+        self.interval = interval
+        self.checkpoint = None
+        self.task = None
+        self.replaying = False
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        base_dir = crawler.settings.get('CHECKPOINT_DIR')
+        # 재생 모드 실행이 실제 크롤 체크포인트를 덮어쓰지 않도록 제외
+        if not base_dir or crawler.settings.get('RESPONSE_STORE_MODE') == 'replay':
+            raise NotConfigured
+        ext = cls(crawler, base_dir, crawler.settings.getfloat('CHECKPOINT_INTERVAL', 60.0))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def spider_opened(self, spider):
+        # 체크포인트를 지원하는 스파이더(checkpoint 속성 보유)만 대상
+        if not hasattr(spider, 'checkpoint'):
+            return
+        if getattr(spider, 'frontier', None) is not None:
+            spider.logger.info("프론티어 모드: 체크포인트 사용 안 함")
+            return
+        run_key = json.dumps(getattr(spider, 'run_args', None), sort_keys=True)
+        self.checkpoint = CrawlCheckpoint(os.path.join(self.base_dir, spider.name), run_key)
+        restored = self.checkpoint.load()
+        if self.checkpoint.discarded:
+            spider.logger.info("실행 인자가 달라 이전 체크포인트를 버리고 처음부터 크롤링")
+        spider.checkpoint = self.checkpoint
+        if restored:
+            spider.processed_count = self.checkpoint.processed_count
+            self.replaying = True
+            for item in restored:
+                self.crawler.signals.send_catch_log(signals.item_scraped, item=item, response=None, spider=spider)
+            self.replaying = False
+            self.crawler.stats.set_value('checkpoint/restored_items', len(restored))
+            spider.logger.info(f"체크포인트 복원: 완료 {len(restored)}개, 이어서 크롤링")
+
+        # 실행 인자를 바로 기록해 두어야 첫 저장 전에 죽어도 다음 실행이 비교할 수 있음
+        self.task = task.LoopingCall(self.flush, spider)
+        self.task.start(self.interval, now=True)
+
+    def item_scraped(self, item, response, spider):
+        if self.checkpoint is not None and not self.replaying:
+            self.checkpoint.record(item)
+
+    def flush(self, spider):
+        remaining = self.checkpoint.flush(getattr(spider, 'urls', []), spider.processed_count)
+        self.crawler.stats.inc_value('checkpoint/saves')
+        spider.logger.debug(f"체크포인트 저장: 완료 {len(self.checkpoint.done)}개, 남은 {remaining}개")
+
+    def spider_closed(self, spider, reason):
+        if self.checkpoint is None:
+            return
+        if self.task and self.task.running:
+            self.task.stop()
+        if reason == 'finished':
+            self.checkpoint.clear()
+        else:
+            self.flush(spider)
+            self.checkpoint.close()
+
+
+class ChangedItemFilter(ItemFilter):
+    """FEEDS 의 item_filter: 변경 없음(unchanged) item 은 피드에 쓰지 않음
+
+    AmazonUnchangedItem 은 MongoBulkPipeline 의 크롤 시각 갱신과 재크롤/프론티어 기록에만 쓰인다.
+    """
+
+    def accepts(self, item):
+        return not ItemAdapter(item).get('unchanged')
+
+
+class JsonLinesFeedExport:
+    """item 을 파티션별 압축 JSON Lines 파일로 스트리밍 저장 (crawl_common.jsonl_feed)
+
+    FEEDS 의 JSON 배열과 달리 한 건마다 flush 하고 크기/건수 기준으로 파일을 나눈다.
+    체크포인트 복원 item(response 없음)은 이전 실행 파일에 이미 있으므로 다시 쓰지 않는다.
+    변경 없음(unchanged) item 도 쓰지 않는다 (ChangedItemFilter 와 같은 기준).
+    """
+
+    def __init__(self, feed):
+        self.feed = feed
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get('JSONL_FEED_DIR')
+        if not path or settings.get('RESPONSE_STORE_MODE') == 'replay':
+            raise NotConfigured
+        feed = JsonLinesFeed(
+            path,
+            partition_by=settings.getlist('JSONL_FEED_PARTITION', ['board_name', 'date']),
+            date_field=settings.get('JSONL_FEED_DATE_FIELD'),
+            roll_bytes=settings.getint('JSONL_FEED_ROLL_BYTES', 64 * 1024 * 1024),
+            roll_items=settings.getint('JSONL_FEED_ROLL_ITEMS', 10000),
+            compression=settings.get('JSONL_FEED_COMPRESSION', 'gzip') or None,
+        )
+        ext = cls(feed)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def item_scraped(self, item, response, spider):
+        if response is None:
+            return
+        doc = ItemAdapter(item).asdict()
+        if doc.get('unchanged'):
+            return
+        self.feed.write(doc)
+
+    def spider_closed(self, spider, reason):
+        self.feed.close()
+
+
+class AdaptiveConcurrency:
+    """다운로더 슬롯별 요청 간격/동시성 자동 조절 확장
+
+    응답마다 지연 시간, 429/503, 로봇 체크 페이지(page_check)를 집계해
+    (지연/429/503 은 response_downloaded, 로봇 체크는 압축이 풀린 뒤의 response_received 와
+     PageCheckMiddleware 가 재시도로 돌린 응답의 robot_check_retried 신호에서)
+    - 429/503 이 오면 즉시 간격 2배, 동시성 절반 (구간당 한 번)
+    - 구간의 로봇 체크 비율이 ADAPTIVE_ROBOT_RATE 를 넘어도 같은 방식으로 물러섬
+    - ADAPTIVE_INTERVAL 초 구간의 평균 지연이 목표보다 크면 간격을 조금 늘림
+    - 건강한 구간이 ADAPTIVE_HEALTHY_WINDOWS 번 이어지면 간격을 10% 줄이고,
+      최소 간격에 닿은 뒤에는 동시성을 1씩 늘림
+    DOWNLOAD_DELAY / CONCURRENT_REQUESTS_PER_DOMAIN 은 시작값으로 쓰고
+    RANDOMIZE_DOWNLOAD_DELAY 의 무작위(0.5~1.5배)는 조절된 간격에 그대로 적용된다.
+    조절 결과는 adaptive/* stats 와 adaptive/history (시계열) 에 남긴다.
+    """
+
+    THROTTLE_CODES = (429, 503)
+
+    def __init__(self, crawler, interval, min_delay, max_delay, max_concurrency,
+                 target_latency, robot_rate, healthy_windows, history_size):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.interval = interval
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.robot_rate = robot_rate
+        self.healthy_windows = healthy_windows
+        self.windows = {}  # 슬롯 키 -> 구간 집계
+        self.history = deque(maxlen=history_size)
+        self.task = None
+        self.start_time = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('ADAPTIVE_CONCURRENCY_ENABLED') or settings.get('RESPONSE_STORE_MODE') == 'replay':
+            raise NotConfigured
+        ext = cls(
+            crawler,
+            interval=settings.getfloat('ADAPTIVE_INTERVAL', 10.0),
+            min_delay=settings.getfloat('ADAPTIVE_MIN_DELAY', 0.5),
+            max_delay=settings.getfloat('ADAPTIVE_MAX_DELAY', 60.0),
+            max_concurrency=settings.getint('ADAPTIVE_MAX_CONCURRENCY', 4),
+            target_latency=settings.getfloat('ADAPTIVE_TARGET_LATENCY', 3.0),
+            robot_rate=settings.getfloat('ADAPTIVE_ROBOT_RATE', 0.05),
+            healthy_windows=settings.getint('ADAPTIVE_HEALTHY_WINDOWS', 3),
+            history_size=settings.getint('ADAPTIVE_HISTORY_SIZE', 1000),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.robot_check_retried, signal=robot_check_retried)
+        return ext
+
+    def spider_opened(self, spider):
+        self.start_time = time.monotonic()
+        self.task = task.LoopingCall(self.adjust, spider)
+        self.task.start(self.interval, now=False)
+
+    def _window(self, request):
+        key = request.meta.get('download_slot')
+        slot = self.crawler.engine.downloader.slots.get(key) if key is not None else None
+        if slot is None:
+            return key, None, None
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = _SlotWindow()
+        return key, slot, window
+
+    def response_downloaded(self, response, request, spider):
+        # 다운로더 미들웨어(HttpCompression) 전이라 본문이 압축 상태일 수 있음 - 본문은 보지 않음
+        key, slot, window = self._window(request)
+        if slot is None:
+            return
+        window.responses += 1
+        window.latency += request.meta.get('download_latency') or 0.0
+        if response.status not in self.THROTTLE_CODES:
+            return
+        window.throttled += 1
+        # 차단 신호는 구간 끝을 기다리지 않고 바로 물러섬 (같은 구간에서 중복 적용 안 함)
+        if not window.backed_off:
+            window.backed_off = True
+            self._backoff(key, slot, window, spider)
+
+    def response_received(self, response, request, spider):
+        # 로봇 체크는 구간 비율로 판단 (adjust)
+        if response.status != 200:
+            return
+        if (classify_headers(response.headers) or classify_response(response)) is not PageStatus.ROBOT_CHECK:
+            return
+        _, slot, window = self._window(request)
+        if slot is not None:
+            window.robot_checks += 1
+
+    def robot_check_retried(self, request):
+        _, slot, window = self._window(request)
+        if slot is not None:
+            window.robot_checks += 1
+
+    def adjust(self, spider):
+        for key, window in list(self.windows.items()):
+            slot = self.crawler.engine.downloader.slots.get(key)
+            if slot is None:
+                # 오래 쓰이지 않아 정리된 슬롯
+                del self.windows[key]
+                continue
+            if window.backed_off:
+                decision = 'backoff'
+            elif not window.responses:
+                decision = 'idle'
+            elif window.robot_checks / window.responses > self.robot_rate:
+                decision = self._backoff(key, slot, window, spider)
+            elif window.latency / window.responses > self.target_latency:
+                window.healthy = 0
+                slot.delay = min(self.max_delay, max(self.min_delay, slot.delay * 1.25))
+                decision = 'slow'
+            else:
+                decision = self._ramp_up(slot, window)
+            self._record(key, slot, window, decision, spider)
+            window.reset()
+
+    def _backoff(self, key, slot, window, spider):
+        slot.delay = min(self.max_delay, max(self.min_delay, slot.delay * 2))
+        slot.concurrency = max(1, slot.concurrency // 2)
+        window.healthy = 0
+        self.stats.inc_value('adaptive/backoffs')
+        spider.logger.warning(
+            f"동시성 조절[{key}]: 차단 신호 (429/503 {window.throttled}건, 로봇 체크 {window.robot_checks}건) "
+            f"→ 간격 {slot.delay:.2f}초, 동시성 {slot.concurrency}"
+        )
+        return 'backoff'
+
+    def _ramp_up(self, slot, window):
+        window.healthy += 1
+        if window.healthy < self.healthy_windows:
+            return 'hold'
+        window.healthy = 0
+        if slot.delay > self.min_delay:
+            slot.delay = max(self.min_delay, slot.delay * 0.9)
+        elif slot.concurrency < self.max_concurrency:
+            slot.concurrency += 1
+        else:
+            return 'hold'
+        self.stats.inc_value('adaptive/rampups')
+        return 'rampup'
+
+    def _record(self, key, slot, window, decision, spider):
+        latency = window.latency / window.responses if window.responses else None
+        entry = {
+            't': round(time.monotonic() - self.start_time, 1),
+            'slot': key,
+            'decision': decision,
+            'delay': round(slot.delay, 3),
+            'concurrency': slot.concurrency,
+            'responses': window.responses,
+            'latency': round(latency, 3) if latency is not None else None,
+            'throttled': window.throttled,
+            'robot_checks': window.robot_checks,
+        }
+        self.history.append(entry)
+        self.stats.set_value(f'adaptive/{key}/delay', entry['delay'])
+        self.stats.set_value(f'adaptive/{key}/concurrency', entry['concurrency'])
+        self.stats.max_value(f'adaptive/{key}/concurrency_max', entry['concurrency'])
+        if decision in ('backoff', 'slow', 'rampup'):
+            spider.logger.info(
+                f"동시성 조절[{key}]: {decision} 간격 {entry['delay']}초, 동시성 {entry['concurrency']}, "
+                f"응답 {entry['responses']}, 평균 지연 {entry['latency']}초"
+            )
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        self.stats.set_value('adaptive/history', list(self.history))
+
+
+class _SlotWindow:
+    """슬롯 하나의 조절 구간 집계"""
+
+    def __init__(self):
+        self.healthy = 0  # 연속 건강 구간 수 (구간이 바뀌어도 유지)
+        self.reset()
+
+    def reset(self):
+        self.responses = 0
+        self.latency = 0.0
+        self.throttled = 0
+        self.robot_checks = 0
+        self.backed_off = False
+
+
+class ExtractProfile:
+    """추출기/선택자 프로파일링 켜기·끄기와 종료 시 요약 (utils/extract_profile.py)
+
+    EXTRACT_PROFILE_ENABLED 로 시작 상태를 정하고, 실행 중에는 SIGUSR1 로 켜고 끈다.
+        kill -USR1 <pid>
+    종료 시 모은 값이 있으면 요약을 로그로 남기고 extract_profile/* stats 에 기록한다.
+    """
+
+    def __init__(self, stats, log_top):
+        self.stats = stats
+        self.log_top = log_top
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        profiler.enabled = crawler.settings.getbool('EXTRACT_PROFILE_ENABLED')
+        ext = cls(crawler.stats, crawler.settings.getint('EXTRACT_PROFILE_LOG_TOP', 0) or None)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, ext.toggle)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def toggle(self, signum, frame):
+        # 시그널 핸들러에서는 플래그만 바꾸고, 로그는 reactor 가 다음 차례에 남김
+        # (핸들러 안에서 logging 을 부르면 끼어든 스레드가 잡고 있던 핸들러 락에서 멈출 수 있음)
+        from twisted.internet import reactor
+        profiler.toggle()
+        reactor.callFromThread(self.log_toggled)
+
+    def log_toggled(self):
+        logger.info(f"추출 프로파일링 {'켜짐' if profiler.enabled else '꺼짐'}")
+
+    def spider_closed(self, spider, reason):
+        if not profiler.extractors and not profiler.selectors:
+            return
+        for name, (calls, total, longest) in profiler.extractors.items():
+            self.stats.set_value(f'extract_profile/{name}/calls', calls)
+            self.stats.set_value(f'extract_profile/{name}/seconds', round(total, 4))
+            self.stats.set_value(f'extract_profile/{name}/max_seconds', round(longest, 4))
+        for label, (attempts, hits, _) in profiler.selectors.items():
+            self.stats.set_value(f'extract_profile/selector/{label}/attempts', attempts)
+            self.stats.set_value(f'extract_profile/selector/{label}/hits', hits)
+        spider.logger.info("추출 프로파일 요약\n" + profiler.summary(self.log_top))
+
+
+class CrawlMetrics(metrics.CrawlMetrics):
+    """크롤 실시간 지표 확장 (crawl_common.metrics)
+
+    로봇 체크는 page_check 의 판별 규칙을 쓰고, PageCheckMiddleware 가 콜백 전에
+    재시도로 돌린 로봇 체크 응답도 로봇 체크/다운로드 수에 넣는다.
+    DelayedRetryScheduler 가 재시도 대기로 잡고 있는 요청 수도 게이지로 내보낸다.
+    """
+
+    def is_robot_check(self, response):
+        return scan_prefix(response.body[:64 * 1024]) is PageStatus.ROBOT_CHECK
+
+    def robot_check_counts(self, stats):
+        retried = stats.get('page_check/robot_retries', 0)
+        return self.robot_checks + retried, self.pages + retried
+
+    def extra_metrics(self, stats):
+        return [
+            ('crawler_delayed_requests', 'gauge', '재시도 대기로 스케줄러가 잡고 있는 요청 수',
+             [({}, stats.get('scheduler/delayed_pending', 0))]),
+        ]
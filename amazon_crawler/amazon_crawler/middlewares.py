@@ -102,27 +102,335 @@ class AmazonCrawlerDownloaderMiddleware:
 import random
 import time
 from scrapy.downloadermiddlewares.retry import RetryMiddleware
+from scrapy.exceptions import IgnoreRequest, NotConfigured, StopDownload
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
 from scrapy.utils.response import response_status_message
+from scrapy.utils.httpobj import urlparse_cached
 import logging
+import zlib
 from threading import Timer
 
+from crawl_common.metrics import parse_finished
+from utils.page_check import (
+    DeadAsin, DeadAsinStore, PageStatus, classify_headers, robot_check_retried, scan_prefix,
+)
+from utils.response_store import ResponseStore
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 class CustomRetryMiddleware(RetryMiddleware):
-    """차단 감지 및 재시도 관리 미들웨어"""
-    
+    """차단 감지 및 재시도 관리 미들웨어
+
+    403/429 응답은 대기 시각(meta['not_before'])을 적은 재시도 요청을 바로 돌려주고,
+    대기는 DelayedRetryScheduler(scheduler.py)가 다운로더 밖에서 한다.
+    대기 시간은 도메인별 연속 차단 횟수에 따라 지수적으로 늘어나며
+    RETRY_BACKOFF_MAX 로 상한을 둔다. 대기 중에도 다른 요청은 계속 진행된다.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mw = super().from_crawler(crawler)
+        mw.stats = crawler.stats
+        mw.backoff_base = crawler.settings.getfloat('RETRY_BACKOFF_BASE', 30)
+        mw.backoff_max = crawler.settings.getfloat('RETRY_BACKOFF_MAX', 300)
+        mw.throttle_count = {}  # 도메인 -> 연속 차단 횟수
+        return mw
+
+    def _backoff_delay(self, domain):
+        count = self.throttle_count.get(domain, 0)
+        self.throttle_count[domain] = count + 1
+        delay = self.backoff_base * (2 ** count) * random.uniform(1, 2)
+        return min(delay, self.backoff_max)
+
     def process_response(self, request, response, spider):
         if request.meta.get('dont_retry', False):
             return response
-        
+
+        domain = urlparse_cached(request).hostname
+        if response.status not in [403, 429]:
+            self.throttle_count.pop(domain, None)
+
         if response.status in self.retry_http_codes:
             reason = response_status_message(response.status)
-            # 차단 감지 시 더 긴 대기 시간
+            retry_request = self._retry(request, reason, spider)
+            if retry_request is None:
+                return response
+
+            # 차단 감지 시 도메인별 지수 백오프 후 재시도
             if response.status in [403, 429]:
-                spider.logger.warning(f"차단 감지됨: {response.url}, 더 긴 대기 시간 적용")
-                time.sleep(random.uniform(30, 60))
-            return self._retry(request, reason, spider) or response
+                delay = self._backoff_delay(domain)
+                spider.logger.warning(f"차단 감지됨: {response.url}, {delay:.0f}초 후 재시도")
+                self.stats.inc_value('retry/backoff_count')
+                self.stats.inc_value('retry/backoff_seconds', delay)
+                retry_request.meta['not_before'] = time.monotonic() + delay
+            return retry_request
+
+        return response
+
+
+class ParseTimeMiddleware:
+    """콜백 처리 시간 측정 스파이더 미들웨어 (CrawlMetrics 의 parse 히스토그램)
+
+    콜백 직전(process_spider_input)부터 콜백 출력이 끝날 때까지의 시간을 parse_finished 신호로 보낸다.
+    콜백에 가장 가깝게 두어야 다른 미들웨어 시간이 섞이지 않는다.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.started = {}  # 응답 -> 콜백 시작 시각
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+        return cls(crawler)
+
+    def process_spider_input(self, response, spider):
+        self.started[response] = time.perf_counter()
+
+    def process_spider_output(self, response, result, spider):
+        try:
+            yield from result
+        finally:
+            self._finish(response)
+
+    async def process_spider_output_async(self, response, result, spider):
+        try:
+            async for output in result:
+                yield output
+        finally:
+            self._finish(response)
+
+    def process_spider_exception(self, response, exception, spider):
+        self._finish(response)
+
+    def _finish(self, response):
+        started = self.started.pop(response, None)
+        if started is not None:
+            self.crawler.signals.send_catch_log(
+                parse_finished, response=response, seconds=time.perf_counter() - started)
+
+
+class PageCheckMiddleware:
+    """로봇 체크 / 없는 상품 페이지 조기 판별 미들웨어
+
+    다운로드 중 헤더와 본문 앞 PAGE_CHECK_PREFIX_BYTES 바이트(압축은 풀어서)만 보고 판별해
+    나머지 다운로드를 중단한다. 판별 결과에 따라
+    - 로봇 체크: 콜백으로 보내지 않고 우선순위를 낮춘 지연 재시도 (PAGE_CHECK_RETRY_TIMES 까지,
+      대기는 PAGE_CHECK_RETRY_DELAY 부터 2배씩, DelayedRetryScheduler 가 다운로더 밖에서 대기),
+      횟수를 넘기면 그대로 콜백에 전달
+    - 없는 상품: 콜백에는 그대로 전달하고 ASIN 을 PAGE_CHECK_DEAD_DB 에 기록,
+      PAGE_CHECK_DEAD_TTL 동안 같은 ASIN 요청은 보내지 않음 (DeadAsin)
+    여기서 판별하지 못한 페이지는 parse 의 check_page_validity 가 그대로 처리한다.
+    아낀 바이트/콜백 수는 page_check/* stats 로 남긴다.
+    """
+
+    def __init__(self, crawler, prefix_bytes, retry_times, retry_delay, retry_priority, dead_store):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.prefix_bytes = prefix_bytes
+        self.retry_times = retry_times
+        self.retry_delay = retry_delay
+        self.retry_priority = retry_priority
+        self.dead_store = dead_store
+        self.scans = {}  # 다운로드 중인 요청 -> _PrefixScan
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('PAGE_CHECK_ENABLED', True):
+            raise NotConfigured
+        dead_db = settings.get('PAGE_CHECK_DEAD_DB')
+        dead_store = DeadAsinStore(dead_db, settings.getfloat('PAGE_CHECK_DEAD_TTL', 30 * 86400)) if dead_db else None
+        mw = cls(
+            crawler,
+            settings.getint('PAGE_CHECK_PREFIX_BYTES', 64 * 1024),
+            settings.getint('PAGE_CHECK_RETRY_TIMES', 2),
+            settings.getfloat('PAGE_CHECK_RETRY_DELAY', 60),
+            settings.getint('PAGE_CHECK_RETRY_PRIORITY', -100),
+            dead_store,
+        )
+        crawler.signals.connect(mw.headers_received, signal=signals.headers_received)
+        crawler.signals.connect(mw.bytes_received, signal=signals.bytes_received)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
 
+    def process_request(self, request, spider):
+        asin = _product_asin(request)
+        if asin and self.dead_store is not None and self.dead_store.is_dead(asin):
+            self.stats.inc_value('page_check/dead_skipped')
+            self.stats.inc_value('page_check/callbacks_saved')
+            raise DeadAsin(f"없는 상품으로 기록된 ASIN: {asin}")
+        return None
+
+    def headers_received(self, headers, body_length, request, spider):
+        status = classify_headers(headers)
+        encoding = (headers.get(b'Content-Encoding') or b'').strip().lower()
+        scan = _PrefixScan(encoding, body_length)
+        scan.status = status
+        self.scans[request] = scan
+        if status is not None:
+            self._stop(request, scan)
+
+    def bytes_received(self, data, request, spider):
+        scan = self.scans.get(request)
+        if scan is None:
+            return
+        scan.received += len(data)
+        if scan.status is not None or scan.finished:
+            return
+        scan.feed(data, self.prefix_bytes)
+        scan.status = scan_prefix(scan.head)
+        if scan.status is not None:
+            self._stop(request, scan)
+        elif len(scan.head) >= self.prefix_bytes:
+            scan.finished = True
+
+    def _stop(self, request, scan):
+        # 상품 페이지는 대부분 chunked (Content-Length 없음) 라 길이와 상관없이 중단하고,
+        # 아낀 바이트는 길이를 알 때만 센다
+        self.stats.inc_value('page_check/stopped_downloads')
+        if scan.length is not None and scan.length > scan.received:
+            self.stats.inc_value('page_check/bytes_saved', scan.length - scan.received)
+        raise StopDownload(fail=False)
+
+    def process_response(self, request, response, spider):
+        scan = self.scans.pop(request, None)
+        status = scan.status if scan is not None else None
+        if status is PageStatus.NOT_FOUND:
+            self.stats.inc_value('page_check/not_found')
+            asin = _product_asin(request)
+            if asin and self.dead_store is not None:
+                self.dead_store.add(asin)
+            return response
+
+        if status is not PageStatus.ROBOT_CHECK:
+            return response
+
+        self.stats.inc_value('page_check/robot_check')
+        retries = request.meta.get('page_check_retries', 0)
+        if retries >= self.retry_times:
+            self.stats.inc_value('page_check/retry_exhausted')
+            return response
+
+        delay = self.retry_delay * (2 ** retries)
+        spider.logger.warning(f"로봇 체크 페이지(조기 판별): {request.url}, {delay:.0f}초 뒤 재시도 ({retries + 1}/{self.retry_times})")
+        self.stats.inc_value('page_check/robot_retries')
+        self.stats.inc_value('page_check/callbacks_saved')
+        self.crawler.signals.send_catch_log(robot_check_retried, request=request)
+        self.stats.inc_value('page_check/retry_wait_seconds', delay)
+        meta = dict(request.meta, page_check_retries=retries + 1, not_before=time.monotonic() + delay)
+        return request.replace(meta=meta, priority=request.priority + self.retry_priority, dont_filter=True)
+
+    def process_exception(self, request, exception, spider):
+        self.scans.pop(request, None)
+
+    def spider_closed(self, spider, reason):
+        if self.dead_store is not None:
+            self.dead_store.close()
+        saved = self.stats.get_value('page_check/bytes_saved', 0)
+        callbacks = self.stats.get_value('page_check/callbacks_saved', 0)
+        spider.logger.info(f"페이지 조기 판별: 다운로드 {saved} bytes, 콜백 {callbacks}회 절약")
+
+
+class _PrefixScan:
+    """다운로드 중인 응답 하나의 앞부분 (압축은 푼 상태) 누적"""
+
+    def __init__(self, encoding, length):
+        # chunked 응답이면 scrapy 가 twisted 의 UNKNOWN_LENGTH (문자열) 를 그대로 넘김
+        self.length = length if isinstance(length, int) and length >= 0 else None
+        self.received = 0
+        self.head = b''
+        self.status = None
+        self.finished = False
+        if encoding in (b'gzip', b'x-gzip'):
+            self.decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == b'deflate':
+            self.decoder = zlib.decompressobj()
+        elif encoding == b'br' and brotli is not None:
+            self.decoder = brotli.Decompressor()
+        elif encoding in (b'', b'identity'):
+            self.decoder = None
+        else:
+            # 풀 수 없는 인코딩은 조기 판별하지 않음
+            self.finished = True
+
+    def feed(self, data, limit):
+        try:
+            if self.decoder is None:
+                chunk = data
+            elif brotli is not None and isinstance(self.decoder, brotli.Decompressor):
+                chunk = self.decoder.process(data)
+            else:
+                chunk = self.decoder.decompress(data, limit - len(self.head))
+        except Exception:
+            self.finished = True
+            return
+        self.head += chunk[:limit - len(self.head)]
+
+
+def _product_asin(request):
+    url = request.meta.get('url', request.url)
+    return url.rstrip('/').split('/')[-1] if '/dp/' in url else None
+
+
+class ResponseStoreMiddleware:
+    """응답 기록/재생 미들웨어
+
+    RESPONSE_STORE_MODE = 'record' : 정상 응답 원문을 RESPONSE_STORE_DIR 에 압축 저장
+    RESPONSE_STORE_MODE = 'replay' : 저장된 응답을 네트워크 없이 바로 반환
+    재생은 처음 요청한 URL 로 찾으므로, 리다이렉트된 응답은 원래 요청 URL 과 최종 URL 둘 다로 기록한다
+    (본문은 내용 주소로 한 번만 저장됨).
+    """
+
+    def __init__(self, stats, store, mode):
+        self.stats = stats
+        self.store = store
+        self.mode = mode
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mode = crawler.settings.get('RESPONSE_STORE_MODE')
+        if mode not in ('record', 'replay'):
+            raise NotConfigured
+        store = ResponseStore(crawler.settings.get('RESPONSE_STORE_DIR', './data/response_store'))
+        return cls(crawler.stats, store, mode)
+
+    def process_request(self, request, spider):
+        if self.mode != 'replay':
+            return None
+
+        cached = self.store.get(request.url)
+        if cached is None:
+            self.stats.inc_value('response_store/miss')
+            raise IgnoreRequest(f"저장된 응답 없음: {request.url}")
+
+        status, headers, body = cached
+        headers = Headers(headers)
+        respcls = responsetypes.from_args(headers=headers, url=request.url, body=body)
+        self.stats.inc_value('response_store/replayed')
+        return respcls(url=request.url, status=status, headers=headers, body=body, request=request, flags=['replayed'])
+
+    def process_response(self, request, response, spider):
+        if self.mode == 'record' and 'replayed' not in response.flags and response.status < 500 \
+                and response.status not in [403, 429]:
+            headers = {
+                k.decode('latin1'): [v.decode('latin1') for v in vs]
+                for k, vs in response.headers.items()
+            }
+            urls = {request.meta.get('redirect_urls', [request.url])[0], response.url}
+            for url in urls:
+                self.store.put(url, response.status, headers, response.body)
+            self.stats.inc_value('response_store/recorded')
+            if len(urls) > 1:
+                self.stats.inc_value('response_store/recorded_redirects')
         return response
 
+
 class RandomUserAgentMiddleware:
     """무작위 User-Agent 미들웨어"""
     
@@ -148,7 +456,7 @@ class CustomProxyMiddleware:
         proxy = self._get_proxy()
         if proxy:
             request.meta['proxy'] = proxy
-            self.logger.debug(f"[Proxy] Using: {proxy}")
+            self.logger.debug("[Proxy] Using: %s", proxy)
 
     def process_response(self, request, response, spider):
         proxy = request.meta.get('proxy')
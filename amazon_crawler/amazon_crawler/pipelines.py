@@ -7,20 +7,57 @@
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from crawl_common.normalize import normalize_item
+from utils.recrawl_scheduler import RecrawlScheduler, tracked_fields
+
 
 class AmazonCrawlerPipeline:
     def process_item(self, item, spider):
         return item
 
 
-class CleanUnicodeCharsPipeline:
+class NormalizeItemPipeline:
+    """가격/순위/개수/크롤 시각 문자열을 타입이 있는 값으로 변환 (crawl_common.normalize)"""
+
+    def process_item(self, item, spider):
+        return normalize_item(item)
+
+
+class FrontierPipeline:
+    """프론티어 모드에서 item 을 DB 에 저장하고 해당 ASIN 을 완료 처리"""
+
+    def process_item(self, item, spider):
+        frontier = getattr(spider, 'frontier', None)
+        if frontier is not None and item.get('url'):
+            asin = item['url'].split('/')[-1]
+            # 변경 없는 item 은 결과 없이 완료 처리만
+            frontier.complete(asin, None if item.get('unchanged') else ItemAdapter(item).asdict())
+        return item
+
+
+class RecrawlHistoryPipeline:
+    """정상 수집된 item 의 주요 필드 변경 이력을 재크롤 스케줄러에 기록"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.scheduler = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings.get('RECRAWL_DB', './data/recrawl.db'))
+
+    def open_spider(self, spider):
+        self.scheduler = RecrawlScheduler(self.db_path)
+
+    def close_spider(self, spider):
+        self.scheduler.close()
+
     def process_item(self, item, spider):
-        for field in item:
-            if isinstance(item[field], str):
-                    item[field] = item[field].replace('\u200e', '').strip()
-            
-            if isinstance(item[field], dict):
-                for x in item[field]:
-                    if isinstance(item[field][x], str):
-                        item[field][x] = item[field][x].replace('\u200e', '').strip()
+        if item.get('unchanged'):
+            self.scheduler.observe(item['asin'], None)
+            self.scheduler.commit()
+        elif item.get('error', 'null') == 'null' and item.get('data_gbn') != 'DELETE' and item.get('url'):
+            asin = item['url'].split('/')[-1]
+            self.scheduler.observe(asin, tracked_fields(item), item.get('data_gbn'))
+            self.scheduler.commit()
         return item
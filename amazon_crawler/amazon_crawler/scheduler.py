@@ -0,0 +1,48 @@
+import time
+
+from scrapy.core.scheduler import Scheduler
+
+
+class DelayedRetryScheduler(Scheduler):
+    """재시도 대기 요청을 다운로더 밖에서 잡아 두는 스케줄러
+
+    CustomRetryMiddleware / PageCheckMiddleware 는 재시도 요청에 meta['not_before']
+    (time.monotonic 기준 시각)만 적어 바로 돌려준다. 그 시각이 남은 요청은 큐에 넣지 않고
+    reactor 타이머로 들고 있다가 시각이 되면 큐에 넣으므로, 대기하는 동안 다운로더 슬롯
+    (CONCURRENT_REQUESTS)을 차지하지 않는다. 잡고 있는 요청도 대기 요청으로 세어 스파이더가
+    idle 로 닫히지 않게 하고, 종료 시에는 남은 요청을 큐(JOBDIR 이면 디스크)로 옮긴다.
+    큐에 넣은 요청은 엔진의 다음 heartbeat(최대 5초) 안에 다시 나간다.
+    지금 잡고 있는 요청 수는 scheduler/delayed_pending 통계(CrawlMetrics 의 게이지)로 보인다.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.held = {}  # 대기 중인 요청 -> IDelayedCall
+
+    def enqueue_request(self, request):
+        not_before = request.meta.get('not_before')
+        delay = not_before - time.monotonic() if not_before else 0
+        if delay <= 0:
+            return super().enqueue_request(request)
+
+        from twisted.internet import reactor
+        self.held[request] = reactor.callLater(delay, self._release, request)
+        self.stats.inc_value('scheduler/delayed', spider=self.spider)
+        self.stats.inc_value('scheduler/delayed_seconds', delay, spider=self.spider)
+        self.stats.max_value('scheduler/delayed_max', len(self.held), spider=self.spider)
+        self.stats.set_value('scheduler/delayed_pending', len(self.held), spider=self.spider)
+        return True
+
+    def _release(self, request):
+        self.held.pop(request, None)
+        self.stats.set_value('scheduler/delayed_pending', len(self.held), spider=self.spider)
+        super().enqueue_request(request)
+
+    def __len__(self):
+        return super().__len__() + len(self.held)
+
+    def close(self, reason):
+        for request, call in list(self.held.items()):
+            call.cancel()
+            self._release(request)
+        return super().close(reason)
@@ -10,19 +10,46 @@ FEEDS = {
         'format': 'json',
         'encoding': 'utf8',
         'indent': 4,
+        'overwrite': True,  # 체크포인트 재시작 시 복원된 item 과 함께 다시 씀
+        'item_filter': 'amazon_crawler.extensions.ChangedItemFilter',  # 변경 없음 item 제외
     }
 }
 
+# ─────── 스트리밍 JSON Lines 피드 (JsonLinesFeedExport) ───────
+# 위 FEEDS(JSON 배열)는 기존 소비 측을 위해 유지, 대용량/재개가 필요한 소비 측은 이 피드를 사용
+JSONL_FEED_DIR = './data/result/jsonl'
+JSONL_FEED_PARTITION = ['board_name', 'date']  # date 는 JSONL_FEED_DATE_FIELD 의 날짜 (없으면 실행일)
+JSONL_FEED_DATE_FIELD = 'last_crawl_datetime'
+JSONL_FEED_ROLL_BYTES = 64 * 1024 * 1024  # 압축 전 기준
+JSONL_FEED_ROLL_ITEMS = 10000
+JSONL_FEED_COMPRESSION = 'gzip'  # gzip / zstd / None
+
 # ─────── 요청/응답 ───────
 DOWNLOAD_TIMEOUT = 30
+# 도메인(다운로더 슬롯)별 요청 간격 – 예전 parse 의 1~2초 time.sleep 도 이 간격 하나로 대신함
+# (RANDOMIZE_DOWNLOAD_DELAY 로 0.5~1.5배 무작위, 슬롯 타이머로 기다리므로 동시 요청 자리를 차지하지 않음)
 DOWNLOAD_DELAY = 2
 RANDOMIZE_DOWNLOAD_DELAY = True  #True였음
 CONCURRENT_REQUESTS = 8
 CONCURRENT_REQUESTS_PER_DOMAIN = 1
 
+# 슬롯별 간격/동시성 자동 조절 – AdaptiveConcurrency (위 DOWNLOAD_DELAY / PER_DOMAIN 은 시작값)
+ADAPTIVE_CONCURRENCY_ENABLED = True
+ADAPTIVE_INTERVAL = 10          # 초, 조절 구간
+ADAPTIVE_MIN_DELAY = 0.5        # 초
+ADAPTIVE_MAX_DELAY = 60         # 초
+ADAPTIVE_MAX_CONCURRENCY = 4    # 슬롯당 최대 동시 요청 (CONCURRENT_REQUESTS 를 넘지 않음)
+ADAPTIVE_TARGET_LATENCY = 3.0   # 초, 구간 평균 지연이 이보다 크면 간격을 늘림
+ADAPTIVE_ROBOT_RATE = 0.05      # 구간 내 로봇 체크 비율이 이보다 크면 물러섬
+ADAPTIVE_HEALTHY_WINDOWS = 3    # 건강한 구간이 이만큼 이어져야 한 단계 올림
+
 COOKIES_ENABLED = True
 HTTPCACHE_ENABLED = False
 
+# 응답 기록/재생 – None | 'record' | 'replay' (예: -s RESPONSE_STORE_MODE=replay)
+RESPONSE_STORE_MODE = None
+RESPONSE_STORE_DIR = './data/response_store'
+
 # ─────── 로그 파일 ───────
 import os
 from datetime import datetime
@@ -31,6 +58,26 @@ LOG_FILE = os.path.join(LOG_DIR, f"crawl_{datetime.now().strftime('%Y-%m-%d_%H-%
 LOG_LEVEL = 'DEBUG'
 LOG_STDOUT = True
 
+# 로그 쓰기를 리스너 스레드로 (QueueLogging 확장), 메시지 종류별 샘플링 + 파일 압축/회전
+LOG_QUEUE_ENABLED = True
+LOG_ROTATE_BYTES = 50 * 1024 * 1024   # 넘으면 crawl_x.log.1.gz 로 넘김, 0 이면 회전 안 함
+LOG_ROTATE_COUNT = 20
+LOG_COMPRESS_ON_CLOSE = True          # 종료 시 crawl_x.log -> crawl_x.log.gz
+# {메시지 템플릿 접두어: N} - N 건 중 1 건만 기록 (0 이면 기록 안 함), WARNING 이상은 항상 기록
+LOG_SAMPLE_RATES = {
+    'Crawled (': 20,              # scrapy 응답 로그
+    'Scraped from ': 100,         # scrapy item 로그 (item 전체가 찍힘)
+    '크롤링 시작: ': 20,
+    '사용된 User-Agent: ': 100,
+    '[Proxy] Using: ': 100,
+    '[asin 디버그] : ': 100,
+    '페이지 유효 검사 결과 : ': 100,
+    '진행도: ': 20,
+    '제품 정보 추출 완료: ': 20,
+    '변경 없음(지문 일치): ': 20,
+    '#%d: %s... | 가격: ': 10,     # 베스트셀러 카드 진행 로그
+}
+
 # ─────── User-Agent 목록 … (생략) ───────
 USER_AGENT_CHOICES = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
@@ -49,17 +96,32 @@ USER_AGENT_CHOICES = [
 RETRY_ENABLED = True
 RETRY_TIMES = 3
 RETRY_HTTP_CODES = [500, 502, 503, 504, 522, 524, 408, 403, 429]
+RETRY_BACKOFF_BASE = 30   # 403/429 첫 대기(초), 도메인별 연속 차단마다 2배
+RETRY_BACKOFF_MAX = 300   # 대기 상한(초)
+# 재시도 대기(meta['not_before']) 요청을 다운로더 슬롯 밖에서 들고 있는 스케줄러
+SCHEDULER = 'amazon_crawler.scheduler.DelayedRetryScheduler'
 
 DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.retry.RetryMiddleware': None,
     'amazon_crawler.middlewares.CustomRetryMiddleware': 550,
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
     'amazon_crawler.middlewares.RandomUserAgentMiddleware': 400,
+    'amazon_crawler.middlewares.PageCheckMiddleware': 440,
+    'amazon_crawler.middlewares.ResponseStoreMiddleware': 100,
     # 'amazon_crawler.middlewares.CustomProxyMiddleware': 350,
     'scrapy.downloadermiddlewares.httpcompression.HttpCompressionMiddleware': 810,
     # ❶ Playwright 자체 미들웨어는 **자동**으로 주입되므로 추가 필요 없음
 }
 
+# 로봇 체크 / 없는 상품 페이지 조기 판별 – PageCheckMiddleware
+PAGE_CHECK_ENABLED = True
+PAGE_CHECK_PREFIX_BYTES = 64 * 1024   # 압축을 푼 본문 앞부분 중 판별에 쓰는 크기
+PAGE_CHECK_RETRY_TIMES = 2            # 로봇 체크 지연 재시도 횟수 (넘기면 parse 에서 오류 item)
+PAGE_CHECK_RETRY_DELAY = 60           # 초, 재시도마다 2배
+PAGE_CHECK_RETRY_PRIORITY = -100      # 재시도 요청 우선순위 조정 (새 요청 뒤로)
+PAGE_CHECK_DEAD_DB = './data/dead_asins.db'  # None 이면 없는 ASIN 기록/건너뛰기 안 함
+PAGE_CHECK_DEAD_TTL = 30 * 86400      # 초, 이 기간이 지나면 다시 크롤
+
 # ─────── 프록시 / 파이프라인 / Referer 등 기존 설정 유지 ───────
 PROXIES = [
     '14a22fccc4885:a48fd5bd91@45.150.81.133:12323',
@@ -75,10 +137,72 @@ PROXIES = [
 ]
 PROXY_RECOVERY_TIME = 1800  # 30 분
 
+# ─────── 확장 설정 ───────
+EXTENSIONS = {
+    'amazon_crawler.extensions.QueueLogging': 100,
+    'amazon_crawler.extensions.ThroughputStats': 500,
+    'amazon_crawler.extensions.CheckpointExtension': 510,
+    'amazon_crawler.extensions.JsonLinesFeedExport': 520,
+    'amazon_crawler.extensions.AdaptiveConcurrency': 530,
+    'amazon_crawler.extensions.CrawlMetrics': 540,
+    'amazon_crawler.extensions.ExtractProfile': 550,
+}
+SPIDER_MIDDLEWARES = {
+    'amazon_crawler.middlewares.ParseTimeMiddleware': 950,  # 콜백에 가장 가깝게
+}
+THROUGHPUT_STATS_INTERVAL = 60  # 초, 0 이면 비활성
+
+# 실시간 지표 (Prometheus 텍스트 형식) – curl http://127.0.0.1:9410/metrics
+METRICS_ENABLED = True
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = [9410, 9420]   # 사용 중이면 범위 안의 다음 포트
+METRICS_SAMPLE_INTERVAL = 5   # 초, 처리량 표본 간격
+METRICS_RATE_WINDOW = 60      # 초, pages/items per sec 계산 구간
+
+# 추출기/선택자 프로파일링 – 실행 중 kill -USR1 <pid> 로 켜고 끔, 종료 시 요약 로그 + stats
+EXTRACT_PROFILE_ENABLED = False
+EXTRACT_PROFILE_LOG_TOP = 0   # 요약 로그에 남길 추출기 수, 0 이면 전부
+
+# ─────── 체크포인트 (비정상 종료 후 재실행 시 이어서 크롤, 정상 종료 시 삭제) ───────
+CHECKPOINT_DIR = './data/checkpoint'
+CHECKPOINT_INTERVAL = 60  # 초, 남은 URL 목록 저장 간격 (완료 item 은 한 건마다 기록)
+
 # ─────── 파이프라인 설정 ───────
 ITEM_PIPELINES = {
-    'amazon_crawler.pipelines.CleanUnicodeCharsPipeline': 300,
+    'amazon_crawler.pipelines.NormalizeItemPipeline': 300,
+    'crawl_common.mongo_bulk.MongoBulkPipeline': 700,  # 공통 패키지 (저장소 루트에서 pip install -e ./crawl_common)
+    'amazon_crawler.pipelines.RecrawlHistoryPipeline': 800,
+    'amazon_crawler.pipelines.FrontierPipeline': 900,
 }
+
+# ─────── MongoDB 저장 (MONGO_URI 가 비어 있으면 비활성) ───────
+MONGO_URI = ''  # 예: 'mongodb://localhost:27017'
+MONGO_DATABASE = 'mydb'
+MONGO_COLLECTION = 'product_master'
+MONGO_UPSERT_KEYS = ['asin']
+MONGO_SEQ_COUNTER = 'productid'  # 새 문서에 counters 컬렉션의 seq 배정 (API 정렬 기준)
+MONGO_BATCH_SIZE = 500         # 이만큼 모이면 bulk_write
+MONGO_FLUSH_INTERVAL = 5       # 초, 배치가 덜 찼어도 이 간격으로 쓰기
+MONGO_MAX_PENDING_BATCHES = 4  # 쓰는 중인 배치가 이보다 많으면 item 처리 대기
+
+# ─────── 증분 재크롤 (-a budget=N 이면 변경 가능성 높은 N 개만 크롤) ───────
+RECRAWL_DB = './data/recrawl.db'
+
+# ─────── 페이지 지문 (추출 영역이 지난 크롤과 같으면 추출 생략, unchanged item 만 출력) ───────
+PAGE_FINGERPRINT_ENABLED = False
+PAGE_FINGERPRINT_DB = './data/fingerprint.db'
+
+# ─────── HTML 파서 백엔드 (parsel / selectolax / auto: selectolax 가 설치되어 있으면 사용) ───────
+# 백엔드별 속도와 추출 결과 차이는 python -m utils.bench_helper_parse --backend parsel --backend selectolax 로 확인
+HTML_PARSER_BACKEND = 'auto'
+
+# ─────── 추출 프로세스 풀 (0 이면 reactor 스레드에서 추출) ───────
+EXTRACTION_WORKERS = 0
+
+# ─────── 공유 프론티어 (-a frontier=DB경로 일 때만 동작) ───────
+FRONTIER_LEASE_SIZE = 50       # 한 번에 임대할 ASIN 수
+FRONTIER_LEASE_TIMEOUT = 1800  # 초, 이 시간 안에 완료되지 않으면 다른 워커가 재임대
+FRONTIER_MAX_ATTEMPTS = 3      # 이 횟수만큼 임대해도 완료되지 않은 ASIN 은 failed (python -m utils.frontier failed)
 # ─────── Referer 설정 ───────
 REFERER_ENABLED = True
 REFERRER_POLICY = 'scrapy.spidermiddlewares.referer.DefaultReferrerPolicy'
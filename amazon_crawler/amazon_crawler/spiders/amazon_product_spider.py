@@ -1,23 +1,26 @@
 import scrapy 
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
 from scrapy.item import Item, Field
+from scrapy.utils.defer import maybe_deferred_to_future
 from scrapy.utils.project import get_project_settings
 from utils.helper_parse import (
-    get_data_to_return,
-    extract_product_title,
     check_page_validity,
-    extract_style_info,
-    set_board_name_and_division,
-    determine_board_type,
-    extract_image_url,
-    set_data_gbn,
-    combine_basic_expand_extract,
-    extract_price_info,
-    extract_rating_info
+    extract_product_details,
+    data_to_return_stats
 )
+from utils.frontier import AsinFrontier, default_worker_id
+from utils.asin_manifest import AsinManifest
+from utils.recrawl_scheduler import RecrawlScheduler
+from utils.page_fingerprint import PageFingerprintStore, page_fingerprint, config_salt
+from utils.response_store import ResponseStore
+from utils.page_check import DeadAsin, PageStatus, classify_response
+from utils.selector_plan import compile_selectors
+from utils.extract_pool import ExtractionPool
+from utils.extract_profile import profiler
+from utils.html_backend import parse_document, resolve_backend
 
-import pandas as pd
 import random
-import time
 import json
 from datetime import datetime   
 
@@ -49,17 +52,25 @@ class AmazonProductItem(Item):
     expand_info = Field()
     error = Field()
 
+class AmazonUnchangedItem(Item):
+    """지난 크롤과 페이지 지문이 같은 경우의 경량 item"""
+    asin = Field()
+    url = Field()
+    last_crawl_datetime = Field()
+    unchanged = Field()
+
 class AmazonProductSpider(scrapy.Spider):
     name = 'amazon_product'
     allowed_domains = ['amazon.com']
     total_count = 0
     processed_count = 0
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, frontier=None, worker=None, start=None, end=None, delta=None, budget=None, *args, **kwargs):
         super(AmazonProductSpider, self).__init__(*args, **kwargs)
         settings = get_project_settings()
         self.user_agents = settings.get('USER_AGENT_CHOICES')
         self.headers = settings.get('DEFAULT_REQUEST_HEADERS')
+        self.lease_size = settings.getint('FRONTIER_LEASE_SIZE', 50)
 
         # self.urls = ['https://www.amazon.com/dp/B007R9N0O0']
 
@@ -68,65 +79,149 @@ class AmazonProductSpider(scrapy.Spider):
 
 
         file_path = './data/amazon_review_open.xlsx'
-        df = pd.read_excel(file_path)
+        manifest = AsinManifest(file_path)
+        asin_list = manifest.load()
+        # 직전 엑셀 대비 추가된 ASIN 만 크롤링 (예: -a delta=added)
+        if delta == 'added':
+            asin_list = manifest.added
+        manifest.close()
+
+        # 변경 가능성이 높은 순으로 budget 개만 선택하고 요청 우선순위 부여
+        self.priorities = {}
+        if budget:
+            scheduler = RecrawlScheduler(settings.get('RECRAWL_DB', './data/recrawl.db'))
+            selected = scheduler.select(asin_list, int(budget))
+            scheduler.close()
+            asin_list = [asin for asin, _ in selected]
+            self.priorities = {f'https://www.amazon.com/dp/{asin}': prio for asin, prio in selected}
 
-        df = df[df['DATA_GBN'] != 'DELETE']
-        asin_list = df['ASIN'].dropna().unique().tolist()
         self.urls = [f'https://www.amazon.com/dp/{i}' for i in asin_list]
         # self.urls = random.sample(self.urls, 20)
 
         self.urls = sorted(self.urls)
 
-        # self.urls = self.urls[:1000]
-        # self.urls = self.urls[1000:2000]
-        # self.urls = self.urls[2000:3000]
-        # self.urls = self.urls[3000:4000]
-        # self.urls = self.urls[4000:5000]
-        # self.urls = self.urls[5000:6000]
-        # self.urls = self.urls[6000:7000]
-        # self.urls = self.urls[7000:8000]
-        self.urls = self.urls[8000:]
-
+        # 구간 지정 (예: -a start=8000 -a end=9000)
+        self.urls = self.urls[int(start) if start else None:int(end) if end else None]
         self.total_count = len(self.urls)
 
+        # CheckpointExtension 이 spider_opened 에서 설정, 인자가 다른 실행의 체크포인트는 이어 쓰지 않음
+        self.checkpoint = None
+        self.run_args = {'start': start, 'end': end, 'delta': delta, 'budget': budget}
+
+        # 공유 프론티어 모드 (예: -a frontier=./data/frontier.db)
+        # 여러 프로세스가 같은 DB 에서 ASIN 배치를 임대해 나눠 크롤링
+        self.frontier = None
+        if frontier:
+            self.frontier = AsinFrontier(frontier, settings.getint('FRONTIER_LEASE_TIMEOUT', 1800),
+                                         settings.getint('FRONTIER_MAX_ATTEMPTS', 3))
+            self.frontier.seed(url.split('/')[-1] for url in self.urls)
+            self.worker = worker or default_worker_id()
+            self.total_count = self.frontier.counts()['pending']
+            self.logger.info(f"프론티어 모드: {frontier} (worker={self.worker})")
+
         with open("./config/selectors.json", "r", encoding="utf-8") as f:
             config = json.load(f)
 
-        self.configs = config
-        self.check_list = config['check_list']
-        self.title_selectors = config["title_selectors"]
-        self.row_selectors = config["row_selectors"]
+        # 선택자를 한 번만 컴파일, 잘못된 선택자는 여기서 SelectorConfigError 로 실패
+        self.configs = compile_selectors(config)
+        self.check_list = self.configs['check_list']
+        self.title_selectors = self.configs["title_selectors"]
+        self.row_selectors = self.configs["row_selectors"]
+        self.html_backend = resolve_backend(settings.get('HTML_PARSER_BACKEND', 'parsel'))
+
+        # 페이지 지문이 지난 크롤과 같으면 추출을 건너뜀
+        self.fingerprints = None
+        if settings.getbool('PAGE_FINGERPRINT_ENABLED'):
+            self.fingerprints = PageFingerprintStore(settings.get('PAGE_FINGERPRINT_DB', './data/fingerprint.db'))
+            self.fingerprint_salt = config_salt(config)
+
+        # 추출 프로세스 풀 (EXTRACTION_WORKERS > 0 일 때만, 0 이면 reactor 스레드에서 추출)
+        self.extract_pool = None
+        workers = settings.getint('EXTRACTION_WORKERS', 0)
+        if workers > 0:
+            self.extract_pool = ExtractionPool(workers, config, self.html_backend)
+            self.logger.info(f"추출 프로세스 풀 사용: 워커 {workers}개")
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+
+        # 재생 모드: 저장된 응답이 있는 URL 만 요청하고, 추출 코드 검증이 목적이므로 지문 비교는 생략
+        if crawler.settings.get('RESPONSE_STORE_MODE') == 'replay':
+            store = ResponseStore(crawler.settings.get('RESPONSE_STORE_DIR', './data/response_store'))
+            spider.urls = [url for url in spider.urls if url in store]
+            spider.total_count = len(spider.urls)
+            spider.fingerprints = None
+            store.close()
+        return spider
 
     def start_requests(self):
         with open("./config/amazon_cookies.json", "r") as f:
             cookies = json.load(f)
-        c = {cookie['name']: cookie['value'] for cookie in cookies}
-
-        for url in self.urls:
-            self.logger.info(f"크롤링 시작: {url}")
-            ua = random.choice(self.user_agents)
-            headers = self.headers.copy()
-            headers['User-Agent'] = ua
-            self.logger.debug(f"사용된 User-Agent: {ua}")
-            yield scrapy.Request(
-                url=url,
-                callback=self.parse,
-                headers=headers,
-                cookies=c,
-                # cookies={
-                #     "lc-main": "en_US",             
-                #     "i18n-prefs": "USD",      
-                #     "locale": "en_US",       
-                # },
-                dont_filter=True,
-                errback=self.errback_handler,
-            )
-
-    def parse(self, response):
+        self.cookies = {cookie['name']: cookie['value'] for cookie in cookies}
+
+        for url in self._next_urls():
+            yield self.make_product_request(url)
+
+    def make_product_request(self, url):
+        self.logger.info("크롤링 시작: %s", url)
+        ua = random.choice(self.user_agents)
+        headers = self.headers.copy()
+        headers['User-Agent'] = ua
+        self.logger.debug("사용된 User-Agent: %s", ua)
+        return scrapy.Request(
+            url=url,
+            callback=self.parse,
+            headers=headers,
+            cookies=self.cookies,
+            # cookies={
+            #     "lc-main": "en_US",             
+            #     "i18n-prefs": "USD",      
+            #     "locale": "en_US",       
+            # },
+            dont_filter=True,
+            errback=self.errback_handler,
+            priority=self.priorities.get(url, 0),
+        )
+
+    def _next_urls(self):
+        """프론티어 모드면 다음 배치를 임대, 아니면 전체 URL (체크포인트 완료분 제외)"""
+        if self.frontier is None:
+            if self.checkpoint is None:
+                return self.urls
+            urls = self.checkpoint.pending if self.checkpoint.pending is not None else self.urls
+            return [url for url in urls if not self.checkpoint.is_done(url)]
+        asins = self.frontier.lease(self.worker, self.lease_size)
+        return [f'https://www.amazon.com/dp/{asin}' for asin in asins]
+
+    def spider_idle(self, spider):
+        if self.frontier is None:
+            return
+        urls = self._next_urls()
+        for url in urls:
+            self.crawler.engine.crawl(self.make_product_request(url))
+        # 다른 워커가 임대 중인 ASIN 이 남아 있으면 만료(재임대)될 때까지 대기
+        if urls or self.frontier.counts()['leased']:
+            raise DontCloseSpider
+
+    def closed(self, reason):
+        # dataToReturn 파싱 방식별 횟수 (js2py 대체가 늘면 자체 파서 보완 필요)
+        for method, count in data_to_return_stats.items():
+            self.crawler.stats.set_value(f'data_to_return/{method}', count)
+        if self.fingerprints is not None:
+            self.fingerprints.close()
+        if self.extract_pool is not None:
+            self.extract_pool.close()
+        if self.frontier is not None:
+            released = self.frontier.release(self.worker)
+            self.logger.info(f"프론티어 종료: 미완료 {released}개 반환, 상태 {self.frontier.counts()}")
+            self.frontier.close()
+
+    async def parse(self, response):
         """
         응답 파싱 및 제품 정보 추출
         """
-        time.sleep(random.uniform(1, 2))
         url = response.meta.get('url', response.url)
 
         item = AmazonProductItem()
@@ -136,54 +231,82 @@ class AmazonProductSpider(scrapy.Spider):
         item['url'] = url
         item['last_crawl_datetime'] = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
         item['asin'] = url.split('/')[-1]
-        self.logger.info(f"[asin 디버그] : {item['asin']}")
+        self.logger.info("[asin 디버그] : %s", item['asin'])
 
         # 페이지 유효성 검사
         if check_page_validity(response, self.logger, item) is False:
             self.logger.warning(f"유효하지 않은 페이지: {url}")
             self.processed_count += 1
             return item
-        
+
+        digest = doc = None
+        if self.fingerprints is not None:
+            # 지문은 추출에 쓸 문서로 계산하고, 추출도 같은 문서를 씀 (프로세스 풀이면 워커가 다시 파싱)
+            doc = parse_document(response, self.html_backend)
+            digest = page_fingerprint(doc, self.configs, self.fingerprint_salt)
+            if self.fingerprints.get(item['asin']) == digest:
+                self.crawler.stats.inc_value('fingerprint/unchanged')
+                self.processed_count += 1
+                self.logger.info("변경 없음(지문 일치): %s", url)
+                return AmazonUnchangedItem(
+                    asin=item['asin'],
+                    url=url,
+                    last_crawl_datetime=item['last_crawl_datetime'],
+                    unchanged=True,
+                )
+
         try:
-            item['expand_info'] = {}
-            # 제품명 추출
-            item['product_name'] = extract_product_title(response, self.title_selectors)
-            # 제품 정보 추출
-            combine_basic_expand_extract(response, self.logger, item, self.row_selectors, self.check_list)
-            # 가격 정보 추출
-            item['expand_info'].update(extract_price_info(response, self.logger, self.configs))
-            # 별점, 리뷰수 추출
-            extract_rating_info(response, self.configs, self.logger, item)
-            # 스타일 정보 추출
-            item['style'] = extract_style_info(response, self.logger)
-            # 이미지 URL 추출
-            item['image_url'] = extract_image_url(response, self.logger)
-            # Best Seller 등급 설정
-            set_data_gbn(item, self.logger)
-            # 보드 타입 결정 및 설정
-            board_type = determine_board_type(item, response)
-            set_board_name_and_division(item, board_type)
-            # data to return 객체 추출
-            get_data_to_return(response, item, self.logger)
+            if self.extract_pool is not None:
+                await self.extract_in_pool(response, item)
+            else:
+                extract_product_details(response, item, self.configs, self.logger, self.html_backend, doc)
+
+            # 정상 추출된 경우에만 지문 저장
+            if digest is not None:
+                self.fingerprints.put(item['asin'], digest)
 
         except Exception as e:
             self.logger.error(f"데이터 추출 중 오류: {str(e)}")
             item['error'] = f"데이터 추출 중 오류: {str(e)}"
 
         self.processed_count += 1
-        self.logger.info(f"진행도: {self.processed_count}/{self.total_count}")
-        self.logger.info(f"제품 정보 추출 완료: {item['product_name'] if 'product_name' in item else url}")
+        self.logger.info("진행도: %d/%s", self.processed_count, self.total_count)
+        self.logger.info("제품 정보 추출 완료: %s", item['product_name'] if 'product_name' in item else url)
         return item
 
+    async def extract_in_pool(self, response, item):
+        """프로세스 풀 워커에서 추출 후 결과를 item 에 반영"""
+        fields, elapsed, parse_stats, profile = await maybe_deferred_to_future(
+            self.extract_pool.submit(response, item, profiler.enabled))
+        for key, value in fields.items():
+            item[key] = value
+        data_to_return_stats.update(parse_stats)
+        if profile is not None:
+            profiler.merge(profile)
+
+        stats = self.crawler.stats
+        stats.inc_value('extract_pool/pages')
+        stats.inc_value('extract_pool/worker_seconds', elapsed)
+        stats.max_value('extract_pool/worker_seconds_max', elapsed)
+
     def errback_handler(self, failure):
         item = {}
         # 요청 정보 가져오기
         request = failure.request
         url = request.meta.get('url', request.url)
+
+        # 없는 상품으로 기록된 ASIN (PageCheckMiddleware) 은 item 없이 완료 처리
+        if failure.check(DeadAsin):
+            self.processed_count += 1
+            if self.frontier is not None:
+                self.frontier.complete(url.split('/')[-1])
+            return None
         
-        title = failure.value.response.xpath('//title/text()').get('').lower()
-        self.logger.info(f"요청 실패 title 검사 : {title}")
-        if 'page not found' in title or '404' in title:
+        # HTTP 오류 응답이 있으면 본문 bytes 로 페이지 상태 판별
+        response = getattr(failure.value, 'response', None)
+        status = classify_response(response) if response is not None else None
+        self.logger.info(f"요청 실패 페이지 검사 : {status.value if status else '응답 없음'}")
+        if status is PageStatus.NOT_FOUND or (response is not None and response.status == 404):
             item['url'] = url
             item['error'] = "Page not found or product not available"
             item['asin'] = url.split('/')[-1]
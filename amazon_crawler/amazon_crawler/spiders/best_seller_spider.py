@@ -1,6 +1,7 @@
 # spiders/best_seller_spider.py
 import random
 import json
+import logging
 import time
 from datetime import datetime
 import asyncio
@@ -58,11 +59,11 @@ class bestsellerSpider(scrapy.Spider):
         self.logger.info("▶▶▶ async start() 호출됨")
 
         for url in self.urls:
-            self.logger.info(f"크롤링 시작: {url}")
+            self.logger.info("크롤링 시작: %s", url)
             ua = random.choice(self.user_agents)
             hdrs = self.headers.copy()
             hdrs["User-Agent"] = ua
-            self.logger.debug(f"사용된 User-Agent: {ua}")
+            self.logger.debug("사용된 User-Agent: %s", ua)
             yield scrapy.Request(
                 url,
                 callback=self.parse,
@@ -90,10 +91,9 @@ class bestsellerSpider(scrapy.Spider):
         if len(cards) <= 30:
             self.logger.warning(f"⚠️  예상보다 적은 카드 수: {len(cards)}")
             
-            # 페이지 소스 일부 확인
-            self.logger.info("HTML 구조 확인을 위한 샘플:")
-            sample_html = response.text[:2000]  # 처음 2000자만
-            self.logger.info(f"HTML 샘플: {sample_html}")
+            # 페이지 소스 일부 확인 (DEBUG 일 때만 잘라서 포맷)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("HTML 샘플: %s", response.text[:2000])
 
         for i, card in enumerate(cards, 1):
             item = AmazonProductItem()
@@ -167,7 +167,7 @@ class bestsellerSpider(scrapy.Spider):
 
             # 진행상황 로그 (처음 5개와 마지막 5개만)
             if i <= 5 or i > len(cards) - 5:
-                self.logger.info(f"#{i}: {item['product_name'][:30]}... | 가격: {item['price']} | 리뷰: {item['review_cnt']}")
+                self.logger.info("#%d: %s... | 가격: %s | 리뷰: %s", i, item['product_name'][:30], item['price'], item['review_cnt'])
 
             yield item
 
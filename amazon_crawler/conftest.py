@@ -0,0 +1 @@
+# amazon_crawler 디렉터리를 sys.path 에 두어 tests 에서 utils / amazon_crawler 를 import (scrapy crawl 과 같은 기준)
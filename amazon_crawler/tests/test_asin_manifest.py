@@ -0,0 +1,47 @@
+"""AsinManifest 동시 컴파일 (같은 엑셀을 여러 크롤러가 동시에 읽을 때)"""
+import os
+import threading
+import time
+
+from utils import asin_manifest
+from utils.asin_manifest import AsinManifest
+
+
+def test_concurrent_rebuild_keeps_delta(tmp_path, monkeypatch):
+    workbook = str(tmp_path / 'amazon_review_open.xlsx')
+    rows = {'asins': ['B000000001', 'B000000002']}
+    reads = []
+
+    def read_workbook(path):
+        # 나중에 읽은 로더일수록 늦게 끝나 먼저 컴파일한 결과 위에 다시 컴파일하게 됨
+        reads.append(path)
+        time.sleep(0.2 * len(reads))
+        return list(rows['asins'])
+
+    monkeypatch.setattr(asin_manifest, '_read_workbook', read_workbook)
+    with open(workbook, 'w') as f:
+        f.write('v1')
+    manifest = AsinManifest(workbook)
+    manifest.load()
+    manifest.close()
+
+    with open(workbook, 'w') as f:
+        f.write('v2 - changed')
+    rows['asins'] = ['B000000002', 'B000000003']
+    results = []
+
+    def load():
+        manifest = AsinManifest(workbook)
+        results.append((manifest.load(), manifest.added, manifest.removed))
+        manifest.close()
+
+    loaders = [threading.Thread(target=load) for _ in range(3)]
+    for thread in loaders:
+        thread.start()
+        time.sleep(0.05)
+    for thread in loaders:
+        thread.join()
+
+    assert results == [(['B000000002', 'B000000003'], ['B000000003'], ['B000000001'])] * 3
+    assert len(reads) == 2  # 처음 1번 + 바뀐 엑셀 1번
+    assert os.path.exists(workbook.replace('.xlsx', '.manifest.db'))
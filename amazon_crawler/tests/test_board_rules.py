@@ -0,0 +1,20 @@
+"""보드 재분류 대상 선택 (--mongo --apply 는 --overwrite 없이 미분류 문서만)"""
+from utils.board_rules import skip_reason
+
+
+def doc(board_name):
+    return {'product_name': 'SanDisk Extreme SDXC card', 'expand_info': {}, 'board_name': board_name}
+
+
+def test_keep_classified_skips_only_classified_documents():
+    assert skip_reason(doc('Micro SD'), keep_classified=True) is not None
+    assert skip_reason(doc('BEST_SD'), keep_classified=True) is not None
+    assert skip_reason(doc('Unknown'), keep_classified=True) is None
+    assert skip_reason(doc(None), keep_classified=True) is None
+    # --overwrite 또는 파일 입력
+    assert skip_reason(doc('Micro SD')) is None
+
+
+def test_unclassifiable_documents_are_skipped():
+    assert skip_reason({'product_name': '', 'expand_info': {}}) == 'product_name 없음'
+    assert skip_reason({'product_name': 'x', 'expand_info': None}) == 'expand_info 없음'
@@ -0,0 +1,19 @@
+"""CrawlCheckpoint: 주기 저장 전에 죽어도 기록한 item 은 다음 실행에서 완료로 복원"""
+from utils.checkpoint import CrawlCheckpoint
+
+URLS = [f'https://www.amazon.com/dp/B00000000{n}' for n in range(3)]
+
+
+def test_recorded_items_survive_crash_before_flush(tmp_path):
+    path = str(tmp_path / 'amazon_product')
+    checkpoint = CrawlCheckpoint(path, 'run')
+    checkpoint.load()
+    checkpoint.flush(URLS, 0)  # spider_opened 의 첫 저장
+    checkpoint.record({'asin': 'B000000000', 'url': URLS[0]})
+    checkpoint.record({'asin': 'B000000001', 'url': URLS[1]})
+    # flush / close 없이 프로세스가 죽은 상황: 파일을 닫지 않은 채 새로 읽음
+
+    resumed = CrawlCheckpoint(path, 'run')
+    items = resumed.load()
+    assert [item['asin'] for item in items] == ['B000000000', 'B000000001']
+    assert [url for url in resumed.pending if not resumed.is_done(url)] == URLS[2:]
@@ -0,0 +1,35 @@
+"""프론티어 임대 횟수 제한 (max_attempts 번 임대 후 failed, 정상 반환은 시도로 세지 않음)"""
+from utils.frontier import AsinFrontier
+
+
+def open_frontier(tmp_path, **kwargs):
+    # lease_timeout 이 음수면 임대가 바로 만료됨 (워커가 죽은 것과 같음)
+    frontier = AsinFrontier(str(tmp_path / 'frontier.db'), lease_timeout=-1, **kwargs)
+    frontier.seed(['B000000001', 'B000000002'])
+    return frontier
+
+
+def test_expired_leases_fail_after_max_attempts(tmp_path):
+    frontier = open_frontier(tmp_path, max_attempts=3)
+    frontier.complete('B000000002')
+
+    for worker in ('w1', 'w2', 'w3'):
+        assert frontier.lease(worker) == ['B000000001']
+    assert frontier.lease('w4') == []
+    assert frontier.counts() == {'pending': 0, 'leased': 0, 'done': 1, 'failed': 1}
+    assert frontier.failed() == [('B000000001', 3, 'w3')]
+
+    assert frontier.requeue_failed() == 1
+    assert frontier.lease('w5') == ['B000000001']
+    frontier.close()
+
+
+def test_release_does_not_count_as_attempt(tmp_path):
+    frontier = open_frontier(tmp_path, max_attempts=1)
+    frontier.lease_timeout = 1800
+
+    assert frontier.lease('w1') == ['B000000001', 'B000000002']
+    assert frontier.release('w1') == 2
+    assert frontier.lease('w2') == ['B000000001', 'B000000002']
+    assert frontier.counts()['failed'] == 0
+    frontier.close()
@@ -0,0 +1,53 @@
+"""정규화 이전 재크롤 이력 마이그레이션 (첫 크롤에서 모든 ASIN 이 변경으로 잡히지 않는지)"""
+from crawl_common.normalize import normalize_item
+
+from utils.migrate_normalize import migrate_recrawl_history
+from utils.recrawl_scheduler import RecrawlScheduler, tracked_fields
+
+RAW_ITEM = {
+    'url': 'https://www.amazon.com/dp/B000000001',
+    'expand_info': {
+        'price': '$1,049.99',
+        'rating': '4.7 out of 5 stars',
+        'review_count': '78,520',
+        'Best_Sellers_Rank': '\u200e#12 in Electronics',
+    },
+}
+
+
+def change_count(path, asin):
+    scheduler = RecrawlScheduler(path)
+    row = scheduler.conn.execute('SELECT change_count FROM history WHERE asin = ?', (asin,)).fetchone()
+    scheduler.close()
+    return row[0]
+
+
+def observe(path, item, now):
+    scheduler = RecrawlScheduler(path)
+    scheduler.observe('B000000001', tracked_fields(item), now=now)
+    scheduler.close()
+
+
+def test_migrated_history_matches_normalized_crawl(tmp_path):
+    path = str(tmp_path / 'recrawl.db')
+    observe(path, RAW_ITEM, now=1000)
+
+    assert migrate_recrawl_history(path)[1] == 1  # 보고만
+    scanned, changed, fields = migrate_recrawl_history(path, apply=True)
+    assert (scanned, changed) == (1, 1)
+    assert set(fields) == {'price', 'rating', 'review_count', 'Best_Sellers_Rank'}
+    # 두 번째 실행은 바꿀 것이 없음
+    assert migrate_recrawl_history(path, apply=True)[1] == 0
+
+    normalized = normalize_item({'url': RAW_ITEM['url'], 'expand_info': dict(RAW_ITEM['expand_info'])})
+    observe(path, normalized, now=2000)
+    assert change_count(path, 'B000000001') == 0
+
+
+def test_unmigrated_history_counts_change(tmp_path):
+    # 마이그레이션 없이 정규화된 item 을 관측하면 값이 같아도 변경으로 잡힘 (고치려는 문제)
+    path = str(tmp_path / 'recrawl.db')
+    observe(path, RAW_ITEM, now=1000)
+    normalized = normalize_item({'url': RAW_ITEM['url'], 'expand_info': dict(RAW_ITEM['expand_info'])})
+    observe(path, normalized, now=2000)
+    assert change_count(path, 'B000000001') == 1
@@ -0,0 +1,104 @@
+"""PageCheckMiddleware 조기 중단 (Content-Length 없는 chunked 응답, 로컬 서버 + scrapy runspider)"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROBOT_HEAD = (b'<html><head><title>Amazon.com</title></head><body>'
+              b'<p>Enter the characters you see below</p><form action="/errors/validateCaptcha">')
+FILLER = b'<div>' + b'x' * 10 * 1024 + b'</div>'
+FILLER_CHUNKS = 200
+
+SPIDER = '''
+import json
+import scrapy
+
+
+class ChunkedSpider(scrapy.Spider):
+    name = 'chunked'
+    custom_settings = {
+        'DOWNLOADER_MIDDLEWARES': {'amazon_crawler.middlewares.PageCheckMiddleware': 440},
+        'PAGE_CHECK_RETRY_TIMES': 0,
+        'PAGE_CHECK_DEAD_DB': None,
+        'RETRY_ENABLED': False,
+        'ROBOTSTXT_OBEY': False,
+        'TELNETCONSOLE_ENABLED': False,
+    }
+
+    def start_requests(self):
+        yield scrapy.Request(self.url)
+
+    def parse(self, response):
+        self.body_length = len(response.body)
+        self.flags = response.flags
+
+    def closed(self, reason):
+        stats = self.crawler.stats.get_stats()
+        with open(self.out, 'w') as f:
+            json.dump({
+                'body_length': getattr(self, 'body_length', None),
+                'flags': getattr(self, 'flags', None),
+                'stopped': stats.get('page_check/stopped_downloads', 0),
+                'bytes_saved': stats.get('page_check/bytes_saved', 0),
+                'robot_check': stats.get('page_check/robot_check', 0),
+            }, f)
+'''
+
+
+class ChunkedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for chunk in [ROBOT_HEAD] + [FILLER] * FILLER_CHUNKS:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                self.wfile.flush()
+                time.sleep(0.005)
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 다운로드를 중단함
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ChunkedHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}/dp/B000000001'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_stops_chunked_robot_check_download(server, tmp_path):
+    spider = tmp_path / 'chunked_spider.py'
+    spider.write_text(SPIDER)
+    out = tmp_path / 'result.json'
+    # tmp_path 에는 scrapy.cfg 가 없으므로 프로젝트 설정 없이 위 custom_settings 만 적용됨
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get('PYTHONPATH')])))
+    env.pop('SCRAPY_SETTINGS_MODULE', None)
+    subprocess.run(
+        [sys.executable, '-m', 'scrapy', 'runspider', str(spider), '-a', f'url={server}', '-a', f'out={out}'],
+        cwd=tmp_path, env=env, check=True, capture_output=True, timeout=120,
+    )
+    result = json.loads(out.read_text())
+
+    assert result['robot_check'] == 1
+    assert result['stopped'] == 1
+    assert 'download_stopped' in result['flags']
+    assert result['body_length'] < len(FILLER) * FILLER_CHUNKS // 10
+    # 길이를 모르므로 아낀 바이트는 세지 않음
+    assert result['bytes_saved'] == 0
@@ -0,0 +1,64 @@
+"""페이지 지문이 추출기가 읽는 값의 변경만 잡는지 (bench_fixtures 상품 페이지)"""
+import gzip
+import json
+import os
+
+import pytest
+from scrapy.http import HtmlResponse
+
+from utils.html_backend import LexborHTMLParser, parse_document
+from utils.page_fingerprint import page_fingerprint
+from utils.selector_plan import compile_selectors
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(PROJECT_DIR, 'utils', 'bench_fixtures', 'pages', 'B09VLK9W3S.html.gz')
+LIST_PRICE = b'<span class="a-price a-text-price"><span class="a-offscreen">$199.99</span>'
+
+BACKENDS = ['parsel', pytest.param('selectolax', marks=pytest.mark.skipif(
+    LexborHTMLParser is None, reason='selectolax 미설치'))]
+
+
+@pytest.fixture(scope='module')
+def configs():
+    with open(os.path.join(PROJECT_DIR, 'config', 'selectors.json'), encoding='utf-8') as f:
+        return compile_selectors(json.load(f))
+
+
+@pytest.fixture(scope='module')
+def body():
+    with gzip.open(PAGE, 'rb') as f:
+        body = f.read()
+    assert body.count(LIST_PRICE) == 1
+    return body
+
+
+def fingerprint(body, configs, backend):
+    response = HtmlResponse('https://www.amazon.com/dp/B09VLK9W3S', body=body, encoding='utf-8')
+    return page_fingerprint(parse_document(response, backend), configs, 'salt')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_same_page_same_fingerprint(body, configs, backend):
+    assert fingerprint(body, configs, backend) == fingerprint(body, configs, backend)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_list_price_change_detected(body, configs, backend):
+    # 정가는 고정 id 영역 밖(aok-align-center)에 있어 이전 지문으로는 잡히지 않던 변경
+    changed = body.replace(LIST_PRICE, LIST_PRICE.replace(b'$199.99', b'$189.99'))
+    assert fingerprint(changed, configs, backend) != fingerprint(body, configs, backend)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_unread_region_change_ignored(body, configs, backend):
+    changed = body.replace(b'</body>', b'<div id="rhf"><a href="/related">Related items 42</a></div></body>')
+    assert changed != body
+    assert fingerprint(changed, configs, backend) == fingerprint(body, configs, backend)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_data_to_return_change_detected(body, configs, backend):
+    assert b'dataToReturn' in body
+    changed = body.replace(b'num_total_variations : 3', b'num_total_variations : 4', 1)
+    assert changed != body
+    assert fingerprint(changed, configs, backend) != fingerprint(body, configs, backend)
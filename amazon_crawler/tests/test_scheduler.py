@@ -0,0 +1,49 @@
+"""DelayedRetryScheduler 대기 요청 게이지 (scheduler/delayed_pending, crawler_delayed_requests)"""
+import time
+
+import pytest
+from scrapy import Request, Spider
+from scrapy.utils.reactor import install_reactor, is_reactor_installed
+from scrapy.utils.test import get_crawler
+
+from amazon_crawler.extensions import CrawlMetrics
+from amazon_crawler.scheduler import DelayedRetryScheduler
+
+
+def delayed_metric(crawler):
+    # 엔드포인트 없이 지표 목록만 (collect 와 같은 stats 사용)
+    metrics = CrawlMetrics(crawler, '127.0.0.1', [0], 5.0, 60.0).extra_metrics(crawler.stats.get_stats())
+    return next(samples[0][1] for name, _, _, samples in metrics if name == 'crawler_delayed_requests')
+
+
+@pytest.fixture
+def reactor():
+    # get_crawler 는 설치된 reactor 가 필요 (프로젝트 기본값과 같은 asyncio reactor)
+    if not is_reactor_installed():
+        install_reactor('twisted.internet.asyncioreactor.AsyncioSelectorReactor')
+
+
+def test_delayed_pending_follows_held_requests(reactor):
+    crawler = get_crawler(Spider, {'SCHEDULER': 'amazon_crawler.scheduler.DelayedRetryScheduler'})
+    spider = Spider('test')
+    crawler.spider = spider
+    scheduler = DelayedRetryScheduler.from_crawler(crawler)
+    scheduler.open(spider)
+
+    first = Request('https://www.amazon.com/dp/B000000001', meta={'not_before': time.monotonic() + 60})
+    second = Request('https://www.amazon.com/dp/B000000002', meta={'not_before': time.monotonic() + 60})
+    scheduler.enqueue_request(first)
+    scheduler.enqueue_request(second)
+    scheduler.enqueue_request(Request('https://www.amazon.com/dp/B000000003'))  # 바로 큐로
+    assert crawler.stats.get_value('scheduler/delayed_pending') == 2
+    assert delayed_metric(crawler) == 2
+
+    # 타이머가 끝난 것처럼 하나를 풀어 줌
+    scheduler.held[first].cancel()
+    scheduler._release(first)
+    assert crawler.stats.get_value('scheduler/delayed_pending') == 1
+    assert crawler.stats.get_value('scheduler/delayed_max') == 2
+
+    scheduler.close('finished')
+    assert crawler.stats.get_value('scheduler/delayed_pending') == 0
+    assert delayed_metric(crawler) == 0
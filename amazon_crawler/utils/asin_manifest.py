@@ -0,0 +1,110 @@
+"""
+ASIN 매니페스트 캐시
+
+엑셀(amazon_review_open.xlsx)을 매번 pandas 로 읽는 대신, 정렬·중복제거된 ASIN 목록을
+SQLite 파일에 컴파일해 두고 재사용한다. 캐시 키는 엑셀의 mtime/크기와 sha256 이며,
+내용이 바뀐 엑셀이 들어오면 이전 매니페스트 대비 추가/삭제된 ASIN 을 함께 기록한다.
+
+사용 예 (amazon_crawler 디렉터리에서):
+    python -m utils.asin_manifest ./data/amazon_review_open.xlsx
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+
+
+class AsinManifest:
+    def __init__(self, workbook, cache_path=None):
+        self.workbook = workbook
+        self.cache_path = cache_path or os.path.splitext(workbook)[0] + '.manifest.db'
+        # 트랜잭션은 load() 에서 직접 연다 (다른 프로세스가 다시 컴파일하는 동안은 락을 기다림)
+        self.conn = sqlite3.connect(self.cache_path, timeout=300, isolation_level=None)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS manifest (asin TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS delta (asin TEXT PRIMARY KEY, change TEXT NOT NULL) WITHOUT ROWID;
+        """)
+
+    def load(self):
+        """정렬된 ASIN 목록 반환 (엑셀이 바뀐 경우에만 다시 컴파일)"""
+        stat = os.stat(self.workbook)
+        stamp = f'{stat.st_mtime_ns}:{stat.st_size}'
+        if self._meta('stamp') != stamp:
+            # 확인부터 다시 컴파일까지 한 쓰기 트랜잭션으로 묶고, 락을 잡은 뒤 키를 다시 확인한다.
+            # 동시에 뜬 크롤러가 같은 엑셀로 두 번 컴파일하면 두 번째가 delta 를 비워 버린다.
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                if self._meta('stamp') != stamp:
+                    digest = _sha256(self.workbook)
+                    if self._meta('sha256') != digest:
+                        self._rebuild(_read_workbook(self.workbook), digest)
+                    self._set_meta('stamp', stamp)
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        return [row[0] for row in self.conn.execute('SELECT asin FROM manifest ORDER BY asin')]
+
+    @property
+    def added(self):
+        """직전 엑셀 대비 새로 추가된 ASIN"""
+        return self._delta('added')
+
+    @property
+    def removed(self):
+        """직전 엑셀 대비 빠진 ASIN"""
+        return self._delta('removed')
+
+    def close(self):
+        self.conn.close()
+
+    def _rebuild(self, asins, digest):
+        previous = {row[0] for row in self.conn.execute('SELECT asin FROM manifest')}
+        current = set(asins)
+        first_build = self._meta('sha256') is None
+
+        self.conn.execute('DELETE FROM manifest')
+        self.conn.executemany('INSERT INTO manifest (asin) VALUES (?)', ((a,) for a in sorted(current)))
+        self.conn.execute('DELETE FROM delta')
+        if not first_build:
+            self.conn.executemany(
+                'INSERT INTO delta (asin, change) VALUES (?, ?)',
+                [(a, 'added') for a in current - previous] + [(a, 'removed') for a in previous - current],
+            )
+        self._set_meta('sha256', digest)
+
+    def _delta(self, change):
+        return [row[0] for row in self.conn.execute(
+            'SELECT asin FROM delta WHERE change = ? ORDER BY asin', (change,)
+        )]
+
+    def _meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_workbook(path):
+    # pandas 는 캐시가 무효일 때만 import
+    import pandas as pd
+
+    df = pd.read_excel(path, usecols=['ASIN', 'DATA_GBN'])
+    df = df[df['DATA_GBN'] != 'DELETE']
+    return df['ASIN'].dropna().astype(str).str.strip().unique().tolist()
+
+
+if __name__ == '__main__':
+    manifest = AsinManifest(sys.argv[1])
+    asins = manifest.load()
+    print(f'ASIN {len(asins)}개 (추가 {len(manifest.added)}개, 삭제 {len(manifest.removed)}개)')
@@ -0,0 +1,176 @@
+"""
+벤치마크 고정 코퍼스 크기 맞추기
+
+pages/*.html.gz 의 상품 페이지는 추출기가 읽는 상품 영역만 손으로 만든 합성 페이지라 실제 상세 페이지
+(수백 KB ~ 1MB 이상)보다 훨씬 작다. 실제 페이지처럼 head 의 인라인 CSS/스크립트/상태 JSON,
+상단 내비게이션, 추천 캐러셀, A+ 비교표, 리뷰, 하단 링크를 덧붙여 페이지마다 목표 크기로 늘린다.
+덧붙인 부분은 <!--bulk--> ... <!--/bulk--> 사이에 두므로 다시 실행하면 새로 만든다.
+내용은 ASIN 으로 시드를 고정해 만들므로 같은 입력이면 같은 파일이 나온다.
+
+덧붙이는 부분은 추출 결과를 바꾸지 않아야 한다: 로봇 체크/없는 페이지 문구, dataToReturn,
+추출기 선택자가 고르는 id/클래스(a-text-bold, a-price, aok-align-center 등)는 쓰지 않는다.
+(bench_helper_parse --parity 와 추출 결과 비교로 확인)
+
+사용 예 (amazon_crawler 디렉터리에서):
+    python -m utils.bench_fixtures.page_bulk
+    python -m utils.bench_fixtures.page_bulk --min-kb 700 --max-kb 1300
+"""
+import argparse
+import gzip
+import os
+import random
+import re
+import sys
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+_BULK = re.compile(r'<!--bulk-->.*?<!--/bulk-->\n?', re.DOTALL)
+_OLD_FILLER = re.compile(r'<div class="a-section filler">.*?</div>\n', re.DOTALL)
+
+WORDS = (
+    'storage drive portable fast transfer speed compact design durable travel backup photos videos '
+    'files compatible laptop desktop tablet phone camera gaming console reliable performance quality '
+    'warranty support shipping delivery return policy easy setup plug play secure encryption password '
+    'shock resistant lightweight pocket size capacity read write sequential random cache controller '
+    'firmware update temperature cooling aluminum housing cable connector adapter bundle package '
+    'customer review rating helpful report verified purchase recommend value price great good works'
+).split()
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def head_bulk(rng, target):
+    parts = []
+    size = 0
+    n = 0
+    while size < target:
+        kind = n % 3
+        if kind == 0:
+            rules = ''.join(
+                f'.a-{rng.choice(WORDS)}-{i}{{margin:{rng.randint(0, 24)}px {rng.randint(0, 24)}px;'
+                f'color:#{rng.randrange(0x1000000):06x};font-size:{rng.randint(11, 28)}px}}'
+                for i in range(rng.randint(40, 120)))
+            part = f'<style type="text/css">{rules}</style>\n'
+        elif kind == 1:
+            body = ';'.join(
+                f'P.when("{rng.choice(WORDS)}","{rng.choice(WORDS)}").execute(function(a,b){{'
+                f'a.register("{rng.choice(WORDS)}{i}",{{w:{rng.randint(0, 9999)},t:"{words(rng, 6)}"}})}})'
+                for i in range(rng.randint(20, 60)))
+            part = f'<script type="text/javascript">{body}</script>\n'
+        else:
+            state = ','.join(
+                f'"{rng.choice(WORDS)}{i}":{{"id":"{rng.randrange(10 ** 9)}","label":"{words(rng, 4)}",'
+                f'"enabled":{rng.choice(["true", "false"])}}}'
+                for i in range(rng.randint(30, 90)))
+            part = f'<script type="a-state" data-a-state=\'{{"key":"{rng.choice(WORDS)}-{n}"}}\'>{{{state}}}</script>\n'
+        parts.append(part)
+        size += len(part)
+        n += 1
+    return ''.join(parts)
+
+
+def nav_bulk(rng):
+    links = ''.join(
+        f'<li class="nav-item"><a class="nav-link" href="/b/?node={rng.randrange(10 ** 8)}">{words(rng, 2).title()}</a></li>'
+        for _ in range(rng.randint(250, 400)))
+    return (f'<header id="navbar-main"><div id="nav-belt"><div id="nav-search"><form role="search">'
+            f'<input type="text" name="field-keywords"></form></div></div>'
+            f'<div id="nav-main"><ul class="nav-menu">{links}</ul></div></header>\n')
+
+
+def carousel(rng, index):
+    cards = []
+    for _ in range(rng.randint(12, 24)):
+        asin = 'B0' + ''.join(rng.choice('0123456789ABCDEFGHJKLMNPQRSTUVWXYZ') for _ in range(8))
+        cards.append(
+            f'<li class="a-carousel-card"><div class="p13n-sc-uncoverable-faceout" data-asin="{asin}">'
+            f'<a class="a-link-normal" href="/dp/{asin}"><img alt="{words(rng, 5)}" '
+            f'src="https://m.media-amazon.com/images/I/{asin}._AC_UL160_.jpg" height="160" width="160"></a>'
+            f'<div class="p13n-sc-truncate-desktop-type2">{words(rng, rng.randint(8, 18))}</div>'
+            f'<div class="a-row"><i class="a-icon a-icon-star-small"></i><span class="a-size-small">'
+            f'{rng.randint(10, 90000):,}</span></div>'
+            f'<div class="a-row"><span class="p13n-sc-price">${rng.randint(5, 400)}.{rng.randint(0, 99):02d}</span>'
+            f'</div></div></li>')
+    return (f'<div id="sims-carousel-{index}" class="a-carousel-container"><h2 class="a-carousel-heading">'
+            f'{words(rng, 5).title()}</h2><ol class="a-carousel">{"".join(cards)}</ol></div>\n')
+
+
+def aplus(rng):
+    blocks = []
+    for i in range(rng.randint(4, 8)):
+        blocks.append(
+            f'<div class="aplus-module module-{i}"><div class="aplus-module-wrapper">'
+            f'<img alt="" src="https://m.media-amazon.com/images/S/aplus-media/{rng.randrange(10 ** 12)}.jpg">'
+            f'<h3 class="aplus-h3">{words(rng, 4).title()}</h3><p class="aplus-p1">{words(rng, rng.randint(40, 90))}</p>'
+            f'</div></div>')
+    rows = ''.join(
+        '<tr>' + ''.join(f'<td class="aplus-cell"><p>{words(rng, 3)}</p></td>' for _ in range(5)) + '</tr>'
+        for _ in range(rng.randint(8, 14)))
+    blocks.append(f'<div class="aplus-module comparison-table"><table class="aplus-comparison">{rows}</table></div>')
+    return f'<div id="aplus_feature_div"><div id="aplus">{"".join(blocks)}</div></div>\n'
+
+
+def reviews(rng):
+    items = []
+    for i in range(rng.randint(8, 12)):
+        items.append(
+            f'<div id="R{rng.randrange(10 ** 12)}" class="review aok-relative" data-hook="review">'
+            f'<div class="a-profile-content"><span class="a-profile-name">{words(rng, 2).title()}</span></div>'
+            f'<i data-hook="review-star-rating" class="a-icon a-icon-star-small"></i>'
+            f'<span data-hook="review-title">{words(rng, 6)}</span>'
+            f'<span data-hook="review-date">Reviewed in the United States on {rng.choice(["May", "June", "July"])} {rng.randint(1, 28)}, 2025</span>'
+            f'<div data-hook="review-collapsed"><span>{words(rng, rng.randint(80, 240))}</span></div>'
+            f'<span data-hook="helpful-vote-statement">{rng.randint(1, 900)} people found this helpful</span></div>')
+    return f'<div id="cm-cr-dp-review-list">{"".join(items)}</div>\n'
+
+
+def footer(rng):
+    columns = ''.join(
+        f'<div class="navFooterLinkCol"><div class="navFooterColHead">{words(rng, 3).title()}</div><ul>'
+        + ''.join(f'<li><a href="/gp/help/{rng.randrange(10 ** 6)}">{words(rng, 3).title()}</a></li>' for _ in range(12))
+        + '</ul></div>' for _ in range(8))
+    return f'<div id="navFooter" class="navLeftFooter">{columns}</div>\n'
+
+
+def add_bulk(html, asin, target):
+    """html(str) 에 bulk 를 덧붙여 대략 target 바이트로 만든 문자열"""
+    html = _OLD_FILLER.sub('', _BULK.sub('', html))
+    if 'id="productTitle"' not in html:
+        return html  # 없는 페이지 등 상품 페이지가 아니면 그대로 (실제로도 작음)
+    rng = random.Random(asin)
+    body_top = nav_bulk(rng)
+    body_bottom = ''.join(carousel(rng, i) for i in range(rng.randint(3, 5))) + aplus(rng) + reviews(rng) + footer(rng)
+    remaining = max(target - len(html) - len(body_top) - len(body_bottom), 0)
+    head = head_bulk(rng, remaining)
+    html = html.replace('</head>', f'<!--bulk-->\n{head}<!--/bulk-->\n</head>', 1)
+    html = html.replace('<body>', f'<body>\n<!--bulk-->\n{body_top}<!--/bulk-->', 1)
+    return html.replace('</body>', f'<!--bulk-->\n{body_bottom}<!--/bulk-->\n</body>', 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='벤치마크 고정 코퍼스를 실제 상세 페이지 크기로 맞춤')
+    parser.add_argument('--pages', default=PAGES)
+    parser.add_argument('--min-kb', type=int, default=700)
+    parser.add_argument('--max-kb', type=int, default=1300)
+    args = parser.parse_args(argv)
+
+    for name in sorted(os.listdir(args.pages)):
+        if not name.endswith('.html.gz'):
+            continue
+        path = os.path.join(args.pages, name)
+        with gzip.open(path, 'rb') as f:
+            html = f.read().decode('utf-8')
+        asin = name.split('.')[0]
+        target = random.Random(asin).randint(args.min_kb, args.max_kb) * 1024
+        html = add_bulk(html, asin, target)
+        # mtime=0 으로 써서 내용이 같으면 파일도 같게
+        with gzip.GzipFile(path, 'wb', compresslevel=9, mtime=0) as f:
+            f.write(html.encode('utf-8'))
+        print(f'{name}: {len(html) // 1024} KB (압축 {os.path.getsize(path) // 1024} KB)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""
+helper_parse 추출기 마이크로벤치마크
+
+저장된 상품 페이지 코퍼스(HTML 파일 디렉터리 또는 ResponseStore)를 대상으로
+추출기별 페이지당 시간, 메모리 할당량, 전체 체인의 pages/sec 를 측정한다.
+--backend 로 HTML 파서 백엔드(parsel / selectolax)를 여러 개 주면 같은 코퍼스에서
+백엔드별 파싱+추출 시간을 비교하고, 백엔드 간 추출 결과가 다른 페이지 수도 보여 준다.
+기준선(baseline)을 저장해 두고 --compare 로 비교하면 허용 범위를 넘게 느려진
+추출기가 있을 때 종료 코드 1 로 실패한다. 절대 시간은 머신마다 다르므로, 실행할 때마다 같은
+머신에서 추출 코드와 무관한 기준 작업(reference_seconds)을 번갈아 재고, 추출기 시간을 그 값으로
+나눈 비율(ratio)끼리 비교한다. 그래서 다른 머신에서 저장한 기준선으로도 --compare 할 수 있다.
+느려진 항목이 있으면 그 백엔드를 --retries 번까지 다시 재서 항목별 최소 비율로 판단하므로,
+공유 VM 처럼 측정 잡음이 큰 곳에서도 일시적인 지연으로는 실패하지 않는다.
+(CPU 세대/캐시 크기가 크게 다르면 비율도 조금 달라지므로 그런 머신에서는 --tolerance 를 넉넉히 준다)
+--parity 는 시간 측정 없이 parsel 과 selectolax 의 추출 결과만 비교해, 다른 필드가 있으면
+페이지/필드별로 보여 주고 종료 코드 1 로 실패한다 (선택자/백엔드 변경 후 확인용).
+
+--corpus / --store 를 주지 않으면 커밋된 고정 코퍼스(utils/bench_fixtures/pages, 실제 상세 페이지
+크기의 합성 상품 페이지 .html.gz, utils/bench_fixtures/page_bulk.py 로 크기를 맞춤)와
+그 기준선(utils/bench_fixtures/helper_parse_baseline.json)을 쓴다.
+
+사용 예 (amazon_crawler 디렉터리에서):
+    python -m utils.bench_helper_parse --compare --backend parsel --backend selectolax
+    python -m utils.bench_helper_parse --parity
+    python -m utils.bench_helper_parse --corpus ./data/bench/pages --baseline ./data/bench/baseline.json --save-baseline
+    python -m utils.bench_helper_parse --store ./data/response_store --compare
+    python -m utils.bench_helper_parse --corpus ./data/bench/pages --backend parsel --backend selectolax
+"""
+import argparse
+import copy
+import gzip
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from lxml import etree
+from scrapy.http import HtmlResponse
+
+from utils import helper_parse
+from utils.html_backend import BACKENDS, parse_document, resolve_backend
+from utils.selector_plan import compile_selectors
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_fixtures')
+DEFAULT_CORPUS = os.path.join(FIXTURES, 'pages')
+DEFAULT_BASELINE = os.path.join(FIXTURES, 'helper_parse_baseline.json')
+
+logger = logging.getLogger('bench_helper_parse')
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+
+
+def load_corpus(corpus_dir=None, store_dir=None, limit=None):
+    """(url, body) 목록 반환"""
+    pages = []
+    if corpus_dir:
+        for name in sorted(os.listdir(corpus_dir)):
+            path = os.path.join(corpus_dir, name)
+            if name.endswith('.html.gz'):
+                with gzip.open(path, 'rb') as f:
+                    body = f.read()
+            elif name.endswith('.html'):
+                with open(path, 'rb') as f:
+                    body = f.read()
+            else:
+                continue
+            asin = name.split('.')[0]
+            pages.append((f'https://www.amazon.com/dp/{asin}', body))
+    if store_dir:
+        from utils.response_store import ResponseStore
+
+        store = ResponseStore(store_dir)
+        for url in store.urls():
+            if '/dp/' in url:
+                status, _, body = store.get(url)
+                if status == 200:
+                    pages.append((url, body))
+        store.close()
+    return pages[:limit] if limit else pages
+
+
+def make_response(url, body):
+    return HtmlResponse(url=url, body=body, encoding='utf-8')
+
+
+def new_item(url):
+    return {'url': url, 'asin': url.split('/')[-1], 'expand_info': {}}
+
+
+def build_cases(config):
+    """추출기 이름 -> (doc, item) 을 받아 실행하는 함수 (doc: html_backend Document)"""
+    return {
+        'check_page_validity': lambda d, item: helper_parse.check_page_validity(d.response, logger, item),
+        'extract_product_title': lambda d, item: helper_parse.extract_product_title(d, config['title_selectors']),
+        'combine_basic_expand_extract': lambda d, item: helper_parse.combine_basic_expand_extract(
+            d, logger, item, config['row_selectors'], config['check_list']),
+        'get_data_to_return': lambda d, item: helper_parse.get_data_to_return(d.response, item, logger),
+        'extract_price_info': lambda d, item: helper_parse.extract_price_info(d, logger, config),
+        'extract_rating_info': lambda d, item: helper_parse.extract_rating_info(d, config, logger, item),
+        'determine_board_type': lambda d, item: helper_parse.determine_board_type(item, d),
+    }
+
+
+# 기준 작업: 범용 XPath (선택자 설정과 무관)
+_REFERENCE_XPATH = etree.XPath('count(//*[@id]) + count(//a[@href]) + string-length(string(//body))')
+
+
+def reference_seconds(pages):
+    """머신 속도 기준 작업을 코퍼스에 한 번 실행한 시간(초)
+
+    추출 코드와 무관한 고정 작업(lxml 파싱, 범용 XPath, 본문 바이트 검색)이라 추출기를 바꿔도
+    값이 변하지 않고, 머신/부하에 따라서만 추출기 시간과 같이 변한다.
+    """
+    parser = etree.HTMLParser()
+    start = time.process_time()
+    for _, body in pages:
+        _REFERENCE_XPATH(etree.fromstring(body, parser))
+        body.lower().count(b'amazon')
+    return time.process_time() - start
+
+
+def measure(run_once, pages, repeat, rounds=1):
+    """run_once() (코퍼스 rounds 바퀴 시간, 초) 를 repeat 번 재되, 매번 바로 앞에 기준 작업도 잰다
+
+    반환: (페이지당 ms, 기준 작업 대비 비율) - 둘 다 repeat 중 최솟값 기준.
+    같은 머신에서 번갈아 재므로 비율은 머신 속도나 실행 중 부하 변화에 거의 영향받지 않는다.
+    시간은 프로세스 CPU 시간(time.process_time)이라 다른 프로세스에 CPU 를 뺏긴 시간은 빠진다.
+    """
+    runs, references = [], []
+    for _ in range(repeat):
+        references.append(reference_seconds(pages))
+        runs.append(run_once() / rounds)
+    return round(min(runs) / len(pages) * 1000, 4), round(min(runs) / min(references), 4)
+
+
+# 한 번 잴 때 최소 실행 시간(초), 빠른 추출기는 코퍼스를 여러 바퀴 돌려 타이머/스케줄링 잡음을 줄임
+MIN_RUN_SECONDS = 0.05
+
+
+def bench_function(fn, docs, items, pages, repeat):
+    """페이지당 시간(ms), 기준 작업 대비 비율, 평균 할당 피크(KB)"""
+    rounds = 1
+
+    def run_once():
+        work = [copy.deepcopy(item) for _ in range(rounds) for item in items]
+        start = time.process_time()
+        for doc, item in zip(docs * rounds, work):
+            fn(doc, item)
+        return time.process_time() - start
+
+    rounds = max(1, int(MIN_RUN_SECONDS / max(run_once(), 1e-6)))
+    ms, ratio = measure(run_once, pages, repeat, rounds)
+
+    peaks = []
+    tracemalloc.start()
+    for doc, item in zip(docs, [copy.deepcopy(item) for item in items]):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn(doc, item)
+        peaks.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    tracemalloc.stop()
+    return {'ms_per_page': ms, 'ratio': ratio, 'alloc_kb_per_page': round(statistics.mean(peaks), 1)}
+
+
+def run(pages, config, repeat=15, backend='parsel'):
+    results = {}
+
+    # DOM 파싱 (parsel selector / lexbor 트리 생성) 비용, response 가 파싱 결과를 캐시하므로 매번 새로 만듦
+    parsed = []
+    rounds = 1
+
+    def parse_once():
+        elapsed = 0
+        for _ in range(rounds):
+            responses = [make_response(url, body) for url, body in pages]
+            start = time.process_time()
+            docs = [parse_document(response, backend) for response in responses]
+            elapsed += time.process_time() - start
+            parsed[:] = [(responses, docs)]
+        return elapsed
+
+    rounds = max(1, int(MIN_RUN_SECONDS / max(parse_once(), 1e-6)))
+    ms, ratio = measure(parse_once, pages, repeat, rounds)
+    results['parse_dom'] = {'ms_per_page': ms, 'ratio': ratio, 'alloc_kb_per_page': None}
+    responses, docs = parsed[0]
+
+    # determine_board_type 은 추출이 끝난 item 이 필요
+    items = []
+    for (url, _), response in zip(pages, responses):
+        item = new_item(url)
+        try:
+            helper_parse.extract_product_details(response, item, config, logger, backend)
+        except Exception:
+            pass
+        items.append(item)
+    empty_items = [new_item(url) for url, _ in pages]
+
+    for name, fn in build_cases(config).items():
+        base_items = items if name == 'determine_board_type' else empty_items
+        results[name] = bench_function(fn, docs, base_items, pages, repeat)
+
+    # 전체 체인: 매번 새 response 로 파싱부터 측정
+    def chain_once():
+        start = time.process_time()
+        for url, body in pages:
+            response = make_response(url, body)
+            item = new_item(url)
+            if helper_parse.check_page_validity(response, logger, item):
+                try:
+                    helper_parse.extract_product_details(response, item, config, logger, backend)
+                except Exception:
+                    pass
+        return time.process_time() - start
+
+    ms, ratio = measure(chain_once, pages, repeat)
+    results['full_chain'] = {
+        'ms_per_page': ms,
+        'ratio': ratio,
+        'pages_per_sec': round(1000 / ms, 2),
+        'alloc_kb_per_page': None,
+    }
+    return results, items
+
+
+def count_mismatches(items_by_backend):
+    """첫 백엔드 기준으로 추출 결과가 다른 페이지 수"""
+    backends = list(items_by_backend)
+    reference = items_by_backend[backends[0]]
+    return {
+        backend: sum(a != b for a, b in zip(reference, items_by_backend[backend]))
+        for backend in backends[1:]
+    }
+
+
+def extract_items(pages, config, backend):
+    items = []
+    for url, body in pages:
+        response = make_response(url, body)
+        item = new_item(url)
+        if helper_parse.check_page_validity(response, logger, item):
+            helper_parse.extract_product_details(response, item, config, logger, backend)
+        items.append(item)
+    return items
+
+
+def diff_items(a, b):
+    """두 item 에서 값이 다른 필드 (expand_info 는 'expand_info.키')"""
+    fields = []
+    for key in sorted(set(a) | set(b)):
+        if key == 'expand_info' and isinstance(a.get(key), dict) and isinstance(b.get(key), dict):
+            fields += [f'expand_info.{k}' for k in sorted(set(a[key]) | set(b[key])) if a[key].get(k) != b[key].get(k)]
+        elif a.get(key) != b.get(key):
+            fields.append(key)
+    return fields
+
+
+def check_parity(pages, config, backends=BACKENDS):
+    """[(url, 백엔드, 다른 필드 목록)] - 첫 백엔드 기준"""
+    items_by_backend = {backend: extract_items(pages, config, backend) for backend in backends}
+    reference = items_by_backend[backends[0]]
+    mismatches = []
+    for backend in backends[1:]:
+        for (url, _), a, b in zip(pages, reference, items_by_backend[backend]):
+            fields = diff_items(a, b)
+            if fields:
+                mismatches.append((url, backend, fields))
+    return mismatches
+
+
+def compare(results, baseline, tolerance, min_delta=0.0):
+    """기준선 대비 tolerance 비율 이상 느려진 항목 목록 [(항목, 기준선 비율, 현재 비율)]
+
+    절대 시간(ms_per_page)이 아니라 같은 머신의 기준 작업 대비 비율(ratio)끼리 비교한다.
+    아주 빠른 추출기는 잡음만으로도 비율이 크게 흔들리므로, 늘어난 비율이 min_delta 이하면 무시한다.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if not current:
+            continue
+        if current['ratio'] > base['ratio'] * (1 + tolerance) and current['ratio'] - base['ratio'] > min_delta:
+            regressions.append((name, base['ratio'], current['ratio']))
+    return regressions
+
+
+def print_report(results, pages, backend):
+    print(f'[{backend}] 코퍼스 {pages}페이지')
+    print(f"{'extractor':<30}{'ms/page':>12}{'ratio':>10}{'alloc KB/page':>16}")
+    for name, result in results.items():
+        alloc = result['alloc_kb_per_page']
+        print(f"{name:<30}{result['ms_per_page']:>12.3f}{result['ratio']:>10.4f}{alloc if alloc is not None else '-':>16}")
+    print(f"full chain: {results['full_chain']['pages_per_sec']} pages/sec")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='helper_parse 추출기 벤치마크')
+    parser.add_argument('--corpus', help='상품 페이지 HTML(.html/.html.gz) 디렉터리, 파일명은 ASIN (기본: 고정 코퍼스)')
+    parser.add_argument('--store', help='ResponseStore 디렉터리')
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--repeat', type=int, default=15, help='측정 반복 횟수, 항목마다 최솟값 사용')
+    parser.add_argument('--config', default='./config/selectors.json')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='허용 지연 비율 (0.25 = 25%%)')
+    parser.add_argument('--min-delta', type=float, default=0.01,
+                        help='무시할 비율 증가 폭 (0.01 = 기준 작업의 1%%, 아주 빠른 추출기의 잡음 무시)')
+    parser.add_argument('--retries', type=int, default=2, help='--compare 에서 느려진 항목이 있을 때 다시 잴 횟수')
+    parser.add_argument('--backend', action='append', choices=BACKENDS + ('auto',),
+                        help='HTML 파서 백엔드, 여러 번 지정하면 비교 (기본 parsel)')
+    parser.add_argument('--parity', action='store_true', help='시간 측정 없이 백엔드 간 추출 결과만 비교')
+    args = parser.parse_args(argv)
+    backends = list(dict.fromkeys(resolve_backend(name) for name in args.backend or ['parsel']))
+
+    corpus = args.corpus if args.corpus or args.store else DEFAULT_CORPUS
+    pages = load_corpus(corpus, args.store, args.limit)
+    if not pages:
+        parser.error('코퍼스가 비어 있습니다. --corpus 또는 --store 를 확인하세요.')
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = compile_selectors(json.load(f))
+
+    if args.parity:
+        if resolve_backend('selectolax') != 'selectolax':
+            parser.error('--parity 에는 selectolax 가 필요합니다.')
+        mismatches = check_parity(pages, config)
+        for url, backend, fields in mismatches:
+            print(f'❌ {backend} != parsel: {url} ({", ".join(fields)})')
+        if mismatches:
+            return 1
+        print(f'✅ 백엔드 추출 결과 일치: {len(pages)}페이지')
+        return 0
+
+    results, items_by_backend = {}, {}
+    for backend in backends:
+        results[backend], items_by_backend[backend] = run(pages, config, args.repeat, backend)
+        print_report(results[backend], len(pages), backend)
+        print()
+
+    if len(backends) > 1:
+        print(f"{'backend':<14}{'parse+extract ms/page':>24}{'pages/sec':>12}")
+        for backend in backends:
+            full_chain = results[backend]['full_chain']
+            print(f"{backend:<14}{full_chain['ms_per_page']:>24.3f}{full_chain['pages_per_sec']:>12}")
+        for backend, count in count_mismatches(items_by_backend).items():
+            print(f'{backends[0]} 대비 {backend} 추출 결과가 다른 페이지: {count}/{len(pages)}')
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        print(f'기준선 저장: {args.baseline}')
+
+    if args.compare:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        backends = [backend for backend in backends if backend in baseline]
+        if any('ratio' not in baseline[backend]['full_chain'] for backend in backends):
+            parser.error(f'{args.baseline} 는 절대 시간만 있는 예전 형식입니다. --save-baseline 으로 다시 저장하세요.')
+
+        def find_regressions():
+            return {backend: compare(results[backend], baseline[backend], args.tolerance, args.min_delta)
+                    for backend in backends}
+
+        # 잡음은 시간을 늘리기만 하므로, 느려진 항목이 있으면 그 백엔드를 다시 재서 항목별 최소 비율로 판단
+        regressions = find_regressions()
+        for attempt in range(args.retries):
+            suspects = [backend for backend in backends if regressions[backend]]
+            if not suspects:
+                break
+            print(f'재측정 {attempt + 1}/{args.retries}: {", ".join(suspects)}')
+            for backend in suspects:
+                again, _ = run(pages, config, args.repeat, backend)
+                for name, result in again.items():
+                    if result['ratio'] < results[backend][name]['ratio']:
+                        results[backend][name] = result
+            regressions = find_regressions()
+
+        failed = False
+        for backend in backends:
+            for name, before, after in regressions[backend]:
+                print(f'❌ 성능 저하: {backend}/{name} 기준 작업 대비 {before:.4f} → {after:.4f} (+{after / before - 1:.0%})')
+                failed = True
+        if failed:
+            return 1
+        print('✅ 기준선 대비 성능 저하 없음')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+크롤 로그 오버헤드 벤치마크
+
+상품 스파이더가 item 하나마다 남기는 로그(scrapy Crawled/Scraped 포함)를 그대로 흉내 내
+핸들러 구성별로 item 당 호출 측 시간(µs)과, 큐를 다 비울 때까지의 전체 시간을 잰다.
+    null            레코드만 만들고 버림 (logging 모듈 자체 비용, 비교 기준)
+    direct          Scrapy 기본: 루트 레벨 NOTSET + FileHandler 에 바로 쓰기
+    queue           LazyQueueHandler -> 리스너 스레드 -> GzipRotatingFileHandler
+    queue+sampling  위 + LOG_SAMPLE_RATES 샘플링 (settings.py)
+벤치마크는 CPU 를 쉬지 않고 쓰므로 queue 의 호출 측 시간에는 리스너 스레드와의 GIL 경합이 섞인다.
+실제 크롤에서는 reactor 가 네트워크를 기다리는 동안 리스너가 쓰므로 이 경합이 대부분 사라진다.
+
+사용 예 (amazon_crawler 디렉터리에서):
+    python -m utils.bench_logging --items 20000
+    python -m utils.bench_logging --items 20000 --level INFO
+"""
+import argparse
+import logging
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+from logging.handlers import QueueListener
+
+from scrapy import Request
+
+from utils.crawl_log import GzipRotatingFileHandler, LazyQueueHandler, SamplingFilter
+
+LOG_FORMAT = '%(asctime)s [%(name)s] %(levelname)s: %(message)s'
+SCENARIOS = ('null', 'direct', 'queue', 'queue+sampling')
+
+
+def sample_item(n):
+    asin = f'B0{n:08d}'
+    return {
+        'asin': asin,
+        'url': f'https://www.amazon.com/dp/{asin}',
+        'product_name': 'Stainless Steel Insulated Water Bottle with Straw Lid, 32 oz',
+        'brand_name': 'Example',
+        'board_name': 'BEST_SD',
+        'price': 2499,
+        'review_cnt': 78520,
+        'last_crawl_datetime': '2025-06-19 09:44:31',
+        'expand_info': {
+            'rating': 4.7, 'review_count': 78520, 'price': 2499, 'list_price': 2999, 'discount': -17,
+            'category': 'Home & Kitchen > Kitchen & Dining > Storage',
+            'style': 'Black', 'image_url': f'https://m.media-amazon.com/images/I/{asin}.jpg',
+        },
+    }
+
+
+def log_item(logger, n, total):
+    """상품 스파이더 + scrapy 코어가 item 하나에 남기는 로그"""
+    item = sample_item(n)
+    url = item['url']
+    logger.info("크롤링 시작: %s", url)
+    logger.debug("사용된 User-Agent: %s", 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    logger.debug("Crawled (%(status)s) %(request)s%(request_flags)s (referer: %(referer)s)%(response_flags)s",
+                 {'status': 200, 'request': Request(url), 'request_flags': '', 'referer': None,
+                  'response_flags': ''})
+    logger.info("[asin 디버그] : %s", item['asin'])
+    logger.info("페이지 유효 검사 결과 : %s", 'ok')
+    logger.info("진행도: %d/%s", n + 1, total)
+    logger.info("제품 정보 추출 완료: %s", item['product_name'])
+    logger.debug("Scraped from %(src)s" + os.linesep + "%(item)s", {'src': f'<200 {url}>', 'item': item})
+
+
+def build(scenario, path, level, rates):
+    """(logger, 정리 함수) - 루트 로거를 건드리지 않도록 전용 로거 사용"""
+    logger = logging.getLogger(f'bench_logging.{scenario}')
+    logger.propagate = False
+    logger.handlers.clear()
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    if scenario == 'null':
+        logger.addHandler(logging.NullHandler())
+        logger.setLevel(1)
+        return logger, lambda: None
+
+    if scenario == 'direct':
+        handler = logging.FileHandler(path, encoding='utf-8')
+        handler.setFormatter(formatter)
+        handler.setLevel(level)
+        logger.addHandler(handler)
+        logger.setLevel(1)  # Scrapy 는 루트를 NOTSET 으로 두므로 모든 레코드가 만들어짐
+
+        def close():
+            handler.close()
+        return logger, close
+
+    handler = GzipRotatingFileHandler(path, max_bytes=50 * 1024 * 1024, backup_count=20, encoding='utf-8')
+    handler.setFormatter(formatter)
+    handler.setLevel(level)
+    queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    if scenario == 'queue+sampling':
+        queue_handler.addFilter(SamplingFilter(rates))
+    listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+
+    def close():
+        listener.stop()
+        handler.close()
+    return logger, close
+
+
+def run(items, level, rates, workdir):
+    results = {}
+    for scenario in SCENARIOS:
+        path = os.path.join(workdir, f"{scenario.replace('+', '_')}.log")
+        logger, close = build(scenario, path, level, rates)
+        start = time.perf_counter()
+        for n in range(items):
+            log_item(logger, n, items)
+        caller = time.perf_counter() - start
+        close()
+        total = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(workdir, name))
+                   for name in os.listdir(workdir) if name.startswith(os.path.basename(path)))
+        results[scenario] = {
+            'caller_us_per_item': round(caller / items * 1e6, 2),
+            'total_us_per_item': round(total / items * 1e6, 2),
+            'bytes_per_item': round(size / items, 1),
+        }
+    return results
+
+
+def print_report(results, items, level):
+    print(f'item {items}개, LOG_LEVEL={logging.getLevelName(level)}')
+    print(f"{'scenario':<18}{'caller µs/item':>16}{'total µs/item':>16}{'vs null µs':>12}{'file bytes/item':>18}")
+    floor = results['null']['total_us_per_item']
+    for scenario, result in results.items():
+        print(f"{scenario:<18}{result['caller_us_per_item']:>16.2f}{result['total_us_per_item']:>16.2f}"
+              f"{result['total_us_per_item'] - floor:>12.2f}{result['bytes_per_item']:>18.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='크롤 로그 오버헤드 벤치마크')
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--level', default=None, help='기본: settings.py 의 LOG_LEVEL')
+    parser.add_argument('--tmp', default=None, help='로그 파일을 쓸 디렉터리 (기본: 시스템 임시 디렉터리)')
+    args = parser.parse_args(argv)
+
+    from amazon_crawler import settings
+    level = logging.getLevelName((args.level or settings.LOG_LEVEL).upper())
+    workdir = tempfile.mkdtemp(prefix='bench-logging-', dir=args.tmp)
+    try:
+        results = run(args.items, level, settings.LOG_SAMPLE_RATES, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print_report(results, args.items, level)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
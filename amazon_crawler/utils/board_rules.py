@@ -0,0 +1,347 @@
+"""
+보드 타입 분류 규칙표
+
+helper_parse.determine_board_type 의 if/else 트리를 선언적 규칙표로 옮긴 것.
+필드별로 규칙에 쓰이는 키워드를 모두 모아 정규식 하나로 컴파일하고,
+한 번 훑어서 그 필드에 들어 있는 키워드 그룹 집합을 구한다.
+규칙은 위에서부터 처음 만족하는 것이 결과이며, 조건은 모두 AND 로 묶인다.
+
+조건 표기:
+    'name.ssd'          name 필드에 ssd 그룹 키워드가 포함됨
+    'description'       description 필드 값이 있음
+    '!description'      description 필드 값이 없음 (! 는 부정)
+    'category=SD'       브레드크럼 카테고리가 SD
+
+크롤 중에는 classify_board(item, category) 로 한 건씩, 저장된 상품 마스터는
+classify_frame(DataFrame) 으로 한 번에 재분류한다 (재크롤 없이 규칙 변경 반영).
+브레드크럼 카테고리는 저장하지 않으므로 재분류에서는 카테고리 규칙이 적용되지 않는다
+(크롤 때 브레드크럼이 없던 페이지와 같음).
+
+사용 예 (amazon_crawler 디렉터리에서):
+    python -m utils.board_rules ./data/result/amazon_product.json -o ./data/result/reclassified.jl
+    python -m utils.board_rules --mongo mongodb://localhost:27017 --db mydb --collection product_master --apply
+    python -m utils.board_rules --mongo mongodb://localhost:27017 --db mydb --collection product_master --apply --overwrite
+
+제품명/expand_info 가 없는 문서(오류/삭제 항목)는 분류하지 않는다.
+--mongo --apply 는 기본적으로 아직 분류되지 않은(board_name 이 없거나 Unknown) 문서만 고친다.
+이미 분류된 문서는 크롤 때 카테고리 규칙으로 정해졌을 수 있어, 카테고리 없이 다시 분류하면
+더 나쁜 결과로 덮어쓸 수 있기 때문이다. 규칙 변경을 기존 분류에도 반영하려면 --overwrite 를 준다.
+건너뛴 문서는 이유별 개수로 보고한다.
+"""
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+
+# 필드 -> (item 안의 위치, 소문자 변환 여부)
+FIELDS = {
+    'name': ('product_name', True),
+    'description': ('expand_info.Hard_Disk_Description', True),
+    'installation': ('expand_info.Installation_Type', True),
+    'flash_memory': ('expand_info.Flash_Memory_Type', True),
+    'connectivity': ('expand_info.Connectivity_technology', True),
+    # 기존 동작 유지: Flash_Memory_Type 이 없을 때는 대소문자를 구분해 'usb' 를 찾음
+    'connectivity_raw': ('expand_info.Connectivity_technology', False),
+    'hardware_connectivity': ('expand_info.Hardware_Connectivity', True),
+    'hardware_interface': ('expand_info.Hardware_Interface', True),
+}
+KEYWORDS = {
+    'external': ['external', 'exter', 'portable', 'usb', 'drive for mac', 'drive for pc', 'type-c'],
+    'internal': ['internal', 'm.2', 'ide', 'sata', '2.5', 'pcie', '2280', 'gen4 x4', 'gen3 x4'],
+    'sd': ['sdxc', 'sdhc', 'sd', 'secure digital card', 'tf card', 'tf memory card'],
+    'ssd': ['ssd', 'solid state drive', 'solid state hard drive'],
+    'solid_state': ['solid state drive'],
+    'micro': ['micro'],
+    'micro_tf': ['micro', 'tf card'],
+    'micro_card': ['tf card', 'tf memory card', 'micro'],
+    'usb': ['usb'],
+    'flash_drive': ['flash drive'],
+    'install_external': ['external'],
+    'install_internal': ['internal'],
+}
+
+DIVISIONS = {
+    'External SSD': 'PSSD',
+    'Internal SSD': 'SSD',
+    'Micro SD': 'microSD',
+    'SD': 'SD',
+    'Flash Drive': 'Flash Drive',
+}
+UNKNOWN = 'Unknown'
+
+# SSD 판별 진입 조건 (셋 중 하나)
+_SSD_GATES = (
+    ('description.ssd',),
+    ('description', '!description.ssd', 'name.solid_state'),
+    ('!description', 'name.ssd'),
+)
+# SD 판별에 쓰는 필드 (값이 있는 첫 필드만 보고, 모두 없으면 제품명)
+_SD_SOURCES = ('flash_memory', 'hardware_connectivity', 'hardware_interface')
+
+RULES = [
+    # 1. 브레드크럼 카테고리
+    ('Micro SD', ('category=Micro SD',)),
+    ('Micro SD', ('category=SD', 'name.micro_card')),
+    ('SD', ('category=SD',)),
+    ('Internal SSD', ('category=Internal SSD',)),
+    ('External SSD', ('category=External SSD',)),
+    ('Flash Drive', ('category=Flash Drive',)),
+]
+# 2. SSD: 제품명 키워드 -> 설치 유형
+for _gate in _SSD_GATES:
+    RULES += [
+        ('External SSD', _gate + ('name.external',)),
+        ('Internal SSD', _gate + ('name.internal',)),
+        ('External SSD', _gate + ('installation.install_external',)),
+        ('Internal SSD', _gate + ('installation.install_internal',)),
+    ]
+# 3. Flash Drive
+RULES += [
+    ('Flash Drive', ('flash_memory.usb',)),
+    ('Flash Drive', ('flash_memory', 'connectivity.usb')),
+    ('Flash Drive', ('!flash_memory', 'connectivity_raw.usb')),
+    ('Flash Drive', ('name.flash_drive',)),
+]
+# 4. SD / Micro SD
+for _index, _source in enumerate(_SD_SOURCES):
+    _absent = tuple(f'!{prev}' for prev in _SD_SOURCES[:_index])
+    RULES += [
+        ('Micro SD', _absent + (f'{_source}.sd', f'{_source}.micro_tf')),
+        ('Micro SD', _absent + (f'{_source}.sd', 'name.micro')),
+        ('SD', _absent + (f'{_source}.sd',)),
+    ]
+_absent = tuple(f'!{source}' for source in _SD_SOURCES)
+RULES += [
+    ('Micro SD', _absent + ('name.sd', 'name.micro_tf')),
+    ('SD', _absent + ('name.sd',)),
+]
+
+
+class FieldMatcher:
+    """필드 하나에 쓰이는 모든 키워드를 정규식 하나로 묶어 포함된 그룹 집합을 구함"""
+
+    def __init__(self, groups):
+        self.groups = groups
+        keywords = {keyword for group in groups for keyword in KEYWORDS[group]}
+        # 키워드가 맞으면 그 안에 포함된 짧은 키워드('sdxc' 안의 'sd' 등)의 그룹도 맞은 것
+        self.hits = {
+            keyword: frozenset(
+                group for group in groups
+                if any(other in keyword for other in KEYWORDS[group])
+            )
+            for keyword in keywords
+        }
+        # 긴 키워드 우선, 전방 탐색으로 겹치는 위치도 모두 찾음
+        alternation = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+        self.pattern = re.compile(f'(?=({alternation}))')
+
+    def match(self, text):
+        if not text or not isinstance(text, str):
+            return frozenset()
+        found = set()
+        for keyword in set(self.pattern.findall(text)):
+            found |= self.hits[keyword]
+        return frozenset(found)
+
+
+def _parse_condition(condition):
+    negate = condition.startswith('!')
+    condition = condition.lstrip('!')
+    if '=' in condition:
+        field, value = condition.split('=', 1)
+        return ('equals', field, value, negate)
+    if '.' in condition:
+        field, group = condition.split('.', 1)
+        return ('contains', field, group, negate)
+    return ('present', condition, None, negate)
+
+
+def compile_rules(rules=RULES):
+    """(규칙 목록, 필드별 FieldMatcher) 반환"""
+    compiled = []
+    groups = {}
+    for board_type, conditions in rules:
+        parsed = tuple(_parse_condition(c) for c in conditions)
+        for kind, field, value, _ in parsed:
+            if kind == 'contains':
+                if value not in KEYWORDS:
+                    raise ValueError(f'알 수 없는 키워드 그룹: {value}')
+                groups.setdefault(field, set()).add(value)
+            if kind != 'equals' and field not in FIELDS:
+                raise ValueError(f'알 수 없는 필드: {field}')
+        compiled.append((board_type, parsed))
+    matchers = {field: FieldMatcher(sorted(g)) for field, g in groups.items()}
+    return compiled, matchers
+
+
+_RULES, _MATCHERS = compile_rules()
+
+
+def board_fields(item, category=None):
+    """item 에서 규칙표 필드 값 추출 (category: 브레드크럼 카테고리, 모르면 None)"""
+    expand_info = item.get('expand_info') or {}
+    values = {}
+    for field, (path, lower) in FIELDS.items():
+        if path.startswith('expand_info.'):
+            value = expand_info.get(path[len('expand_info.'):])
+        else:
+            value = item.get(path, '')
+        values[field] = value.lower() if lower and isinstance(value, str) else value
+    values['category'] = category
+    return values
+
+
+def classify_board(item, category=None):
+    """item 한 건의 보드 타입 반환"""
+    values = board_fields(item, category)
+    groups = {field: matcher.match(values[field]) for field, matcher in _MATCHERS.items()}
+
+    for board_type, conditions in _RULES:
+        for kind, field, value, negate in conditions:
+            if kind == 'contains':
+                result = value in groups[field]
+            elif kind == 'present':
+                result = bool(values[field])
+            else:
+                result = values[field] == value
+            if result == negate:
+                break
+        else:
+            return board_type
+    return UNKNOWN
+
+
+def board_name_and_division(board_type, data_gbn):
+    if board_type == UNKNOWN:
+        return UNKNOWN, UNKNOWN
+    board_name = f'BEST_{board_type}' if data_gbn == 'BEST' else board_type
+    return board_name, DIVISIONS.get(board_type, UNKNOWN)
+
+
+def classify_frame(df):
+    """상품 DataFrame 전체를 한 번에 분류해 board_type Series 반환
+
+    df 는 board_fields 의 필드(name, description, ..., category)를 열로 가진다.
+    필드마다 고유값에 대해서만 매칭하고, 규칙은 열 단위 불리언 마스크로 평가한다.
+    """
+    import numpy as np
+    import pandas as pd
+
+    masks = {}
+
+    def column(kind, field, value):
+        key = (kind, field, value)
+        if key not in masks:
+            series = df[field] if field in df else pd.Series([None] * len(df), index=df.index)
+            if kind == 'contains':
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                hit = np.array([value in _MATCHERS[field].match(u) for u in uniques] + [False])
+                masks[key] = hit[codes]
+            elif kind == 'present':
+                masks[key] = series.fillna('').map(bool).to_numpy(dtype=bool)
+            else:
+                masks[key] = (series == value).to_numpy(dtype=bool)
+        return masks[key]
+
+    conditions, choices = [], []
+    for board_type, parsed in _RULES:
+        mask = np.ones(len(df), dtype=bool)
+        for kind, field, value, negate in parsed:
+            hit = column(kind, field, value)
+            mask &= ~hit if negate else hit
+        conditions.append(mask)
+        choices.append(board_type)
+    return pd.Series(np.select(conditions, choices, default=UNKNOWN), index=df.index)
+
+
+def reclassify(docs):
+    """문서 목록을 재분류해 (문서, 새 board_type, board_name, division) 를 순서대로 반환"""
+    import pandas as pd
+
+    df = pd.DataFrame([board_fields(doc) for doc in docs])
+    for doc, board_type in zip(docs, classify_frame(df)):
+        board_name, division = board_name_and_division(board_type, doc.get('data_gbn'))
+        yield doc, board_type, board_name, division
+
+
+def skip_reason(doc, keep_classified=False):
+    """재분류하지 않을 문서면 이유, 아니면 None (keep_classified: 이미 분류된 문서도 건너뜀)"""
+    if not doc.get('product_name'):
+        return 'product_name 없음'
+    if not isinstance(doc.get('expand_info'), dict):
+        return 'expand_info 없음'
+    if keep_classified and doc.get('board_name') not in (None, '', UNKNOWN):
+        return '이미 분류됨 (--overwrite 로 덮어씀)'
+    return None
+
+
+def _load_docs(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.jl', '.jsonl')):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='상품 보드 타입 일괄 재분류')
+    parser.add_argument('inputs', nargs='*', help='크롤 결과 JSON / JSON Lines 파일')
+    parser.add_argument('-o', '--output', help='재분류 결과 JSON Lines 경로')
+    parser.add_argument('--mongo', help='MongoDB URI (상품 마스터 직접 재분류)')
+    parser.add_argument('--db', default='mydb')
+    parser.add_argument('--collection', default='product_master')
+    parser.add_argument('--apply', action='store_true', help='MongoDB 에 변경된 board_name/division 반영')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='--apply 때 이미 분류된 문서도 덮어씀 (기본: 미분류 문서만)')
+    args = parser.parse_args(argv)
+
+    if args.mongo:
+        from pymongo import MongoClient, UpdateOne
+
+        collection = MongoClient(args.mongo)[args.db][args.collection]
+        docs = list(collection.find({}, {'product_name': 1, 'expand_info': 1, 'data_gbn': 1,
+                                         'board_name': 1, 'division': 1}))
+    else:
+        if not args.inputs:
+            parser.error('입력 파일 또는 --mongo 를 지정하세요.')
+        docs = [doc for path in args.inputs for doc in _load_docs(path)]
+
+    # 오류/삭제 항목은 분류 대상이 아님, DB 에 되쓸 때는 --overwrite 없이는 미분류 문서만
+    skipped = Counter()
+    kept = []
+    for doc in docs:
+        reason = skip_reason(doc, keep_classified=bool(args.mongo and args.apply and not args.overwrite))
+        if reason:
+            skipped[reason] += 1
+        else:
+            kept.append(doc)
+    docs = kept
+
+    changes = Counter()
+    updates = []
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    for doc, board_type, board_name, division in reclassify(docs):
+        if doc.get('board_name') != board_name:
+            changes[(doc.get('board_name'), board_name)] += 1
+            if args.mongo:
+                updates.append(UpdateOne({'_id': doc['_id']}, {'$set': {'board_name': board_name, 'division': division}}))
+        if output:
+            doc.update(board_name=board_name, division=division)
+            output.write(json.dumps(doc, ensure_ascii=False, default=str) + '\n')
+    if output:
+        output.close()
+
+    print(f'문서 {len(docs)}개, 변경 {sum(changes.values())}개, 건너뜀 {sum(skipped.values())}개')
+    for reason, count in skipped.most_common():
+        print(f'  건너뜀 ({reason}): {count}')
+    for (before, after), count in changes.most_common():
+        print(f'  {before} -> {after}: {count}')
+
+    if args.apply and updates:
+        result = collection.bulk_write(updates, ordered=False)
+        print(f'MongoDB 반영: {result.modified_count}개')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
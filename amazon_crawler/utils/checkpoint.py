@@ -0,0 +1,98 @@
+"""
+장시간 크롤 체크포인트
+
+CHECKPOINT_DIR/<spider 이름>/ 아래에 다음 두 파일을 저장한다.
+    items.jl      완료된 item (JSON Lines, 부분 출력 겸 완료 ASIN 목록), 한 건마다 flush
+    state.json    남은 URL 목록과 진행 카운터, 주기적으로 저장
+
+크롤이 중간에 죽으면 다음 실행에서 items.jl 의 ASIN 은 건너뛰고 남은 URL 만 요청한다.
+정상 종료(finished) 시 체크포인트는 삭제된다.
+state.json 에는 실행 인자(run_key)도 함께 저장해, 인자(-a start/end/delta/budget)가 다른 실행에서는
+이전 체크포인트를 버리고 처음부터 시작한다.
+"""
+import json
+import os
+import shutil
+
+from itemadapter import ItemAdapter
+
+
+class CrawlCheckpoint:
+    def __init__(self, path, run_key=None):
+        self.path = path
+        self.run_key = run_key
+        self.items_path = os.path.join(path, 'items.jl')
+        self.state_path = os.path.join(path, 'state.json')
+        self.done = set()
+        self.pending = None
+        self.processed_count = 0
+        self.discarded = False  # load() 에서 인자가 달라 이전 체크포인트를 버렸는지
+        self._items_file = None
+
+    def load(self):
+        """이전 체크포인트를 읽어 완료된 item 목록을 반환, 실행 인자가 다르면 버리고 빈 목록"""
+        state = None
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        if state is None or state.get('run_key') != self.run_key:
+            self.discarded = os.path.exists(self.path)
+            self.clear()
+            return []
+
+        items = []
+        if os.path.exists(self.items_path):
+            with open(self.items_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        # 비정상 종료로 잘린 마지막 줄
+                        continue
+                    items.append(item)
+                    self.done.add(_asin(item))
+        self.pending = state.get('pending')
+        self.processed_count = state.get('processed_count', 0)
+        return items
+
+    def is_done(self, url):
+        return url.split('/')[-1] in self.done
+
+    def record(self, item):
+        if self._items_file is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._items_file = open(self.items_path, 'a', encoding='utf-8')
+        self._items_file.write(json.dumps(ItemAdapter(item).asdict(), ensure_ascii=False) + '\n')
+        # 바로 OS 로 넘겨 프로세스가 죽어도 남게 함 (피드에 쓴 item 이 재시작 후 다시 크롤되지 않도록)
+        self._items_file.flush()
+        self.done.add(_asin(item))
+
+    def flush(self, urls, processed_count):
+        """완료 item 을 디스크에 내리고 남은 URL 목록을 원자적으로 저장"""
+        os.makedirs(self.path, exist_ok=True)
+        if self._items_file is not None:
+            self._items_file.flush()
+            os.fsync(self._items_file.fileno())
+        state = {
+            'run_key': self.run_key,
+            'pending': [url for url in urls if not self.is_done(url)],
+            'processed_count': processed_count,
+        }
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+        return len(state['pending'])
+
+    def close(self):
+        if self._items_file is not None:
+            self._items_file.close()
+            self._items_file = None
+
+    def clear(self):
+        self.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _asin(item):
+    return (item.get('url') or '').split('/')[-1] or item.get('asin')
@@ -0,0 +1,88 @@
+"""
+크롤 로그 버퍼링 / 샘플링
+
+요청·item 마다 나오는 로그가 많아 파일 쓰기가 크롤 스레드(reactor)를 잡아먹지 않도록
+    - LazyQueueHandler : 레코드를 큐에 넣기만 하고 포맷/쓰기는 QueueListener 스레드에서
+    - SamplingFilter   : 메시지 종류(템플릿 접두어)별로 N 건 중 1 건만 남김, WARNING 이상은 항상 남김
+    - GzipRotatingFileHandler : 크기 기준으로 넘기며 지난 파일은 .gz 로 압축, 종료 시 현재 파일도 압축
+
+QueueLogging 확장(extensions.py)이 Scrapy 가 붙인 루트 핸들러를 이것들로 바꿔 끼운다.
+메시지는 f-string 대신 %-포맷 인자로 넘겨야(logger.info("진행도: %d/%d", a, b)) 샘플링으로 버려지는
+레코드의 포맷 비용이 없어진다.
+"""
+import gzip
+import logging
+import os
+import shutil
+from collections import Counter
+from logging.handlers import QueueHandler, RotatingFileHandler
+
+# 큐에 넣은 뒤에도 값이 바뀌지 않는 인자 타입 (그 외 인자는 넣기 전에 메시지를 확정)
+_IMMUTABLE = (str, bytes, int, float, bool, type(None))
+
+
+class SamplingFilter(logging.Filter):
+    """rates: {메시지 템플릿 접두어: N} - N 건 중 첫 건만 통과, 0 이면 전부 버림"""
+
+    def __init__(self, rates):
+        super().__init__()
+        # 긴 접두어가 먼저 맞도록
+        self.rules = sorted(((prefix, int(rate)) for prefix, rate in rates.items()),
+                            key=lambda rule: len(rule[0]), reverse=True)
+        self.prefixes = tuple(prefix for prefix, _ in self.rules)
+        self.seen = Counter()
+        self.dropped = Counter()
+
+    def filter(self, record):
+        msg = record.msg
+        if record.levelno >= logging.WARNING or not isinstance(msg, str) or not msg.startswith(self.prefixes):
+            return True
+        for prefix, rate in self.rules:
+            if msg.startswith(prefix):
+                seen = self.seen[prefix]
+                self.seen[prefix] = seen + 1
+                if rate and seen % rate == 0:
+                    return True
+                self.dropped[prefix] += 1
+                return False
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler.prepare 는 넣기 전에 메시지를 포맷하므로, 안전한 경우 포맷을 리스너 스레드로 미룸"""
+
+    def prepare(self, record):
+        if record.exc_info or record.exc_text or record.stack_info:
+            return super().prepare(record)
+        args = record.args
+        if args:
+            values = args.values() if isinstance(args, dict) else args
+            if not all(isinstance(value, _IMMUTABLE) for value in values):
+                record.msg = record.getMessage()
+                record.args = None
+        return record
+
+
+class GzipRotatingFileHandler(RotatingFileHandler):
+    """crawl_x.log -> crawl_x.log.1.gz, .2.gz ... 로 넘기고, close 시 crawl_x.log 를 crawl_x.log.gz 로 압축"""
+
+    def __init__(self, filename, max_bytes=0, backup_count=0, encoding=None, compress_on_close=True):
+        super().__init__(filename, mode='a', maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.compress_on_close = compress_on_close
+        self.namer = lambda name: name + '.gz'
+        self.rotator = _gzip_file
+
+    def close(self):
+        stream = self.stream
+        super().close()
+        if stream is not None and self.compress_on_close and os.path.exists(self.baseFilename):
+            _gzip_file(self.baseFilename, self.baseFilename + '.gz')
+
+
+def _gzip_file(source, dest):
+    if os.path.getsize(source) == 0:
+        os.remove(source)
+        return
+    with open(source, 'rb') as src, gzip.open(dest, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
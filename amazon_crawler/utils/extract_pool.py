@@ -0,0 +1,84 @@
+"""
+상품 페이지 추출 프로세스 풀
+
+HTML 파싱과 helper_parse 추출 체인은 CPU 작업이라 reactor 스레드에서 돌리면
+그동안 다운로드/콜백이 멈춘다. EXTRACTION_WORKERS > 0 이면 응답 본문을
+ProcessPoolExecutor 워커로 보내 추출하고, 완성된 item 필드 dict 를 Deferred 로 돌려받는다.
+
+워커는 spawn 으로 띄워 (reactor 가 돌고 있는 프로세스를 fork 하지 않음)
+시작할 때 selectors.json 을 한 번 컴파일해 둔다.
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from twisted.internet import defer
+
+logger = logging.getLogger('extract_pool')
+
+# 워커 프로세스 전역 (initializer 에서 설정)
+_configs = None
+_backend = 'parsel'
+
+
+def _init_worker(config, backend):
+    global _configs, _backend
+    from utils.selector_plan import compile_selectors
+
+    _configs = compile_selectors(config)
+    _backend = backend
+
+
+def extract_in_worker(url, body, encoding, fields, profile=False):
+    """워커에서 추출 체인 실행 후 (item 필드, 추출 시간, dataToReturn 파싱 통계, 프로파일) 반환
+
+    profile 이 참이면 이 페이지의 추출기/선택자 프로파일(extract_profile)을 함께 돌려준다.
+    """
+    from scrapy.http import HtmlResponse
+    from utils.extract_profile import profiler
+    from utils.helper_parse import data_to_return_stats, extract_product_details
+
+    profiler.enabled = profile
+    start = time.perf_counter()
+    before = data_to_return_stats.copy()
+    response = HtmlResponse(url=url, body=body, encoding=encoding)
+    extract_product_details(response, fields, _configs, logger, _backend)
+    elapsed = time.perf_counter() - start
+    return fields, elapsed, dict(data_to_return_stats - before), profiler.drain() if profile else None
+
+
+class ExtractionPool:
+    def __init__(self, workers, config, backend='parsel'):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(config, backend),
+        )
+
+    def submit(self, response, item, profile=False):
+        """추출 결과 (fields, elapsed, stats, profile) 를 넘겨주는 Deferred 반환"""
+        from twisted.internet import reactor
+
+        d = defer.Deferred()
+        future = self.executor.submit(
+            extract_in_worker, response.url, response.body, response.encoding, dict(item), profile
+        )
+        future.add_done_callback(lambda f: reactor.callFromThread(_fire, d, f))
+        return d
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _fire(d, future):
+    if future.cancelled():
+        d.cancel()
+        return
+    error = future.exception()
+    if error is not None:
+        d.errback(error)
+    else:
+        d.callback(future.result())
@@ -0,0 +1,138 @@
+"""
+추출기 / 선택자 프로파일링 훅
+
+helper_parse 의 추출기 함수는 @timed 로 감싸 호출 수와 시간을,
+선택자 조회는 ProfiledDocument 로 감싸 선택자별 시도/적중 수와 시간을 메모리에 모은다.
+꺼져 있을 때는 @timed 가 플래그 하나만 확인하고, 문서는 감싸지 않으므로 비용이 거의 없다.
+
+켜고 끄기
+    - 설정 EXTRACT_PROFILE_ENABLED (시작 상태)
+    - 실행 중 SIGUSR1 (ExtractProfile 확장) 또는 텔넷 콘솔에서 profiler.enable() / disable()
+결과는 spider_closed 에 로그 요약과 extract_profile/* stats 로 남는다 (ExtractProfile 확장).
+추출 프로세스 풀 워커는 페이지마다 drain() 한 결과를 돌려주고 메인 프로세스에서 merge() 한다.
+"""
+import functools
+import time
+
+
+class ExtractProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.extractors = {}  # 이름 -> [호출 수, 총 시간, 최대 시간]
+        self.selectors = {}   # 선택자 라벨 -> [시도 수, 적중 수, 총 시간]
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def record(self, name, seconds):
+        entry = self.extractors.get(name)
+        if entry is None:
+            self.extractors[name] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+    def record_selector(self, label, hit, seconds):
+        entry = self.selectors.get(label)
+        if entry is None:
+            self.selectors[label] = [1, 1 if hit else 0, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += 1 if hit else 0
+            entry[2] += seconds
+
+    def drain(self):
+        """지금까지 모은 값을 반환하고 비움 (워커 -> 메인 프로세스 전달용)"""
+        data = {'extractors': self.extractors, 'selectors': self.selectors}
+        self.extractors, self.selectors = {}, {}
+        return data
+
+    def merge(self, data):
+        for name, (calls, total, longest) in data['extractors'].items():
+            entry = self.extractors.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += calls
+            entry[1] += total
+            entry[2] = max(entry[2], longest)
+        for label, (attempts, hits, total) in data['selectors'].items():
+            entry = self.selectors.setdefault(label, [0, 0, 0.0])
+            entry[0] += attempts
+            entry[1] += hits
+            entry[2] += total
+
+    def summary(self, top=None):
+        """로그용 요약 문자열 (추출기는 총 시간 순, 선택자는 라벨 순)"""
+        lines = ['추출기                              호출      총(ms)   평균(ms)   최대(ms)']
+        extractors = sorted(self.extractors.items(), key=lambda kv: kv[1][1], reverse=True)
+        for name, (calls, total, longest) in extractors[:top]:
+            lines.append(f'{name:<32}{calls:>8}{total * 1000:>12.1f}{total / calls * 1000:>11.3f}{longest * 1000:>11.2f}')
+        lines.append('선택자                                            시도      적중   적중률   총(ms)')
+        for label, (attempts, hits, total) in sorted(self.selectors.items()):
+            lines.append(f'{label[:48]:<48}{attempts:>8}{hits:>10}{hits / attempts:>9.1%}{total * 1000:>9.1f}')
+        return '\n'.join(lines)
+
+
+profiler = ExtractProfiler()
+
+
+def timed(name=None):
+    """추출기 함수 프로파일링 데코레이터, 꺼져 있으면 플래그 확인 후 바로 호출"""
+    def decorator(fn):
+        key = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.record(key, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class ProfiledDocument:
+    """html_backend Document 를 감싸 선택자 조회마다 시도/적중/시간 기록"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.backend = doc.backend
+        self.response = doc.response
+
+    def get(self, selector):
+        start = time.perf_counter()
+        value = self.doc.get(selector)
+        profiler.record_selector(_label(selector), bool(value), time.perf_counter() - start)
+        return value
+
+    def getall(self, selector):
+        start = time.perf_counter()
+        values = self.doc.getall(selector)
+        profiler.record_selector(_label(selector), bool(values), time.perf_counter() - start)
+        return values
+
+    def overview_rows(self, selector):
+        start = time.perf_counter()
+        rows = self.doc.overview_rows(selector)
+        profiler.record_selector(_label(selector), bool(rows), time.perf_counter() - start)
+        return rows
+
+    def detail_table(self):
+        return self.doc.detail_table()
+
+    def detail_bullets(self):
+        return self.doc.detail_bullets()
+
+
+def _label(selector):
+    return selector.label or selector.source
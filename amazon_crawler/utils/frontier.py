@@ -0,0 +1,271 @@
+"""
+SQLite(WAL) 기반 공유 크롤 프론티어
+
+여러 스파이더 프로세스가 같은 DB 파일에서 ASIN 배치를 임대(lease)해 간다.
+임대 후 lease_timeout 안에 완료되지 않은 ASIN 은 다른 워커가 다시 가져가므로
+프로세스가 죽어도 작업이 유실되지 않는다. 완료된 item 은 DB 에 함께 저장되어
+마지막에 하나의 결과 파일로 내보낼 수 있다.
+임대할 때마다 attempts 가 늘고, max_attempts 번 임대해도 완료되지 않은 ASIN(워커를 계속
+죽이는 페이지 등)은 failed 상태로 옮겨 더 임대하지 않는다. 워커가 정상 종료하며 돌려준
+(release) ASIN 은 시도로 세지 않는다. failed 목록은 failed 명령으로 보고 --requeue 로 되돌린다.
+
+WAL 모드는 로컬 파일시스템에서만 안전하다(NFS 등 네트워크 공유 X).
+
+run 의 워커들은 settings.py 의 FEEDS / JSONL_FEED_DIR 대신 --feed-dir 아래 워커별 파일에 쓴다
+(같은 파일을 여러 프로세스가 덮어쓰지 않도록). 전체 결과는 프론티어 DB 에서 export(--out) 로 합친다.
+
+사용 예 (amazon_crawler 디렉터리에서):
+    python -m utils.frontier run --db ./data/frontier.db --workers 4 --out ./data/result/merged.json
+    python -m utils.frontier status --db ./data/frontier.db
+    python -m utils.frontier failed --db ./data/frontier.db --requeue
+    python -m utils.frontier export --db ./data/frontier.db --out ./data/result/merged.json
+    python -m utils.frontier reset --db ./data/frontier.db
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class AsinFrontier:
+    def __init__(self, path, lease_timeout=1800, max_attempts=3):
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                asin       TEXT PRIMARY KEY,
+                state      TEXT NOT NULL DEFAULT 'pending',
+                worker     TEXT,
+                leased_at  REAL,
+                attempts   INTEGER NOT NULL DEFAULT 0,
+                done_at    REAL,
+                item       TEXT
+            )
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_frontier_state ON frontier(state, leased_at)')
+
+    def seed(self, asins):
+        """ASIN 목록 등록 (이미 있는 ASIN 은 무시)"""
+        with self._transaction():
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO frontier (asin) VALUES (?)',
+                ((asin,) for asin in asins),
+            )
+
+    def lease(self, worker, batch_size=50):
+        """대기 중이거나 임대가 만료된 ASIN 을 batch_size 개 임대
+
+        임대 가능한 ASIN 중 이미 max_attempts 번 임대된 것은 failed 로 옮기고 건너뛴다.
+        """
+        now = time.time()
+        with self._transaction():
+            self.conn.execute(
+                """
+                UPDATE frontier SET state = ?
+                WHERE (state = ? OR (state = ? AND leased_at < ?)) AND attempts >= ?
+                """,
+                (FAILED, PENDING, LEASED, now - self.lease_timeout, self.max_attempts),
+            )
+            rows = self.conn.execute(
+                """
+                SELECT asin FROM frontier
+                WHERE state = ? OR (state = ? AND leased_at < ?)
+                ORDER BY asin LIMIT ?
+                """,
+                (PENDING, LEASED, now - self.lease_timeout, batch_size),
+            ).fetchall()
+            asins = [row[0] for row in rows]
+            self.conn.executemany(
+                """
+                UPDATE frontier SET state = ?, worker = ?, leased_at = ?, attempts = attempts + 1
+                WHERE asin = ?
+                """,
+                ((LEASED, worker, now, asin) for asin in asins),
+            )
+        return asins
+
+    def complete(self, asin, item=None):
+        """ASIN 완료 처리 및 결과 item 저장"""
+        payload = json.dumps(item, ensure_ascii=False) if item is not None else None
+        with self._transaction():
+            self.conn.execute(
+                'UPDATE frontier SET state = ?, done_at = ?, item = ? WHERE asin = ?',
+                (DONE, time.time(), payload, asin),
+            )
+
+    def release(self, worker):
+        """워커가 임대 중인 미완료 ASIN 을 대기 상태로 되돌림 (정상 종료라 이번 임대는 시도로 세지 않음)"""
+        with self._transaction():
+            cur = self.conn.execute(
+                """
+                UPDATE frontier SET state = ?, worker = NULL, leased_at = NULL, attempts = MAX(attempts - 1, 0)
+                WHERE state = ? AND worker = ?
+                """,
+                (PENDING, LEASED, worker),
+            )
+        return cur.rowcount
+
+    def failed(self):
+        """failed 상태 ASIN 의 (asin, 임대 횟수, 마지막 워커) 목록"""
+        return self.conn.execute(
+            'SELECT asin, attempts, worker FROM frontier WHERE state = ? ORDER BY asin', (FAILED,)
+        ).fetchall()
+
+    def requeue_failed(self):
+        """failed ASIN 을 시도 횟수를 지우고 대기 상태로 되돌림"""
+        with self._transaction():
+            cur = self.conn.execute(
+                'UPDATE frontier SET state = ?, worker = NULL, leased_at = NULL, attempts = 0 WHERE state = ?',
+                (PENDING, FAILED),
+            )
+        return cur.rowcount
+
+    def reset(self):
+        """전체 ASIN 을 다시 대기 상태로 (다음 회차 크롤 준비)"""
+        with self._transaction():
+            self.conn.execute(
+                'UPDATE frontier SET state = ?, worker = NULL, leased_at = NULL, attempts = 0, done_at = NULL, item = NULL',
+                (PENDING,),
+            )
+
+    def counts(self):
+        rows = self.conn.execute('SELECT state, COUNT(*) FROM frontier GROUP BY state').fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def iter_items(self):
+        """완료된 item 을 ASIN 순으로 반환"""
+        cur = self.conn.execute(
+            'SELECT item FROM frontier WHERE state = ? AND item IS NOT NULL ORDER BY asin', (DONE,)
+        )
+        for (payload,) in cur:
+            yield json.loads(payload)
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡아 워커 간 중복 임대를 막음"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+def export_items(frontier, out_path):
+    """완료 item 을 하나의 JSON 배열 파일로 스트리밍 저장"""
+    count = 0
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for item in frontier.iter_items():
+            if count:
+                f.write(',\n')
+            f.write(json.dumps(item, ensure_ascii=False, indent=4))
+            count += 1
+        f.write('\n]\n')
+    return count
+
+
+def worker_feeds(feed_dir, worker):
+    """워커별 FEEDS 설정 (-s FEEDS=... 로 넘길 JSON)"""
+    path = os.path.join(feed_dir, f'{worker}.json')
+    options = {'format': 'json', 'encoding': 'utf8', 'indent': 4, 'overwrite': True,
+               'item_filter': 'amazon_crawler.extensions.ChangedItemFilter'}
+    return json.dumps({path: options}, ensure_ascii=False)
+
+
+def run_workers(db, workers, spider='amazon_product', extra_args=(), feed_dir='./data/result/frontier'):
+    """스파이더 프로세스 N 개를 같은 프론티어로 실행하고 종료까지 대기"""
+    procs = []
+    for i in range(workers):
+        worker = f'{socket.gethostname()}-w{i}'
+        cmd = [
+            sys.executable, '-m', 'scrapy', 'crawl', spider,
+            '-a', f'frontier={db}',
+            '-a', f'worker={worker}',
+            '-s', f'FEEDS={worker_feeds(feed_dir, worker)}',
+            '-s', f"JSONL_FEED_DIR={os.path.join(feed_dir, 'jsonl', worker)}",
+            *extra_args,
+        ]
+        procs.append(subprocess.Popen(cmd))
+    return max(p.wait() for p in procs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ASIN 크롤 프론티어 관리')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_run = sub.add_parser('run', help='워커 N 개 실행')
+    p_run.add_argument('--workers', type=int, default=os.cpu_count())
+    p_run.add_argument('--out', help='종료 후 결과를 병합할 JSON 파일')
+    p_run.add_argument('--feed-dir', default='./data/result/frontier', help='워커별 FEEDS / JSON Lines 출력 디렉터리')
+    p_run.add_argument('scrapy_args', nargs=argparse.REMAINDER, help='scrapy crawl 에 그대로 넘길 인자')
+
+    sub.add_parser('status', help='상태별 ASIN 개수')
+    sub.add_parser('reset', help='전체 ASIN 을 대기 상태로')
+
+    p_failed = sub.add_parser('failed', help='임대 횟수를 다 써서 failed 가 된 ASIN 목록')
+    p_failed.add_argument('--requeue', action='store_true', help='failed ASIN 을 대기 상태로 되돌림')
+
+    p_export = sub.add_parser('export', help='완료 item 병합 저장')
+    p_export.add_argument('--out', required=True)
+
+    for p in sub.choices.values():
+        p.add_argument('--db', required=True)
+
+    args = parser.parse_args(argv)
+    frontier = AsinFrontier(args.db)
+
+    if args.command == 'run':
+        code = run_workers(args.db, args.workers, extra_args=args.scrapy_args, feed_dir=args.feed_dir)
+        print(frontier.counts())
+        if args.out:
+            print(f'{export_items(frontier, args.out)}개 item 저장: {args.out}')
+        return code
+    if args.command == 'status':
+        print(frontier.counts())
+    elif args.command == 'reset':
+        frontier.reset()
+        print(frontier.counts())
+    elif args.command == 'failed':
+        for asin, attempts, worker in frontier.failed():
+            print(f'{asin}\t임대 {attempts}회\t{worker}')
+        if args.requeue:
+            print(f'{frontier.requeue_failed()}개 대기 상태로 되돌림')
+    elif args.command == 'export':
+        print(f'{export_items(frontier, args.out)}개 item 저장: {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,54 +1,54 @@
 import re
-import js2py
+from collections import Counter
+
 from parsel import Selector
 
+from utils.js_literal import JsLiteralError, parse_js_literal
+from utils.board_rules import board_name_and_division, classify_board
+from utils.extract_profile import timed
+from utils.page_check import PageStatus, classify_response
+from utils.html_backend import as_document, parse_document
+from utils.selector_plan import compile_selector
+
 def check_page_validity(response, logger, item):
     """
-    페이지가 유효한지 확인
+    페이지가 유효한지 확인 (본문 bytes 단일 스캔, DOM 파싱 없음)
     """
-    # 페이지 타이틀 확인
-    title = response.xpath('//title/text()').get('').lower()
-    logger.info(f"페이지 유효 검사 추출 항목 : {title}")
-    if 'page not found' in title:
+    status = classify_response(response)
+    logger.info("페이지 유효 검사 결과 : %s", status.value)
+    if status is PageStatus.NOT_FOUND:
         logger.warning("Page not found")
         item['error'] = "Page not found"
         return False
-    
-    # 페이지 소스에서 "Page Not Found" 텍스트 확인
-    if 'page not found' in response.body.decode('utf-8', errors='ignore').lower():
-        item['error'] = "Page not found"
-        logger.warning("Page not found")
-        return False
-    
-    if "api-services-support@amazon.com" in response.text or "captcha" in response.text.lower():
+
+    if status is PageStatus.ROBOT_CHECK:
         item['error'] = "bot or captcha"
         logger.warning("로봇 페이지 감지됨")
         return False
-    
+
+    if status is PageStatus.EMPTY:
+        item['error'] = "Empty page"
+        logger.warning("빈 페이지")
+        return False
+
     return True
 
+@timed()
 def extract_product_title(response, title_selectors):
-    # 여러 선택자를 시도하여 제목 찾기
+    # 여러 선택자를 시도하여 제목 찾기 (title_selectors: 컴파일된 선택자)
     title = None
+    doc = as_document(response)
     for selector in title_selectors:
-        if '::' in selector:  # CSS 선택자
-            title_elements = response.css(selector).getall()
-            if title_elements:
-                title_raw = ' '.join([t.strip() for t in title_elements if t.strip()])
-                if title_raw:
-                    title = title_raw
-                    break
-        else:  # XPath 선택자
-            title_elements = response.xpath(selector).getall()
-            if title_elements:
-                title_raw = ' '.join([t.strip() for t in title_elements if t.strip()])
-                if title_raw:
-                    title = title_raw
-                    break
-    
+        title_elements = doc.getall(selector)
+        if title_elements:
+            title_raw = ' '.join([t.strip() for t in title_elements if t.strip()])
+            if title_raw:
+                title = title_raw
+                break
+
     # 더 넓은 범위로 검색 시도
     if not title:
-        title_container = response.css('div#titleSection, div#title_feature_div, div#centerCol').extract_first()
+        title_container = _title_container(doc)
         if title_container:
             # HTML에서 텍스트 추출 (임시)
             from scrapy.selector import Selector
@@ -62,17 +62,18 @@ def extract_product_title(response, title_selectors):
     else:        
         return "제목을 찾을 수 없습니다."
 
+def _title_container(doc):
+    return doc.response.css('div#titleSection, div#title_feature_div, div#centerCol').extract_first()
+
 # 기본 상세, 확장 정보 결합 추출
+@timed()
 def combine_basic_expand_extract(response, logger, item, row_selectors, c):
     check_list = c
     key_list = list(check_list.keys())
     items = {}
+    doc = as_document(response)
     try:
-        rows = response.xpath('//table[contains(@class, "a-keyvalue") and contains(@class, "prodDetTable")]//tr')
-        for row in rows:
-            header = row.xpath('./th//text()').getall()
-            value = row.xpath('./td//text()').getall()
-
+        for header, value in doc.detail_table():
             header = ''.join(header).strip() if header else None
             value = ''.join(value).strip() if value else None
             # print(f"[basic_info 디버그] header: {header}, value: {value}")
@@ -85,10 +86,7 @@ def combine_basic_expand_extract(response, logger, item, row_selectors, c):
                         field_name = header.replace(' ', '_')
                         items[field_name] = value
 
-        detail_list = response.xpath('//div[@id="detailBullets_feature_div"]//ul/li')
-        for li in detail_list:
-            label = li.xpath('.//span[@class="a-text-bold"]/text()').get()
-            value_parts = li.xpath('.//span[@class="a-list-item"]//text()[not(parent::span[contains(@class, "a-text-bold")])]').getall()
+        for label, value_parts in doc.detail_bullets():
             if label:
                 label = re.sub(r'[_\s]{5,}', '', label) 
                 label = label.strip().replace('\n', '').replace('\u200f', '').replace('\u200e', '').replace(":", "") if label else None
@@ -106,25 +104,16 @@ def combine_basic_expand_extract(response, logger, item, row_selectors, c):
 
         items2 = {}
         for selector in row_selectors:
-            sel_value = selector['value'].strip()
-            if not sel_value:
-                continue
-
-            rows = response.xpath(sel_value)
+            rows = doc.overview_rows(selector)
             if not rows:
                 continue
 
-            for row in rows:
+            # (td[1] 텍스트, truncate된 전체 텍스트, td[2] 텍스트 목록)
+            for header, value, value_parts in rows:
                 try:
-                    header = row.xpath('normalize-space(./td[1])').get()
-
-                    # truncate된 전체 텍스트 우선 추출
-                    value = row.xpath('./td[2]//span[contains(@class, "a-truncate-full") and contains(@class, "a-offscreen")]/text()').get()
-
-                    # 없으면 일반적인 텍스트 fallback (script 제외)
+                    # truncate된 전체 텍스트 우선, 없으면 일반적인 텍스트 fallback (script 제외)
                     if not value:
-                        value = row.xpath('./td[2]//text()[not(ancestor::script)]').getall()
-                        value = ''.join(value).strip()
+                        value = ''.join(value_parts).strip()
 
                     if header and value:
                         if header in key_list:
@@ -145,32 +134,45 @@ def combine_basic_expand_extract(response, logger, item, row_selectors, c):
         logger.error(f"상세 정보 추출 중 오류: {str(e)}")
 
 
+_STYLE = compile_selector('#inline-twister-expanded-dimension-text-style_name::text')
+_IMAGE_HIRES = compile_selector('#landingImage::attr(data-old-hires)')
+_IMAGE_SRC = compile_selector('#landingImage::attr(src)')
+# li[last()] 는 CSS 자동 변환이 안 되므로 CSS 형태를 직접 지정
+_CATEGORY = compile_selector(
+    '//div[@id="wayfinding-breadcrumbs_feature_div"]//ul/li[last()]/span/a/text()', 'xpath',
+    css='div#wayfinding-breadcrumbs_feature_div ul > li:last-of-type > span > a::text')
+
+
+@timed()
 def extract_style_info(response, logger):
     """
     제품 스타일 정보 추출
     """
     try:
-        style = response.css('#inline-twister-expanded-dimension-text-style_name::text').get()
+        style = as_document(response).get(_STYLE)
         if style:
             return style.strip()
     except Exception as e:
         logger.error(f"스타일 정보 추출 중 오류: {str(e)}")
     return 'null'
 
+@timed()
 def extract_image_url(response, logger):
     """
     제품 이미지 URL 추출
     """
     try:
         # landingImage 이미지 속성 확인
-        img_url = response.css('#landingImage::attr(data-old-hires)').get()
+        doc = as_document(response)
+        img_url = doc.get(_IMAGE_HIRES)
         if not img_url:
-            img_url = response.css('#landingImage::attr(src)').get()
+            img_url = doc.get(_IMAGE_SRC)
         return img_url if img_url else ''
     except Exception as e:
         logger.error(f"이미지 URL 추출 중 오류: {str(e)}")
         return ''
 
+@timed()
 def set_data_gbn(item, logger):
     """
     베스트셀러 순위에 따라 데이터 구데이터분을 설정
@@ -190,239 +192,106 @@ def set_data_gbn(item, logger):
         logger.error(f"베스트셀러 순위 처리 중 오류: {str(e)}")
         item['data_gbn'] = 'NORMAL'
 
+@timed()
 def determine_board_type(item, resposne):
     """
-    제품 정보를 기반으로 보드 타입 결정
+    제품 정보를 기반으로 보드 타입 결정 (규칙표: utils/board_rules.py)
     """
-    product_name = item.get('product_name', '').lower()
-    connectivity_technology = item.get('expand_info', {}).get('Connectivity_technology', '')
-    hard_disk_description = item.get('expand_info', {}).get('Hard_Disk_Description', '')
-    flash_memory_type = item.get('expand_info', {}).get('Flash_Memory_Type', '')
-    hardware_connectivity = item.get('expand_info', {}).get('Hardware_Connectivity' '')
-    hardware_interface = item.get('expand_info', {}).get('Hardware_Interface', '')
-    installation_type = item.get('expand_info', {}).get('Installation_Type', '')
-    
-    external_keyword = ['external', 'exter','portable', 'usb', 'drive for mac', 'drive for pc', 'type-c']
-    internal_keyword = ['internal', 'm.2', 'ide', 'sata', '2.5', 'pcie', '2280', 'gen4 x4', 'gen3 x4']
-    sd_keyword = ['sdxc', 'sdhc', 'sd', 'secure digital card', 'tf card', 'tf memory card']
-    ssd_keyword = ['ssd', 'solid state drive', 'solid state hard drive']
-
-    category = extract_category(resposne, item)
-    if category:
-        if category == 'SD':
-            if any(keyword in product_name for keyword in ['tf card', 'tf memory card', 'micro']):
-                return 'Micro SD'
-        return category
-    
-    # description -> name -> installation_type
-    if hard_disk_description:
-        hard_disk_description = hard_disk_description.lower()
-        if any(keyword in hard_disk_description for keyword in ssd_keyword):
-            if any(keyword in product_name for keyword in external_keyword):
-                return 'External SSD'
-            elif any(keyword in product_name for keyword in internal_keyword):
-                return 'Internal SSD'
-            else:
-                if installation_type:
-                    installation_type = installation_type.lower()
-                    if 'external' in installation_type:
-                        return 'External SSD'
-                    elif 'internal' in installation_type:
-                        return 'Internal SSD'
-        else:
-            if 'solid state drive' in product_name:
-                if any(keyword in product_name for keyword in external_keyword):
-                    return 'External SSD'
-                elif any(keyword in product_name for keyword in internal_keyword):
-                    return 'Internal SSD'
-                else:
-                    if installation_type:
-                        installation_type = installation_type.lower()
-                        if 'external' in installation_type:
-                            return 'External SSD'
-                        elif 'internal' in installation_type:
-                            return 'Internal SSD'
-    else:
-        if any(keyword in product_name for keyword in ssd_keyword):
-            if any(keyword in product_name for keyword in external_keyword):
-                return 'External SSD'
-            elif any(keyword in product_name for keyword in internal_keyword):
-                return 'Internal SSD'
-            else:
-                if installation_type:
-                    installation_type = installation_type.lower()
-                    if 'external' in installation_type:
-                        return 'External SSD'
-                    elif 'internal' in installation_type:
-                        return 'Internal SSD'
-
-
-    if flash_memory_type:
-        flash_memory_type = flash_memory_type.lower()
-        if 'usb' in flash_memory_type:
-            return 'Flash Drive'
-        else:
-            if connectivity_technology:
-                connectivity_technology = connectivity_technology.lower()
-                if 'usb' in connectivity_technology:
-                    return 'Flash Drive'
-                else:
-                    if 'flash drive' in product_name:
-                        return 'Flash Drive'
-            else:
-                if 'flash drive' in product_name:
-                    return 'Flash Drive'
-    else:    
-        if connectivity_technology:
-            if 'usb' in connectivity_technology:
-                return 'Flash Drive'
-            else:
-                if 'flash drive' in product_name:
-                    return 'Flash Drive'
-        else:
-            if 'flash drive' in product_name:
-                return 'Flash Drive'
-        
-
-    if flash_memory_type:
-        flash_memory_type = flash_memory_type.lower()
-        if any(keyword in flash_memory_type for keyword in sd_keyword):
-            if 'micro' in flash_memory_type or 'tf card' in flash_memory_type:
-                return 'Micro SD'
-            else:
-                if 'micro' in product_name:
-                    return 'Micro SD'
-                return 'SD'
-    elif hardware_connectivity:
-        hardware_connectivity = hardware_connectivity.lower()
-        if any(keyword in hardware_connectivity for keyword in sd_keyword):
-            if 'micro' in hardware_connectivity or 'tf card' in hardware_connectivity:
-                return 'Micro SD'
-            else:
-                if 'micro' in product_name:
-                    return 'Micro SD'
-                return 'SD'
-    elif hardware_interface:
-        hardware_interface = hardware_interface.lower()
-        if any(keyword in hardware_interface for keyword in sd_keyword):
-            if 'micro' in hardware_interface or 'tf card' in hardware_interface:
-                return 'Micro SD'
-            else:
-                if 'micro' in product_name:
-                    return 'Micro SD'
-                return 'SD'
-    else:
-        if any(keyword in product_name for keyword in sd_keyword):
-            if 'micro' in product_name or 'tf card' in product_name:
-                return 'Micro SD'
-            else:
-                return 'SD'
-    return 'Unknown'
+    category = extract_category(resposne, item) or None
+    return classify_board(item, category)
 
+@timed()
 def set_board_name_and_division(item, board_type):
     """
     보드 타입을 기반으로 board_name과 division 설정
     """
-    # board_name 설정
-    if board_type != 'Unknown':
-        if item.get('data_gbn') == 'BEST':
-            item['board_name'] = f'BEST_{board_type}'
-        else:
-            item['board_name'] = board_type
-    else:
-        item['board_name'] = 'Unknown'
-    
-    # division 설정
-    if board_type == 'External SSD':
-        item['division'] = 'PSSD'
-    elif board_type == 'Internal SSD':
-        item['division'] = 'SSD'
-    elif board_type == 'Micro SD':
-        item['division'] = 'microSD'
-    elif board_type == 'SD':
-        item['division'] = 'SD'
-    elif board_type == 'Flash Drive':
-        item['division'] = 'Flash Drive'
-    else:
-        item['division'] = 'Unknown'
+    item['board_name'], item['division'] = board_name_and_division(board_type, item.get('data_gbn'))
 
 
 # dataToReturn 객체 추출
+DATA_TO_RETURN_KEYS = [
+    'currentAsin', 'landingAsin', 'parentAsin',
+    'dimensionToAsinMap', 'variationValues',
+    'num_total_variations', 'dimensionValuesDisplayData',
+    'variationDisplayLabels'
+]
+_DATA_TO_RETURN_RE = re.compile(r'var\s+dataToReturn\s*=\s*')
+
+# 파싱 방식별 횟수 (native: 자체 파서, js2py: 대체 실행, missing: 스크립트 없음)
+data_to_return_stats = Counter()
+
+
+@timed()
 def get_data_to_return(response, item, logger):
-        items = {}
-        script_tags = []
+    # 페이지 텍스트를 한 번만 훑어 dataToReturn 선언 위치를 찾음
+    text = response.text
+    match = _DATA_TO_RETURN_RE.search(text)
+    if not match:
+        data_to_return_stats['missing'] += 1
+        logger.warning("❌ dataToReturn 스크립트를 찾을 수 없음")
+        return
 
-        script_tags.extend(response.xpath('//script[not(@src)]/text()').getall())
-        script_tags.extend(response.xpath('//script/text()').getall())
+    try:
+        data, _ = parse_js_literal(text, match.end())
+        if not isinstance(data, dict):
+            raise JsLiteralError('dataToReturn 이 객체가 아님')
+        data_to_return_stats['native'] += 1
+    except JsLiteralError as e:
+        logger.debug(f"dataToReturn 자체 파싱 실패, js2py 로 대체: {e}")
+        data = _data_to_return_js2py(text, match.start(), logger)
+        if data is None:
+            return
+        data_to_return_stats['js2py'] += 1
 
+    items = {}
+    for key in DATA_TO_RETURN_KEYS:
+        value = data.get(key)
+        if key == 'parentAsin':
+            item['group_id'] = value if value is not None else item['asin']
+        items[key] = value
+    item['expand_info'].update(items)
+
+
+def _data_to_return_js2py(text, start, logger):
+    """자체 파서가 처리하지 못한 경우 기존 방식(js2py 실행)으로 대체"""
+    match = re.compile(r'var\s+dataToReturn\s*=\s*({.*?});', re.DOTALL).match(text, start)
+    if not match:
+        logger.warning("❌ dataToReturn 객체를 찾을 수 없음")
+        return None
 
-        for node in response.xpath('//script[not(@src)]'):
-            script_tags.append(node.xpath('string(.)').get())
-                
-        target_script = None
-        for script in script_tags:
-            if 'var dataToReturn' in script:
-                target_script = script
-                break
+    try:
+        import js2py
 
-        if target_script:
-            match = re.search(r'var\s+dataToReturn\s*=\s*({.*?});', target_script, re.DOTALL)
-            if match:
-                js_code = match.group(0)
+        context = js2py.EvalJs()
+        context.execute(match.group(0))
+    except Exception as e:
+        logger.error(f"❌ JavaScript 실행 실패: {e}")
+        return None
 
-                try:
-                    context = js2py.EvalJs()
-                    context.execute(js_code)
-
-                    keys_to_extract = [
-                        'currentAsin', 'landingAsin', 'parentAsin',
-                        'dimensionToAsinMap', 'variationValues',
-                        'num_total_variations', 'dimensionValuesDisplayData',
-                        'variationDisplayLabels'
-                    ]
-                    
-                    for key in keys_to_extract:
-                        try:
-                            value = getattr(context.dataToReturn, key)
-                            if key == 'parentAsin':
-                                if value != None:
-                                    item['group_id'] = value
-                                else:
-                                    item['group_id'] = item['asin']
-
-                            if hasattr(value, 'to_dict'):
-                                items[key] = value.to_dict()
-                            elif hasattr(value, 'to_list'):
-                                items[key] = value.to_list()
-                            else:
-                                items[key] = value
-                        except Exception:
-                            items[key] = None
-                    item['expand_info'].update(items)
-                    # self.logger.info(json.dumps(item, indent=4, ensure_ascii=False))
-                except Exception as e:
-                    logger.error(f"❌ JavaScript 실행 실패: {e}")
-            else:
-                logger.warning("❌ dataToReturn 객체를 찾을 수 없음")
-        else:
-            logger.warning("❌ dataToReturn 스크립트를 찾을 수 없음")
+    data = {}
+    for key in DATA_TO_RETURN_KEYS:
+        try:
+            value = getattr(context.dataToReturn, key)
+            if hasattr(value, 'to_dict'):
+                value = value.to_dict()
+            elif hasattr(value, 'to_list'):
+                value = value.to_list()
+            data[key] = value
+        except Exception:
+            data[key] = None
+    return data
 
 
 # 가격 정보 추출
-def extract_price_match(sel: Selector, selectors: list[str]) -> str:
+def extract_price_match(sel: Selector, selectors) -> str:
+    doc = as_document(sel)
     for s in selectors:
-        try:
-            if '::' in s:
-                value = sel.css(s).get()
-            else:
-                value = sel.xpath(s).get()
-            if value:
-                return value.strip()
-        except Exception as e:
-            print(f'가격 정보 추출 중 에러 : {e}')
-            continue
+        value = doc.get(s)
+        if value:
+            return value.strip()
     return None
 
+@timed()
 def extract_price_info(sel: Selector, logger, config: dict) -> dict:
     price = extract_price_match(sel, config.get("price_selectors", []))
     if price:
@@ -435,15 +304,12 @@ def extract_price_info(sel: Selector, logger, config: dict) -> dict:
 
 
 # 별점, 리뷰수 추출 
-def extract_rating_match(sel: Selector, selectors: list[str], logger) -> str:
+def extract_rating_match(sel: Selector, selectors, logger) -> str:
+    doc = as_document(sel)
     for s in selectors:
-        try:
-            value = sel.css(s).get() if '::' in s else sel.xpath(s).get()
-            if value:
-                return value.strip()
-        except Exception as e:
-            logger.error(f"별점(리뷰수) 처리 중 오류: {str(e)}")
-            continue
+        value = doc.get(s)
+        if value:
+            return value.strip()
     return None
 
 def clean_rating(value: str) -> str:
@@ -458,6 +324,7 @@ def clean_review_count(value: str) -> str:
     match = re.search(r'[\d,]+', value)
     return match.group().replace(',', '') if match else None
 
+@timed()
 def extract_rating_info(sel: Selector, config: dict, logger, item) -> dict:
     raw_rating = extract_rating_match(sel, config.get("rating_selectors", []), logger)
     raw_reviews = extract_rating_match(sel, config.get("review_count_selectors", []), logger)
@@ -465,10 +332,65 @@ def extract_rating_info(sel: Selector, config: dict, logger, item) -> dict:
                                 'review_count': clean_review_count(raw_reviews)})
     
 
+def extractor_inputs(doc, configs):
+    """추출기 체인이 페이지에서 읽는 원본 값을 차례로 반환 (페이지 지문용, utils/page_fingerprint.py)
+
+    selectors.json 의 모든 선택자와 고정 선택자의 조회 결과를 그대로 내보내므로,
+    추출기가 읽는 곳이 바뀌면 값도 바뀐다. 추출기에 새 조회를 넣으면 여기에도 넣는다.
+    dataToReturn 스크립트는 DOM 밖(본문 bytes)에서 따로 해시한다.
+    """
+    titles = [doc.getall(selector) for selector in configs['title_selectors']]
+    yield titles
+    if not any(t.strip() for values in titles for t in values):
+        yield _title_container(doc)
+    yield doc.detail_table()
+    yield doc.detail_bullets()
+    for selector in configs['row_selectors']:
+        yield doc.overview_rows(selector)
+    for key in ('price_selectors', 'list_price_selectors', 'discount_selectors',
+                'rating_selectors', 'review_count_selectors'):
+        for selector in configs.get(key, ()):
+            yield doc.getall(selector)
+    for selector in (_STYLE, _IMAGE_HIRES, _IMAGE_SRC, _CATEGORY):
+        yield doc.getall(selector)
+
+
+@timed()
+def extract_product_details(response, item, configs, logger, backend='parsel', doc=None):
+    """
+    상품 상세 페이지 추출기 체인 (AmazonProductSpider.parse 본문)
+    configs 는 selector_plan.compile_selectors 로 컴파일한 selectors.json,
+    backend 는 html_backend.resolve_backend 로 정한 HTML 파서 백엔드
+    doc 을 주면 (지문 계산에 쓴 문서) 다시 파싱하지 않고 그대로 쓴다
+    """
+    if doc is None:
+        doc = parse_document(response, backend)
+    item['expand_info'] = {}
+    # 제품명 추출
+    item['product_name'] = extract_product_title(doc, configs['title_selectors'])
+    # 제품 정보 추출
+    combine_basic_expand_extract(doc, logger, item, configs['row_selectors'], configs['check_list'])
+    # 가격 정보 추출
+    item['expand_info'].update(extract_price_info(doc, logger, configs))
+    # 별점, 리뷰수 추출
+    extract_rating_info(doc, configs, logger, item)
+    # 스타일 정보 추출
+    item['style'] = extract_style_info(doc, logger)
+    # 이미지 URL 추출
+    item['image_url'] = extract_image_url(doc, logger)
+    # Best Seller 등급 설정
+    set_data_gbn(item, logger)
+    # 보드 타입 결정 및 설정
+    board_type = determine_board_type(item, doc)
+    set_board_name_and_division(item, board_type)
+    # data to return 객체 추출
+    get_data_to_return(response, item, logger)
+    return item
+
+
+@timed()
 def extract_category(response, item):
-    category = response.xpath(
-        '//div[@id="wayfinding-breadcrumbs_feature_div"]//ul/li[last()]/span/a/text()'
-    ).get()
+    category = as_document(response).get(_CATEGORY)
 
     # category = response.css(
     #     '#wayfinding-breadcrumbs_feature_div ul li span a::text'
@@ -0,0 +1,234 @@
+"""
+상품 페이지 HTML 파서 백엔드
+
+helper_parse 추출기들은 Document 인터페이스로만 페이지를 조회한다.
+    parsel     : Scrapy 응답의 parsel/lxml 트리 (기본, 항상 사용 가능)
+    selectolax : lexbor HTML5 파서. 파싱과 CSS 조회가 lxml XPath 보다 훨씬 빠르다.
+                 CSS 형태가 없는 선택자만 parsel 트리를 그때 만들어 처리한다.
+    auto       : selectolax 가 설치되어 있으면 selectolax, 없으면 parsel
+
+Document 인터페이스:
+    get(selector) / getall(selector)   컴파일된 선택자(selector_plan.CompiledSelector) 조회
+    detail_table()                     prodDetTable 행의 (th 텍스트 목록, td 텍스트 목록)
+    detail_bullets()                   detailBullets 항목의 (라벨, 값 텍스트 목록)
+    overview_rows(selector)            row_selectors 행의 (td[1] 텍스트, truncate 전체 텍스트, td[2] 텍스트 목록)
+"""
+import logging
+import re
+
+from utils.extract_profile import ProfiledDocument, profiler, timed
+from utils.selector_plan import compile_selector, document_root
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('parsel', 'selectolax')
+
+_DETAIL_TABLE_ROWS = compile_selector(
+    '//table[contains(@class, "a-keyvalue") and contains(@class, "prodDetTable")]//tr', 'xpath')
+_DETAIL_BULLETS = compile_selector('//div[@id="detailBullets_feature_div"]//ul/li', 'xpath')
+
+# 행/항목 안에서 쓰는 고정 XPath (parsel 백엔드)
+_ROW_TH_TEXT = compile_selector('./th//text()', 'xpath')
+_ROW_TD_TEXT = compile_selector('./td//text()', 'xpath')
+_BULLET_LABEL = compile_selector('.//span[@class="a-text-bold"]/text()', 'xpath')
+_BULLET_VALUE = compile_selector(
+    './/span[@class="a-list-item"]//text()[not(parent::span[contains(@class, "a-text-bold")])]', 'xpath')
+_ROW_HEADER = compile_selector('normalize-space(./td[1])', 'xpath')
+_ROW_TRUNCATED_VALUE = compile_selector(
+    './td[2]//span[contains(@class, "a-truncate-full") and contains(@class, "a-offscreen")]/text()', 'xpath')
+_ROW_TEXT_VALUE = compile_selector('./td[2]//text()[not(ancestor::script)]', 'xpath')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]+')
+
+
+def resolve_backend(name):
+    """설정값(parsel / selectolax / auto)을 실제 사용할 백엔드 이름으로 변환"""
+    name = (name or 'parsel').lower()
+    if name == 'auto':
+        return 'selectolax' if LexborHTMLParser is not None else 'parsel'
+    if name not in BACKENDS:
+        raise ValueError(f'알 수 없는 HTML 파서 백엔드: {name}')
+    if name == 'selectolax' and LexborHTMLParser is None:
+        logger.warning("selectolax 가 설치되어 있지 않아 parsel 백엔드를 사용합니다.")
+        return 'parsel'
+    return name
+
+
+@timed()
+def parse_document(response, backend='parsel'):
+    doc = LexborDocument(response) if backend == 'selectolax' else ParselDocument(response)
+    # 프로파일링 중이면 선택자 조회를 기록하는 래퍼로 감쌈
+    return ProfiledDocument(doc) if profiler.enabled else doc
+
+
+def as_document(obj):
+    """Document 는 그대로, Response / Selector 는 parsel 백엔드로 감쌈"""
+    if isinstance(obj, (ParselDocument, LexborDocument, ProfiledDocument)):
+        return obj
+    return ParselDocument(obj)
+
+
+class ParselDocument:
+    backend = 'parsel'
+
+    def __init__(self, response):
+        self.response = response
+        self.root = document_root(response)
+
+    def get(self, selector):
+        return selector.get(self.root)
+
+    def getall(self, selector):
+        return selector.getall(self.root)
+
+    def detail_table(self):
+        return [(_ROW_TH_TEXT.getall(row), _ROW_TD_TEXT.getall(row)) for row in _DETAIL_TABLE_ROWS(self.root)]
+
+    def detail_bullets(self):
+        return [(_BULLET_LABEL.get(li), _BULLET_VALUE.getall(li)) for li in _DETAIL_BULLETS(self.root)]
+
+    def overview_rows(self, selector):
+        return [
+            (_ROW_HEADER.get(row), _ROW_TRUNCATED_VALUE.get(row), _ROW_TEXT_VALUE.getall(row))
+            for row in selector(self.root)
+        ]
+
+
+class LexborDocument:
+    backend = 'selectolax'
+
+    def __init__(self, response):
+        self.response = response
+        self.tree = LexborHTMLParser(response.body)
+        self._fallback = None
+
+    @property
+    def fallback(self):
+        # CSS 형태가 없는 선택자용 parsel 트리 (필요할 때 한 번만 생성)
+        if self._fallback is None:
+            self._fallback = ParselDocument(self.response)
+        return self._fallback
+
+    def getall(self, selector):
+        if selector.css is None:
+            return self.fallback.getall(selector)
+        query, mode, attr = selector.css
+        values = []
+        for node in self.tree.css(query):
+            if mode == 'text':
+                values.extend(_texts(node))
+            elif mode == 'deep':
+                values.extend(_deep_texts(node))
+            elif mode == 'attr':
+                value = node.attributes.get(attr)
+                if value is not None:
+                    values.append(value)
+            else:
+                values.append(node.html)
+        return values
+
+    def get(self, selector):
+        if selector.css is None:
+            return self.fallback.get(selector)
+        query, mode, attr = selector.css
+        for node in self.tree.css(query):
+            if mode == 'text':
+                values = _texts(node)
+            elif mode == 'deep':
+                values = _deep_texts(node)
+            elif mode == 'attr':
+                value = node.attributes.get(attr)
+                values = [] if value is None else [value]
+            else:
+                values = [node.html]
+            if values:
+                return values[0]
+        return None
+
+    def detail_table(self):
+        result = []
+        for row in self.tree.css(_DETAIL_TABLE_ROWS.css[0]):
+            headers, values = [], []
+            for cell in _children(row, 'th'):
+                headers.extend(_deep_texts(cell))
+            for cell in _children(row, 'td'):
+                values.extend(_deep_texts(cell))
+            result.append((headers, values))
+        return result
+
+    def detail_bullets(self):
+        result = []
+        for li in self.tree.css(_DETAIL_BULLETS.css[0]):
+            label = None
+            for span in li.css('span[class="a-text-bold"]'):
+                texts = _texts(span)
+                if texts:
+                    label = texts[0]
+                    break
+            # 중첩된 a-list-item 에서 같은 텍스트 노드가 두 번 나오지 않도록 mem_id 로 중복 제거
+            seen = set()
+            value_parts = []
+            for span in li.css('span[class="a-list-item"]'):
+                for node in span.traverse(include_text=True):
+                    if not node.is_text_node or node.mem_id in seen:
+                        continue
+                    seen.add(node.mem_id)
+                    parent = node.parent
+                    if parent.tag == 'span' and 'a-text-bold' in (parent.attributes.get('class') or ''):
+                        continue
+                    value_parts.append(node.text_content)
+            result.append((label, value_parts))
+        return result
+
+    def overview_rows(self, selector):
+        if selector.css is None:
+            return self.fallback.overview_rows(selector)
+        result = []
+        for row in self.tree.css(selector.css[0]):
+            cells = _children(row, 'td')
+            header = _WHITESPACE.sub(' ', ''.join(_deep_texts(cells[0]))).strip(' \t\n\r') if cells else ''
+            truncated, values = None, []
+            if len(cells) > 1:
+                for span in cells[1].css('span[class*="a-truncate-full"][class*="a-offscreen"]'):
+                    texts = _texts(span)
+                    if texts:
+                        truncated = texts[0]
+                        break
+                values = _deep_texts(cells[1], skip_script=True)
+            result.append((header, truncated, values))
+        return result
+
+
+def _children(node, tag):
+    return [child for child in node.iter() if child.tag == tag]
+
+
+def _texts(node):
+    """node/text() 와 같은 직계 텍스트 노드 목록"""
+    return [child.text_content for child in node.iter(include_text=True) if child.is_text_node]
+
+
+def _deep_texts(node, skip_script=False):
+    """node//text() 와 같은 모든 하위 텍스트 노드 목록"""
+    texts = []
+    for child in node.traverse(include_text=True):
+        if not child.is_text_node:
+            continue
+        if skip_script and _inside(child, 'script', node):
+            continue
+        texts.append(child.text_content)
+    return texts
+
+
+def _inside(node, tag, stop):
+    parent = node.parent
+    while parent is not None and parent.mem_id != stop.mem_id:
+        if parent.tag == tag:
+            return True
+        parent = parent.parent
+    return False
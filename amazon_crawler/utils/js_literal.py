@@ -0,0 +1,142 @@
+"""
+JavaScript 객체 리터럴 파서
+
+아마존 페이지의 `var dataToReturn = {...};` 처럼 코드 실행 없이 값만 있는
+JS 리터럴(따옴표 없는 키, 작은따옴표 문자열, 끝에 붙은 쉼표, 주석 포함)을
+파이썬 dict / list 로 바로 변환한다. 함수 호출이나 연산식 등 리터럴이 아닌
+값을 만나면 JsLiteralError 를 던지므로 호출 측에서 js2py 로 대체할 수 있다.
+"""
+import re
+
+
+class JsLiteralError(ValueError):
+    pass
+
+
+_SKIP = re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/)*', re.DOTALL)
+_IDENT = re.compile(r'[A-Za-z_$][\w$]*')
+_NUMBER = re.compile(r'-?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+_STRING = {
+    '"': re.compile(r'"((?:[^"\\\n]|\\.)*)"', re.DOTALL),
+    "'": re.compile(r"'((?:[^'\\\n]|\\.)*)'", re.DOTALL),
+}
+_ESCAPE = re.compile(r'\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|[\s\S])')
+_SIMPLE_ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0',
+    '\n': '', '\r\n': '', '\r': '',
+}
+_KEYWORDS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+
+def parse_js_literal(text, pos=0):
+    """text[pos:] 의 JS 리터럴 하나를 파싱해 (값, 끝 위치) 반환"""
+    return _Parser(text).value(pos)
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+
+    def skip(self, pos):
+        return _SKIP.match(self.text, pos).end()
+
+    def value(self, pos):
+        pos = self.skip(pos)
+        if pos >= len(self.text):
+            raise JsLiteralError('예상치 못한 입력 끝')
+        ch = self.text[pos]
+        if ch == '{':
+            return self.object(pos + 1)
+        if ch == '[':
+            return self.array(pos + 1)
+        if ch in _STRING:
+            return self.string(pos)
+        match = _NUMBER.match(self.text, pos)
+        if match:
+            return _to_number(match.group()), match.end()
+        match = _IDENT.match(self.text, pos)
+        if match and match.group() in _KEYWORDS:
+            return _KEYWORDS[match.group()], match.end()
+        raise JsLiteralError(f'리터럴이 아닌 값 (위치 {pos}): {self.text[pos:pos + 30]!r}')
+
+    def object(self, pos):
+        result = {}
+        while True:
+            pos = self.skip(pos)
+            if self.text.startswith('}', pos):
+                return result, pos + 1
+            key, pos = self.key(pos)
+            pos = self.skip(pos)
+            if not self.text.startswith(':', pos):
+                raise JsLiteralError(f"':' 가 필요함 (위치 {pos})")
+            result[key], pos = self.value(pos + 1)
+            pos = self.skip(pos)
+            if self.text.startswith(',', pos):
+                pos += 1
+            elif not self.text.startswith('}', pos):
+                raise JsLiteralError(f"',' 또는 '}}' 가 필요함 (위치 {pos})")
+
+    def key(self, pos):
+        ch = self.text[pos:pos + 1]
+        if ch in _STRING:
+            return self.string(pos)
+        match = _IDENT.match(self.text, pos) or _NUMBER.match(self.text, pos)
+        if not match:
+            raise JsLiteralError(f'잘못된 키 (위치 {pos})')
+        key = match.group()
+        # JS 객체의 키는 항상 문자열 (숫자 키 0x10 -> '16', 1.0 -> '1')
+        if match.re is _NUMBER:
+            number = _to_number(key)
+            key = str(int(number)) if number == int(number) else str(number)
+        return key, match.end()
+
+    def array(self, pos):
+        result = []
+        while True:
+            pos = self.skip(pos)
+            if self.text.startswith(']', pos):
+                return result, pos + 1
+            item, pos = self.value(pos)
+            result.append(item)
+            pos = self.skip(pos)
+            if self.text.startswith(',', pos):
+                pos += 1
+            elif not self.text.startswith(']', pos):
+                raise JsLiteralError(f"',' 또는 ']' 가 필요함 (위치 {pos})")
+
+    def string(self, pos):
+        match = _STRING[self.text[pos]].match(self.text, pos)
+        if not match:
+            raise JsLiteralError(f'닫히지 않은 문자열 (위치 {pos})')
+        raw = match.group(1)
+        if '\\' in raw:
+            raw = _ESCAPE.sub(_unescape, raw)
+            # \uD83D\uDE00 같은 서로게이트 쌍을 한 글자로 합침
+            try:
+                raw = raw.encode('utf-16', 'surrogatepass').decode('utf-16')
+            except UnicodeDecodeError as e:
+                # 짝이 없는 서로게이트는 UTF-8 로 저장할 수 없으므로 리터럴 오류로 처리 (호출 측 대체 경로)
+                raise JsLiteralError(f'짝이 없는 서로게이트 (위치 {pos})') from e
+        return raw, match.end()
+
+
+def _unescape(match):
+    seq = match.group(1)
+    if seq in _SIMPLE_ESCAPES:
+        return _SIMPLE_ESCAPES[seq]
+    if seq.startswith('u{'):
+        return chr(int(seq[2:-1], 16))
+    if seq[0] in 'ux' and len(seq) > 1:
+        code = int(seq[1:], 16)
+        return chr(code)
+    return seq
+
+
+def _to_number(token):
+    if token.lstrip('-')[:2] in ('0x', '0X'):
+        return int(token, 16)
+    number = float(token)
+    if number.is_integer() and not any(c in token for c in '.eE'):
+        return int(token)
+    return number
+
@@ -0,0 +1,122 @@
+"""
+저장된 상품 문서 타입 정규화 (1회성 마이그레이션)
+
+NormalizeItemPipeline(crawl_common.normalize) 도입 전에 저장된 best_products / product_master 문서는
+가격이 "$12.99" 같은 문자열이고 순위/리뷰 수/크롤 시각도 문자열이다.
+API 는 저장된 값을 그대로 내보내므로 (가격은 정수 센트) 이전 문서도 같은 normalize_item 으로 맞춘다.
+재크롤 이력 DB(RECRAWL_DB, utils.recrawl_scheduler)의 마지막 관측값도 예전 문자열 그대로라,
+정규화된 새 크롤 결과와 비교하면 모든 ASIN 이 바뀐 것으로 잡힌다. 같은 변환으로 이력도 맞춘다.
+이미 정규화된 값은 바뀌지 않으므로 여러 번 돌려도 된다. --apply 없이 실행하면 바뀔 문서 수만 보고한다.
+
+사용 예 (amazon_crawler 디렉터리에서):
+    python -m utils.migrate_normalize --mongo mongodb://localhost:27017 --db mydb
+    python -m utils.migrate_normalize --mongo mongodb://localhost:27017 --db mydb --apply
+    python -m utils.migrate_normalize --recrawl-db ./data/recrawl.db --skip-mongo --apply
+"""
+import argparse
+import copy
+import json
+import os
+import sqlite3
+import sys
+from collections import Counter
+
+from crawl_common.normalize import normalize_item
+
+COLLECTIONS = ('best_products', 'product_master')
+DEFAULT_RECRAWL_DB = './data/recrawl.db'  # settings.RECRAWL_DB
+
+
+def changed_fields(doc):
+    """정규화로 바뀌는 최상위 필드 -> 새 값 (expand_info 는 통째로)"""
+    normalized = normalize_item(copy.deepcopy(doc))
+    return {field: value for field, value in normalized.items()
+            if field != '_id' and (field not in doc or doc[field] != value)}
+
+
+def migrate(collection, apply=False, batch_size=1000):
+    """(검사한 문서 수, 바뀐 문서 수, 필드별 변경 수) 반환"""
+    from pymongo import UpdateOne
+
+    scanned = changed = 0
+    fields = Counter()
+    updates = []
+    for doc in collection.find({}):
+        scanned += 1
+        new_values = changed_fields(doc)
+        if not new_values:
+            continue
+        changed += 1
+        fields.update(new_values.keys())
+        if apply:
+            updates.append(UpdateOne({'_id': doc['_id']}, {'$set': new_values}))
+            if len(updates) >= batch_size:
+                collection.bulk_write(updates, ordered=False)
+                updates = []
+    if updates:
+        collection.bulk_write(updates, ordered=False)
+    return scanned, changed, fields
+
+
+def migrate_recrawl_history(path, apply=False):
+    """재크롤 이력의 추적 필드(가격/평점/리뷰 수 등)를 정규화, (검사한 ASIN 수, 바뀐 ASIN 수, 필드별 변경 수)
+
+    크롤 때처럼 item 의 expand_info 로 보고 normalize_item 을 적용한다.
+    """
+    conn = sqlite3.connect(path)
+    scanned = 0
+    fields = Counter()
+    updates = []
+    for asin, stored in conn.execute('SELECT asin, fields FROM history'):
+        scanned += 1
+        previous = json.loads(stored)
+        normalized = normalize_item({'expand_info': copy.deepcopy(previous)})['expand_info']
+        changed = [key for key, value in normalized.items() if previous.get(key) != value]
+        if changed:
+            fields.update(changed)
+            updates.append((json.dumps(normalized, ensure_ascii=False), asin))
+    if apply and updates:
+        with conn:
+            conn.executemany('UPDATE history SET fields = ? WHERE asin = ?', updates)
+    conn.close()
+    return scanned, len(updates), fields
+
+
+def report(name, scanned, changed, fields, apply, unit):
+    action = '반영' if apply else '반영 예정 (--apply 로 실행)'
+    print(f'{name}: {unit} {scanned}개 중 {changed}개 {action}')
+    for field, count in fields.most_common():
+        print(f'  {field}: {count}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='저장된 상품 문서 가격/순위/개수/크롤 시각 정규화')
+    parser.add_argument('--mongo', default='mongodb://localhost:27017', help='MongoDB URI')
+    parser.add_argument('--db', default='mydb')
+    parser.add_argument('--collection', action='append', help=f'대상 컬렉션 (여러 번 지정, 기본: {", ".join(COLLECTIONS)})')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--skip-mongo', action='store_true', help='MongoDB 컬렉션은 건너뜀')
+    parser.add_argument('--recrawl-db', default=DEFAULT_RECRAWL_DB,
+                        help=f'재크롤 이력 DB (기본: {DEFAULT_RECRAWL_DB}, 빈 문자열이면 건너뜀)')
+    parser.add_argument('--apply', action='store_true', help='MongoDB / 재크롤 이력에 정규화한 값 반영')
+    args = parser.parse_args(argv)
+
+    if not args.skip_mongo:
+        from pymongo import MongoClient
+
+        db = MongoClient(args.mongo)[args.db]
+        for name in args.collection or COLLECTIONS:
+            scanned, changed, fields = migrate(db[name], args.apply, args.batch_size)
+            report(name, scanned, changed, fields, args.apply, '문서')
+
+    if args.recrawl_db:
+        if os.path.exists(args.recrawl_db):
+            scanned, changed, fields = migrate_recrawl_history(args.recrawl_db, args.apply)
+            report(args.recrawl_db, scanned, changed, fields, args.apply, 'ASIN')
+        else:
+            print(f'{args.recrawl_db}: 재크롤 이력 DB 없음, 건너뜀')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
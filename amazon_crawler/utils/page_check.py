@@ -0,0 +1,98 @@
+"""
+바이트 단위 페이지 유효성 판별
+
+응답 본문(bytes)을 str 로 디코딩하거나 DOM 을 만들지 않고 판별한다.
+본문을 한 번 소문자로 바꾼 뒤 미리 정해 둔 패턴들을 C 구현 부분 문자열 검색으로 찾는다.
+(re 의 대소문자 무시 alternation 은 700KB 페이지에서 30ms 이상 걸려 이 방식을 쓴다)
+스파이더 parse / errback / 다운로더 미들웨어에서 공통으로 쓴다.
+
+PageCheckMiddleware 는 다운로드 중에 받은 앞부분만으로 scan_prefix 를 돌려
+로봇 체크 / 없는 상품 페이지를 일찍 걸러내고, 없는 ASIN 은 DeadAsinStore 에 기록한다.
+"""
+import os
+import sqlite3
+import time
+from enum import Enum
+
+from scrapy.exceptions import IgnoreRequest
+
+
+class PageStatus(Enum):
+    OK = 'ok'
+    NOT_FOUND = 'not-found'
+    ROBOT_CHECK = 'robot-check'
+    EMPTY = 'empty'
+
+
+# PageCheckMiddleware -> AdaptiveConcurrency (request)
+# 조기 판별한 로봇 체크 응답을 재시도 요청으로 바꿔 response_received 가 오지 않을 때 보냄
+robot_check_retried = object()
+
+# 우선순위 순서 (not-found 가 robot-check 보다 우선)
+_PATTERNS = (
+    (PageStatus.NOT_FOUND, (b'page not found',)),
+    (PageStatus.ROBOT_CHECK, (b'captcha', b'api-services-support@amazon.com')),
+)
+
+
+def classify_page(body: bytes) -> PageStatus:
+    """본문 bytes 로 페이지 상태 반환"""
+    if not body or body.isspace():
+        return PageStatus.EMPTY
+
+    lowered = body.lower()
+    for status, needles in _PATTERNS:
+        if any(needle in lowered for needle in needles):
+            return status
+    return PageStatus.OK
+
+
+def classify_response(response) -> PageStatus:
+    return classify_page(response.body)
+
+
+def scan_prefix(prefix: bytes):
+    """본문 앞부분에서 찾은 NOT_FOUND / ROBOT_CHECK, 판별할 수 없으면 None"""
+    lowered = prefix.lower()
+    for status, needles in _PATTERNS:
+        if any(needle in lowered for needle in needles):
+            return status
+    return None
+
+
+def classify_headers(headers):
+    """응답 헤더만으로 판별 (AWS WAF 챌린지), 판별할 수 없으면 None"""
+    action = headers.get(b'x-amzn-waf-action') if headers else None
+    if action and action.lower() in (b'captcha', b'challenge'):
+        return PageStatus.ROBOT_CHECK
+    return None
+
+
+class DeadAsin(IgnoreRequest):
+    """DeadAsinStore 에 없는 상품으로 기록된 ASIN 요청을 건너뜀"""
+
+
+class DeadAsinStore:
+    """없는 상품(not-found)으로 확인된 ASIN 기록, ttl 이 지나면 다시 크롤"""
+
+    def __init__(self, path, ttl):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.ttl = ttl
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS dead (
+                asin    TEXT PRIMARY KEY,
+                seen_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+    def is_dead(self, asin):
+        row = self.conn.execute('SELECT seen_at FROM dead WHERE asin = ?', (asin,)).fetchone()
+        return row is not None and row[0] >= time.time() - self.ttl
+
+    def add(self, asin):
+        self.conn.execute('INSERT OR REPLACE INTO dead (asin, seen_at) VALUES (?, ?)', (asin, time.time()))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
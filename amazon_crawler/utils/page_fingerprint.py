@@ -0,0 +1,67 @@
+"""
+상품 페이지 콘텐츠 지문(fingerprint)
+
+추출기가 실제로 읽는 값만 모아 해시한다. 읽는 곳은 helper_parse.extractor_inputs 가
+컴파일된 selectors.json 과 고정 선택자로 정하므로 (고정 id 목록 없음) 선택자가 바뀌어도
+지문이 따라간다. 조회는 추출에 쓸 Document(HTML 파서 백엔드)로 하고, dataToReturn 스크립트는
+본문 bytes 에서 찾는다. 지난 크롤과 지문이 같으면 추출기 체인을 건너뛰고
+"unchanged" item 만 내보낼 수 있다.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from utils.helper_parse import extractor_inputs
+
+_DATA_TO_RETURN = re.compile(rb'var\s+dataToReturn\s*=')
+
+
+def config_salt(config):
+    """selectors.json 이 바뀌면 지문도 바뀌도록 설정 해시를 섞음"""
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def page_fingerprint(doc, configs, salt=''):
+    """doc 은 html_backend.parse_document 결과, configs 는 컴파일된 selectors.json"""
+    # 프로파일링 래퍼면 원래 문서로 조회 (지문 조회가 선택자 적중률에 섞이지 않도록)
+    doc = getattr(doc, 'doc', doc)
+    h = hashlib.blake2b(salt.encode('utf-8'), digest_size=16)
+    for value in extractor_inputs(doc, configs):
+        h.update(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        h.update(b'\0')
+    body = doc.response.body
+    match = _DATA_TO_RETURN.search(body)
+    if match:
+        end = body.find(b'</script>', match.end())
+        h.update(body[match.start():end if end >= 0 else None])
+    return h.hexdigest()
+
+
+class PageFingerprintStore:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprint (
+                asin       TEXT PRIMARY KEY,
+                digest     TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+    def get(self, asin):
+        row = self.conn.execute('SELECT digest FROM fingerprint WHERE asin = ?', (asin,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, asin, digest):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO fingerprint (asin, digest, updated_at) VALUES (?, ?, ?)',
+            (asin, digest, time.time()),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,278 @@
+"""
+크롤 결과 샤드 후처리 (필터 -> ASIN 중복 제거 -> 병합)
+
+unknown_drop.ipynb 와 같은 결과를 파일 전체를 메모리에 올리지 않고 만든다.
+    - board_name 이 unknown / null 이거나 data_gbn 이 DELETE 인 item 제외
+    - asin 이 없는 item 제외, 같은 asin 은 입력 순서상 처음 나온 것만 유지
+    - 출력 순서는 입력 순서 그대로
+
+처리 단계 (둘 다 프로세스 풀에서 병렬)
+    1. 샤드별: item 을 스트리밍으로 읽어 필터하고, asin 해시로 나눈 파티션 파일에 (샤드, 순번, item) 기록
+    2. 파티션별: 샤드 순서대로 읽으며 asin 중복 제거 (메모리에는 해당 파티션의 asin 집합만)
+    3. 파티션 결과를 (샤드, 순번) 순으로 heapq.merge 해 출력 파일에 스트리밍 기록
+
+입력: JSON 배열 파일(FEEDS 출력), JSON Lines(.jsonl / .jl, .gz 가능), jsonl_feed 디렉터리(manifest.json)
+
+사용 예 (amazon_crawler 디렉터리에서):
+    python -m utils.postprocess "./data/result/데이터 적재/원본/"*.json -o ./data/result/final_drop.json
+    python -m utils.postprocess ./data/result/jsonl -o final.jsonl --workers 8 --partitions 128
+"""
+import argparse
+import heapq
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from crawl_common.jsonl_feed import MANIFEST, _read_lines, iter_items
+
+# (필드, 제외할 값 목록) - 대소문자 무시
+DEFAULT_DROP = (
+    ('board_name', ('unknown', 'null')),
+    ('data_gbn', ('delete',)),
+)
+
+
+def iter_input(path):
+    """입력 하나에서 item 을 하나씩 반환"""
+    if os.path.isdir(path):
+        if not os.path.exists(os.path.join(path, MANIFEST)):
+            raise ValueError(f'{path}: manifest.json 이 없는 디렉터리')
+        yield from iter_items(path)
+        return
+
+    name = path.lower()
+    for suffix, compression in (('.gz', 'gzip'), ('.zst', 'zstd')):
+        if name.endswith(suffix):
+            yield from _iter_lines(path, compression)
+            return
+    with open(path, 'r', encoding='utf-8') as f:
+        head = f.read(4096).lstrip()
+    if head.startswith('['):
+        yield from _iter_json_array(path)
+    else:
+        yield from _iter_lines(path, None)
+
+
+def _iter_lines(path, compression):
+    for line in _read_lines(path, compression):
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_json_array(path, chunk_size=1024 * 1024):
+    """최상위 JSON 배열의 원소를 청크 단위로 읽으며 하나씩 반환"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, pos, eof = '', 0, False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer, pos = buffer[pos:] + chunk, 0
+
+        def skip(chars):
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        skip(' \t\r\n')
+        if buffer[pos:pos + 1] != '[':
+            raise ValueError(f'{path}: JSON 배열이 아님')
+        pos += 1
+        while True:
+            skip(' \t\r\n,')
+            if pos >= len(buffer):
+                raise ValueError(f'{path}: 배열이 닫히지 않음')
+            if buffer[pos] == ']':
+                return
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            # 청크 끝에서 숫자 등이 잘렸을 수 있으므로 뒤에 구분자가 보일 때만 확정
+            if end >= len(buffer) and not eof:
+                fill()
+                continue
+            pos = end
+            yield value
+
+
+def keep(item, drop=DEFAULT_DROP):
+    """제외 사유(str) 또는 None"""
+    for field, values in drop:
+        value = item.get(field)
+        if value is not None and str(value).lower() in values:
+            return f'{field}={str(value).lower()}'
+    if not item.get('asin'):
+        return 'no_asin'
+    return None
+
+
+def partition_of(asin, partitions):
+    # 프로세스마다 달라지는 hash() 대신 고정 해시
+    return zlib.crc32(asin.encode('utf-8')) % partitions
+
+
+def filter_shard(shard, path, workdir, partitions, drop):
+    """1단계: 샤드 하나를 필터해 파티션 파일로 분배, 통계 반환"""
+    counts = Counter()
+    files = {}
+    try:
+        for seq, item in enumerate(iter_input(path)):
+            counts['read'] += 1
+            reason = keep(item, drop)
+            if reason:
+                counts[f'dropped/{reason}'] += 1
+                continue
+            partition = partition_of(str(item['asin']), partitions)
+            f = files.get(partition)
+            if f is None:
+                f = files[partition] = open(
+                    os.path.join(workdir, f'p{partition:04d}-s{shard:05d}.jsonl'), 'w', encoding='utf-8')
+            f.write(json.dumps([shard, seq, item], ensure_ascii=False) + '\n')
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+def dedup_partition(partition, workdir):
+    """2단계: 파티션의 샤드 파일을 순서대로 읽어 asin 첫 등장만 남김"""
+    prefix = f'p{partition:04d}-'
+    inputs = sorted(name for name in os.listdir(workdir) if name.startswith(prefix))
+    output = os.path.join(workdir, f'dedup-{partition:04d}.jsonl')
+    seen = set()
+    duplicates = 0
+    with open(output, 'w', encoding='utf-8') as out:
+        for name in inputs:
+            with open(os.path.join(workdir, name), 'r', encoding='utf-8') as f:
+                for line in f:
+                    asin = json.loads(line)[2]['asin']
+                    if asin in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(asin)
+                    out.write(line)
+            os.remove(os.path.join(workdir, name))
+    return output, duplicates
+
+
+def _sorted_records(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            shard, seq, item = json.loads(line)
+            yield shard, seq, item
+
+
+class _Writer:
+    """JSON 배열(들여쓰기, 노트북 출력과 같은 형태) 또는 JSON Lines 스트리밍 기록"""
+
+    def __init__(self, path, fmt, indent):
+        self.fmt = fmt
+        self.indent = indent
+        self.count = 0
+        self.f = open(path, 'w', encoding='utf-8')
+        if fmt == 'json':
+            self.f.write('[')
+
+    def write(self, item):
+        if self.fmt == 'jsonl':
+            self.f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        else:
+            text = json.dumps(item, ensure_ascii=False, indent=self.indent)
+            if self.indent:
+                pad = ' ' * self.indent
+                text = pad + text.replace('\n', '\n' + pad)
+            self.f.write((',\n' if self.count else '\n') + text)
+        self.count += 1
+
+    def close(self):
+        if self.fmt == 'json':
+            self.f.write('\n]' if self.count else ']')
+        self.f.close()
+
+
+def run(inputs, output, workers=None, partitions=64, drop=DEFAULT_DROP, fmt=None, indent=4, tmp_dir=None):
+    """후처리 실행 후 통계(Counter) 반환"""
+    if fmt is None:
+        fmt = 'jsonl' if output.lower().endswith(('.jsonl', '.jl')) else 'json'
+    workers = workers or os.cpu_count() or 1
+    workdir = tempfile.mkdtemp(prefix='postprocess-', dir=tmp_dir)
+    counts = Counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(filter_shard, shard, path, workdir, partitions, drop)
+                for shard, path in enumerate(inputs)
+            ]
+            for future in futures:
+                counts.update(future.result())
+
+            futures = [pool.submit(dedup_partition, partition, workdir) for partition in range(partitions)]
+            outputs = []
+            for future in futures:
+                path, duplicates = future.result()
+                outputs.append(path)
+                counts['duplicates'] += duplicates
+
+        writer = _Writer(output, fmt, indent)
+        try:
+            for _, _, item in heapq.merge(*(_sorted_records(path) for path in outputs)):
+                writer.write(item)
+        finally:
+            writer.close()
+        counts['written'] = writer.count
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return counts
+
+
+def _parse_drop(values):
+    if not values:
+        return DEFAULT_DROP
+    drop = {}
+    for value in values:
+        field, _, excluded = value.partition('=')
+        drop.setdefault(field, []).append(excluded.lower())
+    return tuple((field, tuple(excluded)) for field, excluded in drop.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='크롤 결과 샤드 필터/중복 제거/병합')
+    parser.add_argument('inputs', nargs='+', help='JSON 배열 / JSON Lines 파일 또는 jsonl_feed 디렉터리 (입력 순서 = 우선순위)')
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--format', choices=('json', 'jsonl'), help='기본: 출력 확장자로 판단')
+    parser.add_argument('--indent', type=int, default=4, help='JSON 배열 출력 들여쓰기 (0 이면 한 줄)')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--partitions', type=int, default=64, help='asin 해시 파티션 수 (클수록 파티션당 메모리 감소)')
+    parser.add_argument('--drop', action='append', default=[],
+                        help='제외 조건 field=value, 대소문자 무시 (기본: board_name=unknown/null, data_gbn=DELETE)')
+    parser.add_argument('--tmp', default=None, help='중간 파일 디렉터리 (기본: 시스템 임시 디렉터리)')
+    args = parser.parse_args(argv)
+
+    start = time.monotonic()
+    counts = run(args.inputs, args.output, args.workers, args.partitions, _parse_drop(args.drop),
+                 args.format, args.indent or None, args.tmp)
+    for key in sorted(counts):
+        print(f'{key:<30}{counts[key]:>10}')
+    print(f"완료! 총 {counts['written']}개 항목이 {args.output}에 저장되었습니다. ({time.monotonic() - start:.1f}초)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+내용 주소 기반(content-addressed) 압축 응답 저장소
+
+크롤 중 받은 상품/베스트셀러 페이지 원문을 sha256 으로 이름 붙여 압축 저장하고,
+URL -> 최신 응답 인덱스를 SQLite 로 관리한다. 같은 본문은 한 번만 저장된다.
+ResponseStoreMiddleware 의 replay 모드에서 네트워크 없이 parse 로 다시 흘려 보내
+selectors.json / helper_parse.py 수정 결과를 빠르게 검증할 수 있다.
+
+압축은 zstandard 가 설치되어 있으면 zstd, 없으면 gzip 을 쓴다.
+
+사용 예 (amazon_crawler 디렉터리에서):
+    scrapy crawl amazon_product -s RESPONSE_STORE_MODE=record
+    scrapy crawl amazon_product -s RESPONSE_STORE_MODE=replay -O ./data/result/replay.json
+    python -m utils.response_store ./data/response_store
+"""
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class ResponseStore:
+    def __init__(self, path):
+        self.path = path
+        self.objects_dir = os.path.join(path, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(path, 'index.db'))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url        TEXT PRIMARY KEY,
+                status     INTEGER NOT NULL,
+                headers    TEXT NOT NULL,
+                digest     TEXT NOT NULL,
+                codec      TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._compressor = zstandard.ZstdCompressor(level=10) if zstandard else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    def put(self, url, status, headers, body):
+        """응답 저장 후 본문 digest 반환"""
+        digest = hashlib.sha256(body).hexdigest()
+        codec = 'zst' if zstandard else 'gz'
+        object_path = self._object_path(digest, codec)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            data = self._compressor.compress(body) if codec == 'zst' else gzip.compress(body, compresslevel=6)
+            tmp_path = object_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, object_path)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+            (url, status, json.dumps(headers), digest, codec, time.time()),
+        )
+        self.conn.commit()
+        return digest
+
+    def get(self, url):
+        """(status, headers, body) 반환, 없으면 None"""
+        row = self.conn.execute(
+            'SELECT status, headers, digest, codec FROM responses WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, headers, digest, codec = row
+        with open(self._object_path(digest, codec), 'rb') as f:
+            data = f.read()
+        if codec == 'zst':
+            if self._decompressor is None:
+                raise RuntimeError('zstd 로 저장된 응답을 읽으려면 zstandard 패키지가 필요합니다.')
+            body = self._decompressor.decompress(data)
+        else:
+            body = gzip.decompress(data)
+        return status, json.loads(headers), body
+
+    def urls(self):
+        return [row[0] for row in self.conn.execute('SELECT url FROM responses ORDER BY url')]
+
+    def __contains__(self, url):
+        return self.conn.execute('SELECT 1 FROM responses WHERE url = ?', (url,)).fetchone() is not None
+
+    def close(self):
+        self.conn.close()
+
+    def _object_path(self, digest, codec):
+        return os.path.join(self.objects_dir, digest[:2], f'{digest}.{codec}')
+
+
+if __name__ == '__main__':
+    store = ResponseStore(sys.argv[1])
+    count, objects = store.conn.execute('SELECT COUNT(*), COUNT(DISTINCT digest) FROM responses').fetchone()
+    size = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(store.objects_dir) for name in names
+    )
+    print(f'URL {count}개, 본문 {objects}개, 압축 {size / 1024 / 1024:.1f} MB')
@@ -0,0 +1,217 @@
+"""
+selectors.json 사전 컴파일
+
+selectors.json 을 시작할 때 한 번 읽어 모든 선택자를 lxml XPath 객체로 컴파일한다.
+CSS 선택자는 parsel 과 같은 규칙(::text, ::attr(...) 지원)으로 미리 XPath 로 변환하고,
+빈 문서에 한 번 실행해 보아 문법/함수 오류가 있으면 SelectorConfigError 로 바로 실패한다.
+(페이지마다 except Exception 으로 삼키지 않도록)
+
+컴파일 결과는 원본과 같은 키를 가진 dict 이고, 선택자 목록 자리에
+CompiledSelector 튜플이 들어간다. helper_parse 의 추출기들이 공유해서 쓴다.
+
+각 선택자는 가능하면 CSS 형태(css)도 함께 가진다. selectolax 백엔드(utils/html_backend.py)는
+이 CSS 형태로 조회하고, CSS 로 옮길 수 없는 XPath(위치 조건, 중첩 경로 등)만 lxml 로 처리한다.
+표의 직계 자식 행(table/tr)이나 tbody/thead/tfoot 를 지정하는 선택자도 CSS 형태를 두지 않는다.
+lexbor(HTML5)는 tr 을 항상 tbody 아래로 옮기지만 lxml 은 원본 그대로 두므로, 같은 선택자가
+원본 마크업에 따라 두 트리에서 다른 행을 고르기 때문이다.
+"""
+import re
+
+from cssselect import SelectorError
+from lxml import etree
+from parsel.csstranslator import css2xpath
+
+# 문자열 선택자 목록 키
+SELECTOR_KEYS = (
+    'title_selectors',
+    'price_selectors',
+    'list_price_selectors',
+    'discount_selectors',
+    'rating_selectors',
+    'review_count_selectors',
+)
+
+_EMPTY_DOCUMENT = etree.fromstring('<html><body></body></html>', etree.HTMLParser())
+
+
+class SelectorConfigError(ValueError):
+    pass
+
+
+class CompiledSelector:
+    __slots__ = ('source', 'kind', 'xpath', 'css', 'label')
+
+    def __init__(self, source, kind, xpath, css=None, label=None):
+        self.source = source
+        self.kind = kind
+        self.xpath = xpath
+        # (CSS 쿼리, 결과 종류 'text' | 'deep' | 'attr' | 'node', 속성 이름) 또는 None
+        self.css = css
+        # selectors.json 위치 (예: 'price_selectors[2]'), 프로파일링 요약에 사용
+        self.label = label
+
+    def __call__(self, root):
+        """결과 목록 (노드는 그대로, 텍스트/속성은 str)"""
+        result = self.xpath(root)
+        return result if isinstance(result, list) else [result]
+
+    def getall(self, root):
+        return [_to_text(value) for value in self(root)]
+
+    def get(self, root):
+        result = self(root)
+        return _to_text(result[0]) if result else None
+
+    def __repr__(self):
+        return f'CompiledSelector({self.kind}: {self.source!r})'
+
+
+def compile_selector(source, kind=None, css=None, label=None):
+    """선택자 문자열 하나를 컴파일
+
+    kind 가 없으면 '/' 나 '(' 로 시작하면 XPath, '::' 가 있으면 CSS, 그 외는 XPath 로 본다.
+    css 를 주면 자동 변환 대신 그 CSS(parsel 문법, ::text / ::attr 가능)를 CSS 형태로 쓴다.
+    """
+    source = source.strip()
+    if kind is None:
+        if source.startswith(('/', '(')):
+            kind = 'xpath'
+        else:
+            kind = 'css' if '::' in source else 'xpath'
+    try:
+        expression = css2xpath(source) if kind == 'css' else source
+        xpath = etree.XPath(expression, smart_strings=False)
+        xpath(_EMPTY_DOCUMENT)
+    except (SelectorError, etree.XPathError) as e:
+        raise SelectorConfigError(f'{kind} 선택자 오류 {source!r}: {e}') from e
+
+    if css is None:
+        css_form = split_css(source) if kind == 'css' else xpath_to_css(source)
+    else:
+        css_form = split_css(css)
+    if css_form is not None and _TABLE_SENSITIVE.search(css_form[0]):
+        css_form = None
+    return CompiledSelector(source, kind, xpath, css_form, label)
+
+
+def compile_selectors(config):
+    """selectors.json 내용을 컴파일된 plan(dict)으로 변환, 잘못된 선택자는 한 번에 모아 예외"""
+    plan = dict(config)
+    errors = []
+
+    for key in SELECTOR_KEYS:
+        compiled = []
+        for index, source in enumerate(config.get(key, [])):
+            try:
+                compiled.append(compile_selector(source, label=f'{key}[{index}]'))
+            except SelectorConfigError as e:
+                errors.append(f'{key}[{index}]: {e}')
+        plan[key] = tuple(compiled)
+
+    rows = []
+    for index, row in enumerate(config.get('row_selectors', [])):
+        if not row.get('value', '').strip():
+            continue
+        try:
+            rows.append(compile_selector(row['value'], row.get('type', 'xpath'), label=f'row_selectors[{index}]'))
+        except SelectorConfigError as e:
+            errors.append(f'row_selectors[{index}]: {e}')
+    plan['row_selectors'] = tuple(rows)
+
+    if errors:
+        raise SelectorConfigError('selectors.json 선택자 오류\n' + '\n'.join(errors))
+    return plan
+
+
+# lexbor 와 lxml 의 표 구조가 달라지는 CSS (표의 직계 자식 tr, 명시적인 tbody/thead/tfoot)
+_TABLE_SENSITIVE = re.compile(r'\btable(?:\[[^\]]*\])*\s*>\s*tr\b|\b(?:tbody|thead|tfoot)\b')
+
+_CSS_PSEUDO = re.compile(r'(\s*)::(text|attr\(\s*([\w-]+)\s*\))\s*$')
+
+
+def split_css(source):
+    """parsel CSS 의 ::text / ::attr(name) 를 떼어 (쿼리, 결과 종류, 속성) 반환"""
+    match = _CSS_PSEUDO.search(source)
+    if not match:
+        return source.strip(), 'node', None
+    query = source[:match.start()].strip()
+    if match.group(2) == 'text':
+        # 'h1 ::text' 처럼 공백 뒤 ::text 는 모든 하위 텍스트
+        return query, 'deep' if match.group(1) else 'text', None
+    return query, 'attr', match.group(3)
+
+
+_XPATH_STEP = re.compile(r'(//|/)([\w-]+|\*)((?:\[[^\[\]]*\])*)')
+_XPATH_CONDITION = re.compile(
+    r'\s*(?:@([\w-]+)\s*=\s*(["\'])(.*?)\2'
+    r'|contains\(\s*@([\w-]+)\s*,\s*(["\'])(.*?)\5\s*\)'
+    r'|@([\w-]+))\s*(?:and\b|$)'
+)
+
+
+def xpath_to_css(source):
+    """단순한 XPath 를 CSS 형태로 변환, 변환할 수 없으면 None
+
+    지원: //tag, /tag, 조건 @a="v" / contains(@a, "v") / @a (and 로 연결),
+    끝의 /text(), //text(), /@attr
+    """
+    mode, attr = 'node', None
+    for suffix, suffix_mode in (('//text()', 'deep'), ('/text()', 'text')):
+        if source.endswith(suffix):
+            source, mode = source[:-len(suffix)], suffix_mode
+            break
+    else:
+        match = re.search(r'/@([\w-]+)$', source)
+        if match:
+            source, mode, attr = source[:match.start()], 'attr', match.group(1)
+
+    if not source.startswith('//'):
+        return None
+    parts = []
+    pos = 0
+    while pos < len(source):
+        match = _XPATH_STEP.match(source, pos)
+        if not match:
+            return None
+        axis, tag, predicates = match.groups()
+        if not parts:
+            combinator = ''
+        elif axis == '//':
+            combinator = ' '
+        else:
+            combinator = ' > '
+        conditions = ''
+        for predicate in re.findall(r'\[([^\[\]]*)\]', predicates):
+            condition_pos = 0
+            while condition_pos < len(predicate):
+                condition = _XPATH_CONDITION.match(predicate, condition_pos)
+                if not condition or condition.end() == condition_pos:
+                    return None
+                equals_name, _, equals_value, contains_name, _, contains_value, exists_name = condition.groups()
+                if equals_name:
+                    conditions += f'[{equals_name}="{equals_value}"]'
+                elif contains_name:
+                    conditions += f'[{contains_name}*="{contains_value}"]'
+                else:
+                    conditions += f'[{exists_name}]'
+                condition_pos = condition.end()
+        parts.append(f'{combinator}{tag}{conditions}')
+        pos = match.end()
+    return ''.join(parts), mode, attr
+
+
+def document_root(obj):
+    """Response / parsel Selector / lxml 요소에서 lxml 루트 요소 반환"""
+    selector = getattr(obj, 'selector', obj)
+    return getattr(selector, 'root', selector)
+
+
+def _to_text(value):
+    # parsel Selector.get() 과 같은 직렬화
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, etree._Element):
+        return etree.tostring(value, method='html', encoding='unicode', with_tail=False)
+    return str(value)
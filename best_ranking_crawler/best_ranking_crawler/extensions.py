@@ -0,0 +1,58 @@
+# Define here the custom extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from crawl_common import metrics
+from crawl_common.jsonl_feed import JsonLinesFeed
+
+
+class JsonLinesFeedExport:
+    """item 을 파티션별 압축 JSON Lines 파일로 스트리밍 저장 (crawl_common.jsonl_feed)
+
+    FEEDS 의 JSON 배열과 달리 한 건마다 flush 하고 크기/건수 기준으로 파일을 나눈다.
+    """
+
+    def __init__(self, feed):
+        self.feed = feed
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get('JSONL_FEED_DIR')
+        if not path:
+            raise NotConfigured
+        feed = JsonLinesFeed(
+            path,
+            partition_by=settings.getlist('JSONL_FEED_PARTITION', ['board_name', 'date']),
+            date_field=settings.get('JSONL_FEED_DATE_FIELD'),
+            roll_bytes=settings.getint('JSONL_FEED_ROLL_BYTES', 64 * 1024 * 1024),
+            roll_items=settings.getint('JSONL_FEED_ROLL_ITEMS', 10000),
+            compression=settings.get('JSONL_FEED_COMPRESSION', 'gzip') or None,
+        )
+        ext = cls(feed)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def item_scraped(self, item, response, spider):
+        self.feed.write(ItemAdapter(item).asdict())
+
+    def spider_closed(self, spider, reason):
+        self.feed.close()
+
+
+class CrawlMetrics(metrics.CrawlMetrics):
+    """크롤 실시간 지표 확장 (crawl_common.metrics), 페이지 풀 / 브라우저 메모리 지표 추가"""
+
+    def extra_metrics(self, stats):
+        return [
+            ('crawler_playwright_pages', 'gauge', '페이지 풀의 열린 페이지 수 (PagePoolMiddleware)',
+             [({'state': 'idle'}, stats.get('page_pool/idle')), ({'state': 'busy'}, stats.get('page_pool/busy'))]),
+            ('crawler_browser_rss_bytes', 'gauge', 'Playwright 드라이버 + 브라우저 RSS',
+             [({}, stats.get('page_pool/browser_rss_bytes'))]),
+        ]
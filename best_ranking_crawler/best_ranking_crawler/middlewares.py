@@ -3,11 +3,18 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import time
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from crawl_common.metrics import parse_finished
+from .page_pool import PagePool, browser_rss
+
 
 class PwtestSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -101,3 +108,128 @@ class PwtestDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class ParseTimeMiddleware:
+    """콜백 처리 시간 측정 스파이더 미들웨어 (CrawlMetrics 의 parse 히스토그램)
+
+    콜백 직전(process_spider_input)부터 콜백 출력이 끝날 때까지의 시간을 parse_finished 신호로 보낸다.
+    콜백에 가장 가깝게 두어야 다른 미들웨어 시간이 섞이지 않는다.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.started = {}  # 응답 -> 콜백 시작 시각
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+        return cls(crawler)
+
+    def process_spider_input(self, response, spider):
+        self.started[response] = time.perf_counter()
+
+    def process_spider_output(self, response, result, spider):
+        try:
+            yield from result
+        finally:
+            self._finish(response)
+
+    async def process_spider_output_async(self, response, result, spider):
+        try:
+            async for output in result:
+                yield output
+        finally:
+            self._finish(response)
+
+    def process_spider_exception(self, response, exception, spider):
+        self._finish(response)
+
+    def _finish(self, response):
+        started = self.started.pop(response, None)
+        if started is not None:
+            self.crawler.signals.send_catch_log(
+                parse_finished, response=response, seconds=time.perf_counter() - started)
+
+
+class PagePoolMiddleware:
+    """Playwright 페이지 풀 다운로더 미들웨어 (page_pool.py)
+
+    playwright_include_page 요청마다 풀에서 자리를 받아 쉬는 페이지를 재사용하고,
+    응답이 오면 반납, 다운로드 오류/타임아웃이면 닫는다. 반납한 페이지는 meta 에서 빠진다.
+    다운로더에 가장 가깝게 두어 process_response / process_exception 이 먼저 불리게 한다
+    (RetryMiddleware 가 요청을 복사하기 전에 meta 의 페이지를 정리).
+    PLAYWRIGHT_PAGE_POOL_STATS_INTERVAL 초마다 페이지 수와 브라우저 RSS 를 page_pool/* stats 에 기록한다.
+    """
+
+    def __init__(self, stats, size, interval):
+        self.stats = stats
+        self.pool = PagePool(size)
+        self.interval = interval
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        size = crawler.settings.getint('PLAYWRIGHT_PAGE_POOL_SIZE')
+        if size <= 0:
+            raise NotConfigured
+        mw = cls(crawler.stats, size, crawler.settings.getfloat('PLAYWRIGHT_PAGE_POOL_STATS_INTERVAL', 30.0))
+        crawler.signals.connect(mw.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    async def process_request(self, request, spider):
+        if not (request.meta.get('playwright') and request.meta.get('playwright_include_page')):
+            return None
+        page = await self.pool.acquire()
+        request.meta['page_pool_slot'] = True
+        if page is not None:
+            request.meta['playwright_page'] = page
+            self.stats.inc_value('page_pool/reused')
+        else:
+            request.meta.pop('playwright_page', None)
+            self.stats.inc_value('page_pool/created')
+        self._sample_pages()
+        return None
+
+    def process_response(self, request, response, spider):
+        if request.meta.pop('page_pool_slot', False):
+            self.pool.release(request.meta.pop('playwright_page', None))
+            self._sample_pages()
+        return response
+
+    async def process_exception(self, request, exception, spider):
+        if request.meta.pop('page_pool_slot', False):
+            await self.pool.discard(request.meta.pop('playwright_page', None))
+            self.stats.inc_value('page_pool/discarded')
+            self._sample_pages()
+        return None
+
+    def spider_opened(self, spider):
+        self.task = task.LoopingCall(self._sample_rss)
+        self.task.start(self.interval, now=True)
+
+    async def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        self._sample_rss()
+        closed = await self.pool.close()
+        self.stats.set_value('page_pool/closed_at_end', closed)
+        self._sample_pages()
+        spider.logger.info(
+            "페이지 풀 종료: 페이지 %d개 닫음 (생성 %d, 재사용 %d, 오류로 닫음 %d)", closed,
+            self.stats.get_value('page_pool/created', 0), self.stats.get_value('page_pool/reused', 0),
+            self.stats.get_value('page_pool/discarded', 0))
+
+    def _sample_pages(self):
+        self.stats.set_value('page_pool/idle', len(self.pool.idle))
+        self.stats.set_value('page_pool/busy', self.pool.busy)
+        self.stats.set_value('page_pool/live', self.pool.live)
+        self.stats.max_value('page_pool/live_peak', self.pool.live)
+
+    def _sample_rss(self):
+        rss = browser_rss()
+        if rss is not None:
+            self.stats.set_value('page_pool/browser_rss_bytes', rss)
+            self.stats.max_value('page_pool/browser_rss_peak_bytes', rss)
@@ -0,0 +1,111 @@
+"""
+Playwright 페이지 풀
+
+playwright_include_page 로 받은 페이지를 닫지 않으면 게시판/다음 페이지마다 탭이 하나씩 쌓인다.
+PagePoolMiddleware(middlewares.py)가 이 풀로
+    - 동시에 열린 페이지 수를 size 개로 제한하고 (빈 자리가 날 때까지 요청 대기)
+    - 쉬고 있는 페이지를 다음 요청의 meta['playwright_page'] 로 넘겨 재사용하고
+    - 응답이 오면 바로 반납, 다운로드 오류/타임아웃이면 닫고, 종료 시 전부 닫는다.
+스파이더 콜백은 response.text 만 쓰므로 응답 시점에 페이지를 반납해도 된다.
+"""
+import os
+
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import defer
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class PagePool:
+    def __init__(self, size):
+        self.size = size
+        self.slots = defer.DeferredSemaphore(size)
+        self.idle = []  # 반납되어 다음 요청을 기다리는 페이지
+
+    @property
+    def busy(self):
+        """자리를 받아 다운로드 중인 요청 수 (요청마다 페이지 최대 1개)"""
+        return self.size - self.slots.tokens
+
+    @property
+    def live(self):
+        return len(self.idle) + self.busy
+
+    async def acquire(self):
+        """빈 자리를 기다린 뒤 재사용할 페이지(없으면 None - 핸들러가 새로 만듦) 반환"""
+        # 자리를 넘겨받는 즉시(콜백 안에서) 쉬는 페이지를 가져가야 idle 과 busy 에 이중으로 잡히지 않음
+        return await maybe_deferred_to_future(self.slots.acquire().addCallback(self._take_idle))
+
+    def _take_idle(self, _):
+        while self.idle:
+            page = self.idle.pop()
+            if not page.is_closed():
+                return page
+        return None
+
+    def release(self, page):
+        """다운로드가 끝난 페이지를 반납, 닫혀 있으면 버림"""
+        if page is not None and not page.is_closed():
+            self.idle.append(page)
+        self.slots.release()
+
+    async def discard(self, page):
+        """오류난 페이지는 상태를 알 수 없으므로 닫고 자리만 돌려줌"""
+        try:
+            if page is not None and not page.is_closed():
+                await page.close()
+        finally:
+            self.slots.release()
+
+    async def close(self):
+        """쉬는 페이지를 모두 닫고 닫은 수 반환 (다운로드 중인 페이지는 핸들러가 브라우저와 함께 정리)"""
+        pages, self.idle = self.idle, []
+        for page in pages:
+            if not page.is_closed():
+                await page.close()
+        return len(pages)
+
+
+def browser_rss(pid=None):
+    """이 프로세스의 하위 프로세스(Playwright 드라이버 + 브라우저) RSS 합계(bytes), 알 수 없으면 None"""
+    pid = pid or os.getpid()
+    if psutil is not None:
+        try:
+            children = psutil.Process(pid).children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    if not os.path.isdir('/proc'):
+        return None
+
+    # psutil 이 없으면 /proc 에서 부모 pid 로 하위 트리를 찾음 (Linux)
+    parents, rss = {}, {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        # ') ' 뒤: state ppid ... rss(24번째 필드, 페이지 단위)
+        parents[int(name)] = int(fields[1])
+        rss[int(name)] = int(fields[21]) * os.sysconf('SC_PAGE_SIZE')
+
+    total, stack = 0, [pid]
+    while stack:
+        parent = stack.pop()
+        for child, ppid in parents.items():
+            if ppid == parent:
+                total += rss[child]
+                stack.append(child)
+    return total
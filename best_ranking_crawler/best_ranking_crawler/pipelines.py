@@ -7,7 +7,16 @@
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from crawl_common.normalize import normalize_item
+
 
 class PwtestPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class NormalizeItemPipeline:
+    """순위/리뷰 수/가격/크롤 시각 문자열을 타입이 있는 값으로 변환 (crawl_common.normalize)"""
+
+    def process_item(self, item, spider):
+        return normalize_item(item)
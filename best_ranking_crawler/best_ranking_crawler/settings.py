@@ -62,9 +62,20 @@ ROBOTSTXT_OBEY = True
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "pwtest.pipelines.PwtestPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "pwtest.pipelines.NormalizeItemPipeline": 300,
+    "crawl_common.mongo_bulk.MongoBulkPipeline": 700,  # 공통 패키지 (저장소 루트에서 pip install -e ./crawl_common)
+}
+
+# MongoDB 저장 (MONGO_URI 가 비어 있으면 비활성), 순위 API 는 best_products 를 seq 순으로 읽음
+MONGO_URI = ''  # 예: 'mongodb://localhost:27017'
+MONGO_DATABASE = 'mydb'
+MONGO_COLLECTION = 'best_products'
+MONGO_UPSERT_KEYS = ['asin', 'board_name', 'crawl_date']
+MONGO_SEQ_COUNTER = 'bestid'
+MONGO_BATCH_SIZE = 500
+MONGO_FLUSH_INTERVAL = 5  # 초
+MONGO_MAX_PENDING_BATCHES = 4
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -103,6 +114,13 @@ PLAYWRIGHT_LAUNCH_OPTIONS = {
     "args": ["--no-sandbox", "--disable-dev-shm-usage"]
 }
 
+# Playwright 페이지 풀 – 열린 탭 수 제한/재사용, 응답 시 반납, 오류·타임아웃 시 닫음 (0 이면 비활성)
+DOWNLOADER_MIDDLEWARES = {
+    "pwtest.middlewares.PagePoolMiddleware": 950,  # 다운로더에 가장 가깝게
+}
+PLAYWRIGHT_PAGE_POOL_SIZE = 2
+PLAYWRIGHT_PAGE_POOL_STATS_INTERVAL = 30  # 초, 페이지 수 / 브라우저 RSS 기록 간격
+
 FEEDS = {
     './result/123.json': {
         'format': 'json',
@@ -111,6 +129,28 @@ FEEDS = {
     }
 }
 
+# 스트리밍 JSON Lines 피드 (위 FEEDS 는 기존 소비 측을 위해 유지)
+EXTENSIONS = {
+    "pwtest.extensions.JsonLinesFeedExport": 520,
+    "pwtest.extensions.CrawlMetrics": 540,
+}
+JSONL_FEED_DIR = './result/jsonl'
+JSONL_FEED_PARTITION = ['board_name', 'date']
+JSONL_FEED_DATE_FIELD = 'crawl_date'
+JSONL_FEED_ROLL_BYTES = 64 * 1024 * 1024  # 압축 전 기준
+JSONL_FEED_ROLL_ITEMS = 10000
+JSONL_FEED_COMPRESSION = 'gzip'  # gzip / zstd / None
+
+# 실시간 지표 (Prometheus 텍스트 형식) – curl http://127.0.0.1:9411/metrics
+METRICS_ENABLED = True
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = [9411, 9420]   # amazon_crawler(9410~) 와 동시에 돌 때 겹치지 않도록
+METRICS_SAMPLE_INTERVAL = 5   # 초
+METRICS_RATE_WINDOW = 60      # 초
+SPIDER_MIDDLEWARES = {
+    "pwtest.middlewares.ParseTimeMiddleware": 950,  # 콜백에 가장 가깝게
+}
+
 USER_AGENT_CHOICES = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Chrome/124.0.0.0 Safari/537.36',
@@ -44,6 +44,7 @@ class bestsellerSpider(scrapy.Spider):
         self.headers = settings.get("DEFAULT_REQUEST_HEADERS")
         self.m = {
             "playwright": True,
+            # 페이지는 PagePoolMiddleware 가 재사용/반납하므로 콜백의 response.meta 에는 남지 않음
             "playwright_include_page": True,
             "playwright_page_methods": [
                 PageMethod(
@@ -0,0 +1,12 @@
+"""
+amazon_crawler / best_ranking_crawler 공통 모듈
+
+    jsonl_feed   파티션별 압축 JSON Lines 피드 (JsonLinesFeedExport 확장이 사용)
+    metrics      Prometheus 텍스트 형식 지표 부품과 CrawlMetrics 기본 확장
+    mongo_bulk   MongoDB 비순차 bulk upsert 파이프라인 (MongoBulkPipeline)
+    normalize    가격/순위/개수/크롤 시각 필드 정규화
+
+두 크롤러는 이 패키지를 설치해 import 한다 (저장소 루트에서):
+    pip install -e ./crawl_common
+프로젝트마다 다른 부분은 각 프로젝트 쪽(extensions.CrawlMetrics 하위 클래스 등)에 둔다.
+"""
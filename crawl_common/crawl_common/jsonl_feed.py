@@ -0,0 +1,240 @@
+"""
+스트리밍 JSON Lines 피드
+
+item 한 건마다 한 줄씩 쓰고 바로 flush 하므로 비정상 종료되어도 그때까지 쓴 줄은 읽을 수 있다.
+파티션(기본: board_name / 날짜)별로 파일을 나누고, 크기나 item 수가 기준을 넘으면 새 파일로 넘긴다.
+압축은 gzip 또는 zstd(zstandard 설치 시), 각 파일의 파티션/건수/상태는 manifest.json 에 기록한다.
+
+    {dir}/board_name=BEST_SD/date=2025-06-19/part-20250619T094431-00000.jsonl.gz
+    {dir}/manifest.json
+
+manifest 의 status: open(쓰는 중) / complete(정상 종료) / truncated(쓰던 중 중단, 다음 실행에서 건수 재계산)
+소비 측은 iter_items 로 파일 전체를 메모리에 올리지 않고 읽을 수 있고,
+complete 파일 목록으로 어디까지 처리했는지 이어서 진행할 수 있다.
+
+사용 예:
+    python -m crawl_common.jsonl_feed ./data/result/jsonl                       # 파일별 요약
+    python -m crawl_common.jsonl_feed ./data/result/jsonl --cat --where board_name=BEST_SD
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import zlib
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MANIFEST = 'manifest.json'
+EXTENSIONS = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst', None: '.jsonl'}
+
+
+class JsonLinesFeed:
+    def __init__(self, path, partition_by=('board_name', 'date'), date_field=None,
+                 roll_bytes=64 * 1024 * 1024, roll_items=10000, compression='gzip'):
+        if compression == 'zstd' and zstandard is None:
+            compression = 'gzip'
+        self.path = path
+        self.partition_by = tuple(partition_by)
+        self.date_field = date_field
+        self.roll_bytes = roll_bytes
+        self.roll_items = roll_items
+        self.compression = compression
+        self.run_id = datetime.now().strftime('%Y%m%dT%H%M%S')
+        self.run_date = datetime.now().strftime('%Y-%m-%d')
+        self.sequence = 0
+        self.parts = {}  # 파티션 키 -> 쓰는 중인 _Part
+        os.makedirs(path, exist_ok=True)
+        self.manifest = load_manifest(path)
+        self._repair()
+
+    def write(self, item):
+        """item(dict) 한 건을 해당 파티션 파일에 한 줄로 기록"""
+        partition = self.partition_of(item)
+        part = self.parts.get(partition)
+        if part is None:
+            part = self.parts[partition] = self._open(partition)
+
+        line = (json.dumps(item, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        part.write(line)
+        if part.bytes >= self.roll_bytes or part.items >= self.roll_items:
+            self._close(partition, 'complete')
+
+    def partition_of(self, item):
+        values = []
+        for key in self.partition_by:
+            if key == 'date':
+                raw = item.get(self.date_field) if self.date_field else None
+                value = str(raw)[:10].replace('/', '-') if raw else self.run_date
+            else:
+                value = item.get(key)
+            value = str(value) if value not in (None, '', 'null') else 'none'
+            values.append((key, value.replace(os.sep, '_')))
+        return tuple(values)
+
+    def close(self):
+        for partition in list(self.parts):
+            self._close(partition, 'complete')
+        self._save()
+
+    def _open(self, partition):
+        directory = os.path.join(self.path, *(f'{key}={value}' for key, value in partition))
+        os.makedirs(directory, exist_ok=True)
+        name = f'part-{self.run_id}-{self.sequence:05d}{EXTENSIONS[self.compression]}'
+        self.sequence += 1
+        part = _Part(os.path.join(directory, name), self.compression)
+        part.entry = {
+            'path': os.path.relpath(part.path, self.path),
+            'partition': dict(partition),
+            'run': self.run_id,
+            'compression': self.compression,
+            'items': 0,
+            'bytes': 0,
+            'status': 'open',
+            'created': time.time(),
+        }
+        self.manifest['files'].append(part.entry)
+        self._save()
+        return part
+
+    def _close(self, partition, status):
+        part = self.parts.pop(partition)
+        part.close()
+        part.entry.update(items=part.items, bytes=part.bytes, status=status, closed=time.time())
+        self._save()
+
+    def _repair(self):
+        # 이전 실행이 비정상 종료되어 open 으로 남은 파일은 읽을 수 있는 줄 수로 갱신
+        changed = False
+        for entry in self.manifest['files']:
+            if entry['status'] == 'open':
+                entry['items'] = sum(1 for _ in _read_lines(os.path.join(self.path, entry['path']), entry['compression']))
+                entry['status'] = 'truncated'
+                changed = True
+        if changed:
+            self._save()
+
+    def _save(self):
+        save_manifest(self.path, self.manifest)
+
+
+class _Part:
+    def __init__(self, path, compression):
+        self.path = path
+        self.items = 0
+        self.bytes = 0  # 압축 전 기준
+        self.entry = None
+        self.raw = open(path, 'wb')
+        if compression == 'gzip':
+            self.stream = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=6)
+        elif compression == 'zstd':
+            self.stream = zstandard.ZstdCompressor(level=3).stream_writer(self.raw, closefd=False)
+        else:
+            self.stream = None
+        self.compression = compression
+
+    def write(self, line):
+        if self.stream is None:
+            self.raw.write(line)
+        else:
+            self.stream.write(line)
+            # 압축 블록을 매 줄마다 마감해 중단돼도 여기까지는 풀 수 있게 함
+            if self.compression == 'gzip':
+                self.stream.flush(zlib.Z_SYNC_FLUSH)
+            else:
+                self.stream.flush(zstandard.FLUSH_BLOCK)
+        self.raw.flush()
+        self.items += 1
+        self.bytes += len(line)
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+        self.raw.close()
+
+
+def load_manifest(path):
+    manifest_path = os.path.join(path, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return {'files': []}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    manifest_path = os.path.join(path, MANIFEST)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _read_lines(path, compression):
+    """파일의 완전한 줄만 순서대로 반환 (끝이 잘린 압축 파일도 읽을 수 있는 데까지)"""
+    if compression == 'gzip':
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    elif compression == 'zstd':
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    else:
+        decompressor = None
+
+    buffer = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            if decompressor is not None:
+                try:
+                    chunk = decompressor.decompress(chunk)
+                except (zlib.error, zstandard.ZstdError if zstandard else zlib.error):
+                    break
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            yield from lines
+    if compression == 'gzip':
+        buffer += decompressor.flush()
+        yield from buffer.split(b'\n')[:-1]
+
+
+def iter_items(path, where=None, statuses=('complete', 'truncated', 'open')):
+    """manifest 순서대로 item 을 하나씩 반환, where 는 파티션 조건 dict"""
+    for entry in load_manifest(path)['files']:
+        if entry['status'] not in statuses:
+            continue
+        if where and any(entry['partition'].get(k) != v for k, v in where.items()):
+            continue
+        for line in _read_lines(os.path.join(path, entry['path']), entry['compression']):
+            if line:
+                yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='JSON Lines 피드 조회')
+    parser.add_argument('path')
+    parser.add_argument('--cat', action='store_true', help='item 을 JSON Lines 로 출력')
+    parser.add_argument('--where', action='append', default=[], help='파티션 조건 (예: board_name=BEST_SD)')
+    args = parser.parse_args(argv)
+    where = dict(condition.split('=', 1) for condition in args.where)
+
+    if args.cat:
+        for item in iter_items(args.path, where):
+            sys.stdout.write(json.dumps(item, ensure_ascii=False) + '\n')
+        return 0
+
+    files = load_manifest(args.path)['files']
+    for entry in files:
+        if where and any(entry['partition'].get(k) != v for k, v in where.items()):
+            continue
+        print(f"{entry['status']:<10}{entry['items']:>8}  {entry['path']}")
+    print(f"파일 {len(files)}개, item {sum(entry['items'] for entry in files)}개")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
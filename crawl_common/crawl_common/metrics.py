@@ -0,0 +1,271 @@
+"""
+크롤 실시간 지표 (Prometheus 텍스트 형식)
+
+CrawlMetrics 확장이 reactor 안에서 작은 HTTP 서버를 띄워 /metrics 로 내보낸다.
+    curl http://127.0.0.1:9410/metrics
+
+이 모듈은 확장/미들웨어가 공유하는 부품을 가진다.
+    Histogram     누적 버킷 히스토그램 (_bucket / _sum / _count)
+    RateWindow    최근 N 초 구간의 초당 처리량
+    parse_finished ParseTimeMiddleware 가 콜백 처리 시간을 알리는 신호
+    render        (이름, 종류, 설명, [(라벨, 값)]) 목록을 텍스트 형식으로 변환
+    CrawlMetrics  지표 확장의 공통 부분 (각 프로젝트 extensions.CrawlMetrics 가 상속)
+"""
+import time
+from bisect import bisect_left
+from collections import deque
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.reactor import listen_tcp
+from twisted.internet import task
+from twisted.web import resource
+from twisted.web.server import Site
+
+# ParseTimeMiddleware -> CrawlMetrics (response, seconds)
+parse_finished = object()
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+PARSE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+# 로봇 체크 페이지 판별 문자열 (본문 앞부분, 소문자) - CrawlMetrics.is_robot_check 기본값
+ROBOT_CHECK_NEEDLES = (b'captcha', b'api-services-support@amazon.com')
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels=None):
+        labels = dict(labels or {})
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            yield f'{name}_bucket', dict(labels, le=le), cumulative
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, self.count
+
+
+class RateWindow:
+    """add() 로 누적값을 기록하고 rate() 로 최근 window 초 동안의 초당 증가량"""
+
+    def __init__(self, window=60.0):
+        self.window = window
+        self.samples = deque()
+
+    def add(self, value, now=None):
+        now = time.monotonic() if now is None else now
+        self.samples.append((now, value))
+        while len(self.samples) > 2 and now - self.samples[1][0] >= self.window:
+            self.samples.popleft()
+
+    def rate(self):
+        if len(self.samples) < 2:
+            return 0.0
+        (start, first), (end, last) = self.samples[0], self.samples[-1]
+        return (last - first) / (end - start) if end > start else 0.0
+
+
+def render(metrics):
+    """metrics: (이름, 종류, 설명, 샘플) 목록, 샘플은 (이름, 라벨 dict, 값) 또는 (라벨 dict, 값)"""
+    lines = []
+    for name, kind, help_text, samples in metrics:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample in samples:
+            if len(sample) == 2:
+                sample = (name,) + tuple(sample)
+            sample_name, labels, value = sample
+            if value is None:
+                continue
+            label_text = ','.join(f'{key}="{_escape(value_)}"' for key, value_ in labels.items())
+            lines.append(f'{sample_name}{{{label_text}}} {_number(value)}' if label_text
+                         else f'{sample_name} {_number(value)}')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+class MetricsResource(resource.Resource):
+    isLeaf = True
+
+    def __init__(self, collect):
+        super().__init__()
+        self.collect = collect
+
+    def render_GET(self, request):
+        request.setHeader(b'Content-Type', b'text/plain; version=0.0.4; charset=utf-8')
+        return render(self.collect())
+
+
+class CrawlMetrics:
+    """크롤 실시간 지표를 Prometheus 텍스트 형식으로 내보내는 확장의 공통 부분
+
+    METRICS_HOST:METRICS_PORT(범위 중 빈 포트)의 /metrics 에서
+    다운로드 지연/콜백 처리 시간 히스토그램, 큐 깊이, pages/items per sec,
+    로봇 체크 비율, 응답 코드/재시도/오류 item 분포, 진행도와 ETA 를 제공한다.
+    콜백 처리 시간은 ParseTimeMiddleware(스파이더 미들웨어)가 parse_finished 신호로 알려 준다.
+    프로젝트별 차이는 각 extensions.py 의 하위 클래스가 is_robot_check / robot_check_counts /
+    extra_metrics 를 바꿔 넣는다.
+    """
+
+    def __init__(self, crawler, host, portrange, sample_interval, rate_window):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.host = host
+        self.portrange = portrange
+        self.sample_interval = sample_interval
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.parse_time = Histogram(PARSE_BUCKETS)
+        self.page_rate = RateWindow(rate_window)
+        self.item_rate = RateWindow(rate_window)
+        self.pages = 0
+        self.items = 0
+        self.robot_checks = 0
+        self.item_errors = {}
+        self.spider = None
+        self.port = None
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+        ext = cls(
+            crawler,
+            settings.get('METRICS_HOST', '127.0.0.1'),
+            [int(port) for port in settings.getlist('METRICS_PORT', [9410, 9420])],
+            settings.getfloat('METRICS_SAMPLE_INTERVAL', 5.0),
+            settings.getfloat('METRICS_RATE_WINDOW', 60.0),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.parse_finished, signal=parse_finished)
+        return ext
+
+    def spider_opened(self, spider):
+        self.spider = spider
+        self.port = listen_tcp(self.portrange, self.host, Site(MetricsResource(self.collect)))
+        address = self.port.getHost()
+        spider.logger.info(f"지표 엔드포인트: http://{address.host}:{address.port}/metrics")
+        self.task = task.LoopingCall(self.sample)
+        self.task.start(self.sample_interval)
+
+    def sample(self):
+        self.page_rate.add(self.pages)
+        self.item_rate.add(self.items)
+
+    def response_downloaded(self, response, request, spider):
+        latency = request.meta.get('download_latency')
+        if latency is not None:
+            self.latency.observe(latency)
+
+    def response_received(self, response, request, spider):
+        self.pages += 1
+        if self.is_robot_check(response):
+            self.robot_checks += 1
+
+    def is_robot_check(self, response):
+        head = response.body[:64 * 1024].lower()
+        return any(needle in head for needle in ROBOT_CHECK_NEEDLES)
+
+    def robot_check_counts(self, stats):
+        """(로봇 체크 수, 다운로드한 페이지 수)"""
+        return self.robot_checks, self.pages
+
+    def extra_metrics(self, stats):
+        return []
+
+    def item_scraped(self, item, response, spider):
+        if response is None:
+            return
+        self.items += 1
+        error = item.get('error')
+        if error and error != 'null':
+            # 라벨 수가 늘지 않도록 ':' 앞 부분만
+            kind = str(error).split(':', 1)[0][:40]
+            self.item_errors[kind] = self.item_errors.get(kind, 0) + 1
+
+    def parse_finished(self, response, seconds):
+        self.parse_time.observe(seconds)
+
+    def collect(self):
+        stats = self.stats.get_stats()
+        robot_checks, downloaded = self.robot_check_counts(stats)
+        items_per_sec = self.item_rate.rate()
+        processed = getattr(self.spider, 'processed_count', None)
+        total = getattr(self.spider, 'total_count', None)
+        eta = None
+        if processed is not None and total and items_per_sec > 0:
+            eta = max(0, total - processed) / items_per_sec
+
+        return [
+            ('crawler_pages_total', 'counter', '콜백까지 전달된 응답 수', [({}, self.pages)]),
+            ('crawler_items_total', 'counter', '수집된 item 수', [({}, self.items)]),
+            ('crawler_pages_per_second', 'gauge', '최근 구간 초당 응답 수', [({}, self.page_rate.rate())]),
+            ('crawler_items_per_second', 'gauge', '최근 구간 초당 item 수', [({}, items_per_sec)]),
+            ('crawler_download_latency_seconds', 'histogram', '다운로드 지연',
+             list(self.latency.samples('crawler_download_latency_seconds'))),
+            ('crawler_parse_seconds', 'histogram', '콜백 처리 시간',
+             list(self.parse_time.samples('crawler_parse_seconds'))),
+            ('crawler_queue_depth', 'gauge', '대기/처리 중 요청 수', _queue_depth(self.crawler.engine)),
+            ('crawler_robot_checks_total', 'counter', '로봇 체크 페이지 수', [({}, robot_checks)]),
+            ('crawler_robot_check_ratio', 'gauge', '다운로드한 페이지 중 로봇 체크 비율',
+             [({}, robot_checks / downloaded if downloaded else 0.0)]),
+            ('crawler_responses_total', 'counter', 'HTTP 상태 코드별 응답 수',
+             _stat_samples(stats, 'downloader/response_status_count/', 'status')),
+            ('crawler_retries_total', 'counter', '사유별 재시도 수',
+             _stat_samples(stats, 'retry/reason_count/', 'reason')),
+            ('crawler_download_exceptions_total', 'counter', '종류별 다운로드 예외 수',
+             _stat_samples(stats, 'downloader/exception_type_count/', 'type')),
+            ('crawler_item_errors_total', 'counter', '오류 item 수 (오류 종류별)',
+             [({'error': kind}, count) for kind, count in sorted(self.item_errors.items())]),
+            ('crawler_progress_processed', 'gauge', '처리한 대상 수', [({}, processed)]),
+            ('crawler_progress_total', 'gauge', '전체 대상 수', [({}, total)]),
+            ('crawler_eta_seconds', 'gauge', '남은 대상 / 최근 items per sec', [({}, eta)]),
+        ] + self.extra_metrics(stats)
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        if self.port is not None:
+            return self.port.stopListening()
+
+
+def _queue_depth(engine):
+    if engine is None:
+        return []
+    # 스케줄러는 엔진 내부 슬롯에 있음 (공개 속성 없음)
+    slot = getattr(engine, '_slot', None)
+    scheduler = getattr(slot, 'scheduler', None)
+    scraper_slot = getattr(engine.scraper, 'slot', None)
+    return [
+        ({'queue': 'scheduler'}, len(scheduler) if scheduler is not None and hasattr(scheduler, '__len__') else None),
+        ({'queue': 'downloader'}, len(engine.downloader.active)),
+        ({'queue': 'scraper'}, len(scraper_slot.active) if scraper_slot is not None else None),
+    ]
+
+
+def _stat_samples(stats, prefix, label):
+    return [({label: key[len(prefix):]}, value) for key, value in sorted(stats.items()) if key.startswith(prefix)]
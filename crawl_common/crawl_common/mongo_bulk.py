@@ -0,0 +1,162 @@
+"""
+MongoDB 비순차 bulk upsert 파이프라인
+
+item 을 배치로 모아 스레드에서 bulk_write 하고, 쓰기가 밀리면 process_item 이 기다리게 해
+(backpressure) 크롤 속도를 Mongo 에 맞춘다. 두 크롤러 모두 ITEM_PIPELINES 에 이 경로로 등록한다.
+"""
+import logging
+import time
+
+from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import task, threads
+
+try:
+    import pymongo
+except ImportError:
+    pymongo = None
+
+logger = logging.getLogger(__name__)
+
+
+class MongoBulkPipeline:
+    """item 을 모아 MongoDB 에 비순차(unordered) bulk upsert
+
+    MONGO_BATCH_SIZE 개가 모이거나 MONGO_FLUSH_INTERVAL 초가 지나면 스레드에서 bulk_write 하고,
+    쓰는 중인 배치가 MONGO_MAX_PENDING_BATCHES 개를 넘으면 process_item 이 기다려
+    Mongo 가 느릴 때 크롤 속도를 늦춘다. 종료 시 남은 item 을 모두 쓴 뒤 닫는다.
+
+    - MONGO_UPSERT_KEYS 로 문서를 찾고, 새로 만들어질 때만 카운터에서 seq 를 배정
+    - error 가 있는 item 은 건너뛰고, DELETE item 은 기존 문서에만 반영 (upsert 안 함)
+    - 변경 없음(unchanged) item 은 기존 문서의 크롤 시각만 갱신
+    """
+
+    def __init__(self, crawler, uri, database, collection, keys, batch_size, flush_interval, max_pending, seq_counter):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.uri = uri
+        self.database = database
+        self.collection_name = collection
+        self.keys = keys
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.seq_counter = seq_counter
+        self.client = None
+        self.buffer = []
+        self.pending = []
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        uri = settings.get('MONGO_URI')
+        if not uri:
+            raise NotConfigured
+        if pymongo is None:
+            raise NotConfigured('MongoBulkPipeline 을 쓰려면 pymongo 패키지가 필요합니다.')
+        return cls(
+            crawler,
+            uri,
+            settings.get('MONGO_DATABASE', 'mydb'),
+            settings.get('MONGO_COLLECTION'),
+            settings.getlist('MONGO_UPSERT_KEYS', ['asin']),
+            settings.getint('MONGO_BATCH_SIZE', 500),
+            settings.getfloat('MONGO_FLUSH_INTERVAL', 5.0),
+            settings.getint('MONGO_MAX_PENDING_BATCHES', 4),
+            settings.get('MONGO_SEQ_COUNTER'),
+        )
+
+    def open_spider(self, spider):
+        self.client = pymongo.MongoClient(self.uri)
+        self.db = self.client[self.database]
+        self.collection = self.db[self.collection_name]
+        self.task = task.LoopingCall(self.flush)
+        self.task.start(self.flush_interval, now=False)
+
+    async def process_item(self, item, spider):
+        doc = ItemAdapter(item).asdict()
+        if doc.get('error', 'null') not in ('null', None) and doc.get('data_gbn') != 'DELETE':
+            self.stats.inc_value('mongo/skipped')
+            return item
+        if any(doc.get(key) in (None, '', 'null') for key in self.keys):
+            self.stats.inc_value('mongo/skipped')
+            return item
+
+        self.buffer.append(doc)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        # 쓰기가 밀려 있으면 가장 오래된 배치가 끝날 때까지 대기 (backpressure)
+        while len(self.pending) > self.max_pending:
+            self.stats.inc_value('mongo/backpressure_waits')
+            await maybe_deferred_to_future(self.pending[0])
+        return item
+
+    def flush(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        d = threads.deferToThread(self._write, batch)
+        self.pending.append(d)
+        self.stats.max_value('mongo/pending_batches_max', len(self.pending))
+        d.addCallbacks(self._written, self._failed, errbackArgs=(batch,))
+        d.addBoth(self._done, d)
+
+    async def close_spider(self, spider):
+        if self.task and self.task.running:
+            self.task.stop()
+        self.flush()
+        while self.pending:
+            await maybe_deferred_to_future(self.pending[0])
+        self.client.close()
+
+    def _write(self, batch):
+        """스레드에서 실행: 배치를 UpdateOne 목록으로 만들어 bulk_write"""
+        start = time.monotonic()
+        requests = []
+        inserts = [doc for doc in batch if not doc.get('unchanged') and doc.get('data_gbn') != 'DELETE']
+        next_seq = self._reserve_seq(len(inserts)) if self.seq_counter and inserts else None
+        for doc in batch:
+            doc.pop('_id', None)
+            doc.pop('seq', None)
+            query = {key: doc[key] for key in self.keys}
+            crawled = {k: v for k, v in doc.items() if k.endswith('datetime')}
+            if doc.pop('unchanged', False):
+                requests.append(pymongo.UpdateOne(query, {'$set': crawled}, upsert=False))
+            elif doc.get('data_gbn') == 'DELETE':
+                update = {'$set': dict(crawled, data_gbn='DELETE', error=doc.get('error'))}
+                requests.append(pymongo.UpdateOne(query, update, upsert=False))
+            else:
+                update = {'$set': doc}
+                if next_seq is not None:
+                    update['$setOnInsert'] = {'seq': next_seq}
+                    next_seq += 1
+                requests.append(pymongo.UpdateOne(query, update, upsert=True))
+        result = self.collection.bulk_write(requests, ordered=False)
+        return len(batch), result.upserted_count, result.modified_count, time.monotonic() - start
+
+    def _reserve_seq(self, count):
+        # 배치 크기만큼 seq 를 한 번에 예약 (기존 문서 갱신분은 번호가 비어도 됨)
+        counter = self.db.counters.find_one_and_update(
+            {'_id': self.seq_counter},
+            {'$inc': {'seq': count}},
+            upsert=True,
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        return counter['seq'] - count + 1
+
+    def _written(self, result):
+        count, upserted, modified, elapsed = result
+        self.stats.inc_value('mongo/batches')
+        self.stats.inc_value('mongo/docs', count)
+        self.stats.inc_value('mongo/upserted', upserted)
+        self.stats.inc_value('mongo/modified', modified)
+        self.stats.inc_value('mongo/write_seconds', elapsed)
+
+    def _failed(self, failure, batch):
+        self.stats.inc_value('mongo/failed_docs', len(batch))
+        logger.error(f"MongoDB bulk 쓰기 실패 ({len(batch)}건): {failure.getErrorMessage()}")
+
+    def _done(self, result, d):
+        self.pending.remove(d)
@@ -0,0 +1,141 @@
+"""
+item 필드 타입 정규화
+
+스파이더가 만든 문자열 값을 크롤 시점에 한 번만 타입이 있는 값으로 바꾼다.
+소비 측(API, 분석)은 저장된 값을 그대로 쓰면 되고, 요청마다 int() / split() 할 필요가 없다.
+
+    가격      "$1,049.99"            -> 104999 (정수 센트)
+    순위      "#12", "#3 in ..."     -> 12
+    개수      "78,520", "1.2K"       -> 78520, 1200
+    평점      "4.7 out of 5 stars"   -> 4.7
+    할인율    "-25%"                 -> -25
+    크롤 시각 "2025/06/19 09:44:31"  -> "2025-06-19 09:44:31" (ISO 8601, datetime.fromisoformat 으로 읽힘)
+
+값이 없거나 해석할 수 없으면 None. 문자열 필드는 전부 \\u200e 를 지우고 strip 한다 (기존 CleanUnicodeChars).
+"""
+import re
+from datetime import datetime
+
+_PRICE = re.compile(r'(\d[\d,]*)(?:\.(\d{1,2}))?')
+_COUNT = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([KkMm])?')
+_RANK = re.compile(r'#?\s*(\d[\d,]*)')
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+_DATETIME_FORMATS = ('%Y/%m/%d %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y/%m/%d', '%Y-%m-%d')
+_MULTIPLIERS = {'k': 1000, 'm': 1000000}
+
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return None if value in ('', 'null', 'None') else value
+
+
+def clean_text(value):
+    return value.replace('\u200e', '').strip()
+
+
+def price_cents(value):
+    """가격 문자열을 정수 센트로, 범위("$12.99 - $24.99")는 첫 가격"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    value = _text(value)
+    match = _PRICE.search(value) if value else None
+    if not match:
+        return None
+    dollars = int(match.group(1).replace(',', ''))
+    cents = (match.group(2) or '0').ljust(2, '0')
+    return dollars * 100 + int(cents)
+
+
+def count(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    value = _text(value)
+    match = _COUNT.search(value) if value else None
+    if not match:
+        return None
+    number = float(match.group(1).replace(',', ''))
+    return int(round(number * _MULTIPLIERS.get((match.group(2) or '').lower(), 1)))
+
+
+def rank(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    value = _text(value)
+    match = _RANK.search(value) if value else None
+    return int(match.group(1).replace(',', '')) if match else None
+
+
+def rating(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    value = _text(value)
+    match = _NUMBER.search(value) if value else None
+    return float(match.group()) if match else None
+
+
+def percent(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    value = _text(value)
+    match = _NUMBER.search(value) if value else None
+    return int(round(float(match.group()))) if match else None
+
+
+def iso_datetime(value):
+    """크롤 시각을 'YYYY-MM-DD HH:MM:SS' 로, 이미 ISO 형식이면 그대로"""
+    value = _text(value)
+    if value is None:
+        return None
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).isoformat(sep=' ')
+        except ValueError:
+            continue
+    return None
+
+
+# 필드 -> 변환 함수 (item 최상위 / expand_info 안)
+ITEM_TYPES = {
+    'last_crawl_datetime': iso_datetime,
+    'crawl_datetime': iso_datetime,
+    'ranking': rank,
+    'review_cnt': count,
+    'price': price_cents,
+    'price_before': price_cents,
+    'price_after': price_cents,
+}
+EXPAND_INFO_TYPES = {
+    'price': price_cents,
+    'list_price': price_cents,
+    'discount': percent,
+    'rating': rating,
+    'review_count': count,
+}
+
+
+def normalize_item(item):
+    """item(dict 형태)을 제자리에서 정규화하고 반환"""
+    for field in list(item.keys()):
+        value = item[field]
+        if isinstance(value, str):
+            item[field] = value = clean_text(value)
+        elif isinstance(value, dict):
+            for key, nested in value.items():
+                if isinstance(nested, str):
+                    value[key] = clean_text(nested)
+        if field in ITEM_TYPES:
+            item[field] = ITEM_TYPES[field](value)
+
+    expand_info = item.get('expand_info')
+    if isinstance(expand_info, dict):
+        for key, convert in EXPAND_INFO_TYPES.items():
+            if key in expand_info:
+                expand_info[key] = convert(expand_info[key])
+
+    # 크롤 날짜는 크롤 시각에서 (오류 item 처럼 날짜가 빠진 경우도 채움)
+    fields = getattr(item, 'fields', None)
+    if item.get('crawl_datetime') and not item.get('crawl_date') and (fields is None or 'crawl_date' in fields):
+        item['crawl_date'] = item['crawl_datetime'][:10]
+    return item
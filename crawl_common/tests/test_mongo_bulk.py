@@ -0,0 +1,166 @@
+"""MongoBulkPipeline 배치 / backpressure / 종료 시 flush (메모리 컬렉션 대체, mongod 불필요)"""
+from types import SimpleNamespace
+
+import pymongo
+import pytest
+from scrapy import Spider
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from twisted.internet import defer
+
+from crawl_common import mongo_bulk
+from crawl_common.mongo_bulk import MongoBulkPipeline
+
+
+class FakeResult:
+    def __init__(self, requests):
+        self.upserted_count = sum(1 for r in requests if r._upsert)
+        self.modified_count = len(requests) - self.upserted_count
+
+
+class FakeCollection:
+    def __init__(self):
+        self.batches = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.batches.append(requests)
+        return FakeResult(requests)
+
+
+class FakeCounters:
+    def __init__(self):
+        self.seq = 0
+
+    def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        self.seq += update['$inc']['seq']
+        return {'_id': query['_id'], 'seq': self.seq}
+
+
+class FakeDatabase(dict):
+    def __init__(self):
+        super().__init__(product_master=FakeCollection())
+        self.counters = FakeCounters()
+
+
+class FakeClient:
+    def __init__(self, uri):
+        self.db = FakeDatabase()
+        self.closed = False
+
+    def __getitem__(self, name):
+        return self.db
+
+    def close(self):
+        self.closed = True
+
+
+class ManualThreads:
+    """deferToThread 대체: 호출을 모아 두었다가 run() 으로 하나씩 완료"""
+
+    def __init__(self):
+        self.calls = []
+
+    def deferToThread(self, fn, *args):
+        d = defer.Deferred()
+        self.calls.append((d, fn, args))
+        return d
+
+    def run(self):
+        d, fn, args = self.calls.pop(0)
+        d.callback(fn(*args))
+
+
+@pytest.fixture
+def threads(monkeypatch):
+    manual = ManualThreads()
+    monkeypatch.setattr(mongo_bulk, 'threads', manual)
+    monkeypatch.setattr(mongo_bulk.pymongo, 'MongoClient', FakeClient)
+    return manual
+
+
+def make_pipeline(batch_size=2, max_pending=1):
+    crawler = SimpleNamespace(settings=Settings({
+        'MONGO_URI': 'mongodb://test',
+        'MONGO_COLLECTION': 'product_master',
+        'MONGO_BATCH_SIZE': batch_size,
+        'MONGO_FLUSH_INTERVAL': 3600,
+        'MONGO_MAX_PENDING_BATCHES': max_pending,
+        'MONGO_SEQ_COUNTER': 'productid',
+    }))
+    crawler.stats = MemoryStatsCollector(crawler)
+    pipeline = MongoBulkPipeline.from_crawler(crawler)
+    spider = Spider('test')
+    pipeline.open_spider(spider)
+    return pipeline, spider
+
+
+def process(pipeline, spider, item):
+    return defer.Deferred.fromCoroutine(pipeline.process_item(item, spider))
+
+
+def item(n, **fields):
+    return dict({'asin': f'B{n:09d}', 'product_name': f'p{n}', 'error': 'null'}, **fields)
+
+
+def test_batches_by_size_and_assigns_seq_per_batch(threads):
+    pipeline, spider = make_pipeline(batch_size=2, max_pending=10)
+    for n in range(5):
+        process(pipeline, spider, item(n))
+    assert len(threads.calls) == 2
+    assert pipeline.buffer == [item(4)]
+
+    threads.run()
+    threads.run()
+    batches = pipeline.collection.batches
+    assert [len(batch) for batch in batches] == [2, 2]
+    assert [r._doc['$setOnInsert']['seq'] for batch in batches for r in batch] == [1, 2, 3, 4]
+    assert all(isinstance(r, pymongo.UpdateOne) and r._upsert for batch in batches for r in batch)
+    assert pipeline.stats.get_value('mongo/docs') == 4
+    assert not pipeline.pending
+
+
+def test_skips_errors_and_updates_unchanged_and_deleted_without_upsert(threads):
+    pipeline, spider = make_pipeline(batch_size=3, max_pending=10)
+    process(pipeline, spider, item(1, error='요청 실패: timeout'))
+    process(pipeline, spider, {'asin': 'B000000002', 'unchanged': True, 'last_crawl_datetime': '2025-06-19 09:44:31'})
+    process(pipeline, spider, item(3, data_gbn='DELETE', error='Page not found'))
+    process(pipeline, spider, item(4))
+    threads.run()
+
+    requests = pipeline.collection.batches[0]
+    assert pipeline.stats.get_value('mongo/skipped') == 1
+    assert requests[0]._doc == {'$set': {'last_crawl_datetime': '2025-06-19 09:44:31'}}
+    assert not requests[0]._upsert
+    assert requests[1]._doc['$set']['data_gbn'] == 'DELETE' and not requests[1]._upsert
+    assert requests[2]._upsert and requests[2]._doc['$setOnInsert'] == {'seq': 1}
+
+
+def test_backpressure_waits_for_oldest_batch(threads):
+    pipeline, spider = make_pipeline(batch_size=1, max_pending=1)
+    first = process(pipeline, spider, item(1))
+    assert first.called
+    second = process(pipeline, spider, item(2))
+    # 쓰는 중인 배치가 2개 > max_pending 이므로 가장 오래된 배치가 끝날 때까지 대기
+    assert not second.called
+    assert pipeline.stats.get_value('mongo/backpressure_waits') == 1
+
+    threads.run()
+    assert second.called
+    assert len(pipeline.pending) == 1
+
+
+def test_close_flushes_buffer_and_waits_for_pending(threads):
+    pipeline, spider = make_pipeline(batch_size=2, max_pending=10)
+    for n in range(3):
+        process(pipeline, spider, item(n))
+    closed = defer.Deferred.fromCoroutine(pipeline.close_spider(spider))
+    assert len(threads.calls) == 2
+    assert not closed.called
+
+    threads.run()
+    assert not closed.called
+    threads.run()
+    assert closed.called
+    assert [len(batch) for batch in pipeline.collection.batches] == [2, 1]
+    assert pipeline.client.closed
+    assert not pipeline.task.running